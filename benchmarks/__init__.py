@@ -0,0 +1,4 @@
+"""
+Benchmarks
+Offline performance measurements of the roadmap agent against a stub model
+"""
@@ -0,0 +1,435 @@
+"""
+End-to-End Benchmark
+Drives the standard test conversation through Runner + InMemorySessionService
+on the stub model and reports per-stage wall time, events, state size and memory
+
+Usage:
+    python -m benchmarks.e2e [--latency 0.05] [--repeat 5] [--baseline FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.genai import types
+
+from roadmap_agent.agent import plugins, root_agent
+from roadmap_agent.config import config
+from roadmap_agent.metrics import metrics
+from tests.test_agent import DEFAULT_CASSETTE, QUERIES
+
+from .stub_model import StubModel
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+class StageRecorder(BasePlugin):
+    """
+    Runner plugin that times every agent and tool and counts events.
+
+    Agent times are inclusive (a parent's time contains its sub-agents').
+    Plugins are forwarded to isolated runs and AgentTool child runners, so
+    sharded work and SearchAgent calls are recorded too.
+    """
+
+    def __init__(self):
+        super().__init__(name="stage_recorder")
+        self.agent_seconds: dict = defaultdict(list)
+        self.tool_seconds: dict = defaultdict(list)
+        self.model_calls: dict = defaultdict(int)
+        self.events: dict = defaultdict(int)
+        self._started: dict = {}
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        self._started[("agent", callback_context.invocation_id, agent.name)] = time.perf_counter()
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        started = self._started.pop(("agent", callback_context.invocation_id, agent.name), None)
+        if started is not None:
+            self.agent_seconds[agent.name].append(time.perf_counter() - started)
+        return None
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        self.model_calls[callback_context.agent_name] += 1
+        return None
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self._started[("tool", tool_context.function_call_id, tool.name)] = time.perf_counter()
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        started = self._started.pop(("tool", tool_context.function_call_id, tool.name), None)
+        if started is not None:
+            self.tool_seconds[tool.name].append(time.perf_counter() - started)
+        return None
+
+    async def on_event_callback(self, *, invocation_context, event):
+        self.events[event.author] += 1
+        return None
+
+
+def _timings(samples: dict) -> dict:
+    return {
+        name: {
+            "calls": len(values),
+            "total_s": round(sum(values), 6),
+            "mean_s": round(sum(values) / len(values), 6),
+        }
+        for name, values in sorted(samples.items())
+    }
+
+
+@contextmanager
+def offline_environment():
+    """
+    Disables persistent caches and model rate limits (stub calls cost no
+    quota) and runs in a scratch directory.
+    """
+    previous = (
+        config.enable_search_cache,
+        config.enable_domain_cache,
+        config.enable_roadmap_seeding,
+        config.enable_model_scheduler,
+        os.getcwd(),
+    )
+    config.enable_search_cache = False
+    config.enable_domain_cache = False
+    config.enable_roadmap_seeding = False
+    config.enable_model_scheduler = False
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            yield
+        finally:
+            os.chdir(previous[4])
+            (
+                config.enable_search_cache,
+                config.enable_domain_cache,
+                config.enable_roadmap_seeding,
+                config.enable_model_scheduler,
+            ) = previous[:4]
+
+
+async def run_conversation(
+    model: StubModel,
+    trace_memory: bool = False,
+    stream: bool = False,
+    session_service: Optional[BaseSessionService] = None,
+) -> dict:
+    """
+    Runs the standard conversation once.
+
+    Args:
+        model: Installed stub model backend
+        trace_memory: Record per-turn peak Python allocations (slower)
+        stream: Run with SSE streaming (partial events)
+        session_service: Session service to run on (defaults to a new
+            InMemorySessionService)
+
+    Returns:
+        Result dictionary for this run
+    """
+    recorder = StageRecorder()
+    session_service = session_service or InMemorySessionService()
+    session = await session_service.create_session(app_name="roadmap_bench", user_id="bench")
+    runner = Runner(
+        agent=root_agent,
+        app_name="roadmap_bench",
+        session_service=session_service,
+        plugins=[recorder, *plugins],
+    )
+
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE if stream else StreamingMode.NONE)
+    turns = []
+    traced_peak = 0
+    started = time.perf_counter()
+    for query in QUERIES:
+        if trace_memory:
+            tracemalloc.reset_peak()
+            allocated_before = tracemalloc.get_traced_memory()[0]
+        turn_started = time.perf_counter()
+        events = 0
+        first_content = None
+        async for event in runner.run_async(
+            user_id="bench",
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part.from_text(text=query)]),
+            run_config=run_config,
+        ):
+            events += 1
+            if first_content is None and event.content and any(
+                part.text for part in event.content.parts or []
+            ):
+                first_content = time.perf_counter() - turn_started
+        wall = time.perf_counter() - turn_started
+
+        current = await session_service.get_session(
+            app_name="roadmap_bench", user_id="bench", session_id=session.id
+        )
+        turn = {
+            "query": query,
+            "wall_s": round(wall, 6),
+            "first_content_s": round(first_content if first_content is not None else wall, 6),
+            "events": events,
+            "state_bytes": len(json.dumps(current.state, default=str)),
+            "session_events": len(current.events),
+        }
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            # Peak allocations made during the turn, on top of what was live before it
+            turn["peak_alloc_bytes"] = peak - allocated_before
+            traced_peak = max(traced_peak, peak)
+        turns.append(turn)
+
+    return {
+        "wall_s": round(time.perf_counter() - started, 6),
+        "traced_peak_bytes": traced_peak,
+        "session_id": session.id,
+        "turns": turns,
+        "agents": _timings(recorder.agent_seconds),
+        "tools": _timings(recorder.tool_seconds),
+        "model_calls": dict(sorted(recorder.model_calls.items())),
+        "events": dict(sorted(recorder.events.items())),
+    }
+
+
+def _median_of(runs: list, path: tuple) -> float:
+    values = []
+    for run in runs:
+        value = run
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+            if value is None:
+                break
+        if value is not None:
+            values.append(value)
+    return round(statistics.median(values), 6) if values else 0.0
+
+
+def summarize(runs: list, memory_run: Optional[dict], model: StubModel, settings: dict) -> dict:
+    """Aggregates repeated runs into one result (medians for timings)."""
+    first = runs[0]
+    return {
+        "benchmark": "e2e",
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": settings,
+        "repeat": len(runs),
+        "wall_s": _median_of(runs, ("wall_s",)),
+        "turns": [
+            {
+                **turn,
+                "wall_s": statistics.median(run["turns"][index]["wall_s"] for run in runs),
+                "first_content_s": statistics.median(
+                    run["turns"][index]["first_content_s"] for run in runs
+                ),
+                **(
+                    {"peak_alloc_bytes": memory_run["turns"][index]["peak_alloc_bytes"]}
+                    if memory_run else {}
+                ),
+            }
+            for index, turn in enumerate(first["turns"])
+        ],
+        "agents": {
+            name: {**stats, "total_s": _median_of(runs, ("agents", name, "total_s"))}
+            for name, stats in first["agents"].items()
+        },
+        "tools": {
+            name: {**stats, "total_s": _median_of(runs, ("tools", name, "total_s"))}
+            for name, stats in first["tools"].items()
+        },
+        "model_calls": first["model_calls"],
+        "events": first["events"],
+        "model": model.stats(),
+        "memory": {
+            "peak_alloc_bytes": memory_run["traced_peak_bytes"] if memory_run else None,
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            * (1 if sys.platform == "darwin" else 1024),
+        },
+    }
+
+
+def run_benchmark(
+    cassette: str = DEFAULT_CASSETTE,
+    latency: float = 0.0,
+    token_latency: float = 0.0,
+    search_latency: Optional[float] = None,
+    extra_output_tokens: int = 0,
+    repeat: int = 3,
+    trace_memory: bool = True,
+    stream: bool = False,
+) -> dict:
+    """
+    Runs the conversation `repeat` times (plus one memory-traced run).
+
+    Returns:
+        Summary dictionary (see `summarize`)
+    """
+    settings = {
+        "cassette": os.path.relpath(cassette),
+        "latency": latency,
+        "token_latency": token_latency,
+        "search_latency": search_latency,
+        "extra_output_tokens": extra_output_tokens,
+        "stream": stream,
+    }
+    runs = []
+    memory_run = None
+    with offline_environment():
+        for _ in range(repeat):
+            with StubModel(
+                cassette, latency, token_latency, search_latency, extra_output_tokens
+            ) as model:
+                runs.append(asyncio.run(run_conversation(model, stream=stream)))
+
+        if trace_memory:
+            tracemalloc.start()
+            try:
+                with StubModel(
+                    cassette, latency, token_latency, search_latency, extra_output_tokens
+                ) as memory_model:
+                    memory_run = asyncio.run(
+                        run_conversation(memory_model, trace_memory=True, stream=stream)
+                    )
+            finally:
+                tracemalloc.stop()
+
+    return summarize(runs, memory_run, model, settings)
+
+
+def compare(result: dict, baseline: dict, tolerance: float, slack: float = 0.005) -> list:
+    """
+    Lists timings that regressed against a baseline result.
+
+    A value regresses when it exceeds the baseline by more than `tolerance`
+    (relative) and `slack` seconds (absolute, to ignore timer noise).
+
+    Returns:
+        List of (name, baseline seconds, current seconds)
+    """
+    pairs = [("wall_s", baseline.get("wall_s", 0.0), result["wall_s"])]
+    for section in ("agents", "tools"):
+        for name, stats in result[section].items():
+            if name in baseline.get(section, {}):
+                pairs.append(
+                    (f"{section}.{name}", baseline[section][name]["total_s"], stats["total_s"])
+                )
+    return [
+        (name, before, after)
+        for name, before, after in pairs
+        if after > before * (1 + tolerance) and after - before > slack
+    ]
+
+
+def save_result(result: dict, path: str) -> None:
+    """Writes the result to `path` and appends it to history.jsonl next to it."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    with open(os.path.join(directory, "history.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+
+
+def print_report(result: dict) -> None:
+    print(f"Conversation wall time: {result['wall_s'] * 1000:.1f} ms "
+          f"(median of {result['repeat']})")
+    model = result["model"]
+    print(f"Model calls: {model['model_calls']}, simulated model time: "
+          f"{model['simulated_model_seconds'] * 1000:.1f} ms, tokens in/out: "
+          f"{model['input_tokens']}/{model['output_tokens']}")
+    print()
+    print(f"{'turn':<6}{'wall ms':>10}{'first ms':>10}{'events':>8}{'state KB':>10}{'peak KB':>10}")
+    for index, turn in enumerate(result["turns"], 1):
+        peak = turn.get("peak_alloc_bytes")
+        print(f"{index:<6}{turn['wall_s'] * 1000:>10.1f}"
+              f"{turn.get('first_content_s', turn['wall_s']) * 1000:>10.1f}{turn['events']:>8}"
+              f"{turn['state_bytes'] / 1024:>10.1f}"
+              f"{(peak / 1024 if peak else 0):>10.1f}")
+    print()
+    print(f"{'stage':<32}{'calls':>6}{'total ms':>10}{'events':>8}{'llm':>5}")
+    for name, stats in result["agents"].items():
+        print(f"{name:<32}{stats['calls']:>6}{stats['total_s'] * 1000:>10.1f}"
+              f"{result['events'].get(name, 0):>8}{result['model_calls'].get(name, 0):>5}")
+    for name, stats in result["tools"].items():
+        print(f"{'tool:' + name:<32}{stats['calls']:>6}{stats['total_s'] * 1000:>10.1f}")
+    memory = result["memory"]
+    print()
+    print(f"Peak Python allocations: {(memory['peak_alloc_bytes'] or 0) / 1024 / 1024:.1f} MiB, "
+          f"max RSS: {memory['max_rss_bytes'] / 1024 / 1024:.1f} MiB")
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end benchmark on the stub model")
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE,
+                        help="Recorded conversation the stub model replays")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds per model call")
+    parser.add_argument("--token-latency", type=float, default=0.0,
+                        help="Extra seconds per output token")
+    parser.add_argument("--search-latency", type=float, default=None,
+                        help="Seconds per SearchAgent call (defaults to --latency)")
+    parser.add_argument("--extra-tokens", type=int, default=0,
+                        help="Filler tokens appended to every text response")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stream", action="store_true",
+                        help="Run with SSE streaming (reports time to first content)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the memory-traced run")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "e2e.json"))
+    parser.add_argument("--baseline", help="Earlier result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown against the baseline")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Also write the metrics registry dump (Prometheus text format)")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(
+        cassette=args.cassette,
+        latency=args.latency,
+        token_latency=args.token_latency,
+        search_latency=args.search_latency,
+        extra_output_tokens=args.extra_tokens,
+        repeat=max(1, args.repeat),
+        trace_memory=not args.no_memory,
+        stream=args.stream,
+    )
+    print_report(result)
+    save_result(result, args.output)
+    print(f"\nResults written to {args.output}")
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(metrics.render())
+        print(f"Metrics written to {args.metrics}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
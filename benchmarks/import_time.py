@@ -0,0 +1,132 @@
+"""
+Import Time Benchmark
+Measures how long a fresh process takes to import the package and to build
+the agent graph, and which heavy dependencies each step loads
+
+Every scenario runs in its own interpreter (without GOOGLE_API_KEY) so
+nothing is cached between them:
+
+- package: `import roadmap_agent`
+- helpers: the ADK-free modules used by batch tooling and tests
+  (config, roadmap_model, validation, export)
+- eager: `roadmap_agent.root_agent`, i.e. google-adk plus the whole agent
+  graph, which is what importing the package used to cost
+- graph: `create_root_agent()` alone, once its modules are imported
+
+Usage:
+    python -m benchmarks.import_time [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Optional
+
+from .e2e import RESULTS_DIR, save_result
+
+HEAVY_MODULES = ("google.adk", "google.genai", "sklearn", "scipy")
+
+SCENARIOS = {
+    "package": "import roadmap_agent",
+    "helpers": (
+        "import roadmap_agent.config, roadmap_agent.roadmap_model, "
+        "roadmap_agent.validation, roadmap_agent.export"
+    ),
+    "eager": "import roadmap_agent; roadmap_agent.root_agent",
+    "graph": "create_root_agent()",
+}
+
+# Imported before the timer starts in the "graph" scenario
+_SETUP = {"graph": "from roadmap_agent.agent import create_root_agent"}
+
+_CHILD = """
+import json, sys, time
+{setup}
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": {{m: m in sys.modules for m in {modules!r}}}}}))
+"""
+
+
+def _run_child(name: str) -> dict:
+    code = _CHILD.format(
+        setup=_SETUP.get(name, ""), statement=SCENARIOS[name], modules=HEAVY_MODULES
+    )
+    env = {key: value for key, value in os.environ.items() if key != "GOOGLE_API_KEY"}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    run = json.loads(completed.stdout.strip().splitlines()[-1])
+    run["process_seconds"] = time.perf_counter() - started
+    return run
+
+
+def run_import_time(repeat: int = 5, scenarios: Optional[list] = None) -> dict:
+    """
+    Runs each scenario `repeat` times in fresh interpreters.
+
+    Args:
+        repeat: Processes started per scenario
+        scenarios: Names from `SCENARIOS` (all by default)
+
+    Returns:
+        Result dictionary with the median times and the heavy modules
+        loaded per scenario
+    """
+    result = {
+        "benchmark": "import_time",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {"repeat": repeat, "python": sys.version.split()[0]},
+        "scenarios": {},
+    }
+    for name in scenarios or list(SCENARIOS):
+        runs = [_run_child(name) for _ in range(repeat)]
+        result["scenarios"][name] = {
+            "median_s": statistics.median(run["seconds"] for run in runs),
+            "min_s": min(run["seconds"] for run in runs),
+            "process_median_s": statistics.median(run["process_seconds"] for run in runs),
+            "loaded": runs[-1]["loaded"],
+        }
+    return result
+
+
+def print_report(result: dict) -> None:
+    print(f"{'scenario':>10}{'median ms':>12}{'min ms':>10}{'process ms':>12}  heavy modules loaded")
+    for name, scenario in result["scenarios"].items():
+        loaded = ", ".join(module for module, present in scenario["loaded"].items() if present)
+        print(f"{name:>10}{scenario['median_s'] * 1000:>12.1f}{scenario['min_s'] * 1000:>10.1f}"
+              f"{scenario['process_median_s'] * 1000:>12.1f}  {loaded or '-'}")
+    scenarios = result["scenarios"]
+    if "package" in scenarios and "eager" in scenarios:
+        speedup = scenarios["eager"]["median_s"] / max(scenarios["package"]["median_s"], 1e-9)
+        print(f"\n`import roadmap_agent` is {speedup:.0f}x faster than building the agent graph eagerly")
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Package import and agent construction benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="Comma-separated scenarios to run")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "import_time.json"))
+    args = parser.parse_args(argv)
+
+    result = run_import_time(args.repeat, args.scenarios.split(","))
+    print_report(result)
+    save_result(result, args.output)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
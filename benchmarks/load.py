@@ -0,0 +1,340 @@
+"""
+Load Generator
+Runs many concurrent persona conversations against `root_agent` on one Runner
+and reports throughput, turn latency percentiles and event-loop lag
+
+Usage:
+    python -m benchmarks.load --concurrency 1,10,50 [--latency 0.5] [--live]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from roadmap_agent.agent import plugins, root_agent
+from roadmap_agent.domain_store import research_flight
+from roadmap_agent.tool_agents import search_flight
+from tests.test_agent import DEFAULT_CASSETTE
+
+from .e2e import RESULTS_DIR, offline_environment, save_result
+from .stub_model import StubModel
+
+APP_NAME = "roadmap_load"
+
+
+@dataclass
+class Persona:
+    """A simulated user profile."""
+
+    domain: str
+    level: str
+    learning_style: str
+    hours: int = 3
+
+    def queries(self, index: int) -> list:
+        """The standard six-turn conversation, filled in for this persona."""
+        slug = re.sub(r"\W+", "_", self.domain.lower()).strip("_")
+        return [
+            f"I want to prepare for a {self.domain} job",
+            f"I'm {self.level}. I prefer {self.learning_style}. "
+            f"I can dedicate {self.hours} hours per day.",
+            "This looks great! Please proceed with finding resources.",
+            "The resources look good. Can you add more hands-on projects?",
+            "Perfect! I'm ready to save this roadmap.",
+            f"{slug}_{index}_roadmap.md",
+        ]
+
+
+DEFAULT_PERSONAS = [
+    Persona("Frontend Developer", "a complete beginner with programming", "a mixed learning approach"),
+    Persona("Data Analyst", "someone with some basics in Excel and SQL", "video tutorials", 2),
+    Persona("Cloud Engineer", "an intermediate Linux user", "hands-on practice", 4),
+    Persona("Backend Developer", "a complete beginner", "reading documentation and articles"),
+]
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of `values` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a periodic sleep wakes up.
+
+    High lag means coroutines are blocking the loop (CPU-bound work or
+    synchronous I/O), which delays every concurrent session.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: list = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+async def _run_session(
+    runner: Runner,
+    model: Optional[StubModel],
+    persona: Persona,
+    index: int,
+    latencies: list,
+    errors: list,
+) -> None:
+    user_id = f"user_{index}"
+    session = await runner.session_service.create_session(app_name=APP_NAME, user_id=user_id)
+
+    async def converse():
+        for query in persona.queries(index):
+            started = time.perf_counter()
+            async for _ in runner.run_async(
+                user_id=user_id,
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part.from_text(text=query)]),
+            ):
+                pass
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        if model is None:
+            await converse()
+        else:
+            with model.session_scope(session.id):
+                await converse()
+    except Exception as e:  # keep the other sessions running
+        errors.append(f"{persona.domain} #{index}: {type(e).__name__}: {e}")
+
+
+def _flight_delta(before: dict, after: dict) -> dict:
+    calls = after["calls"] - before["calls"]
+    coalesced = after["coalesced"] - before["coalesced"]
+    return {
+        "calls": calls,
+        "coalesced": coalesced,
+        "dedup_ratio": round(coalesced / calls, 4) if calls else 0.0,
+    }
+
+
+async def run_level(
+    concurrency: int,
+    sessions: int,
+    personas: list,
+    model: Optional[StubModel],
+) -> dict:
+    """
+    Runs `sessions` conversations, at most `concurrency` at a time.
+
+    Returns:
+        Throughput, latency percentiles (seconds) and loop lag for the level
+    """
+    runner = Runner(
+        agent=root_agent,
+        app_name=APP_NAME,
+        session_service=InMemorySessionService(),
+        plugins=plugins,
+    )
+    latencies: list = []
+    errors: list = []
+    semaphore = asyncio.Semaphore(concurrency)
+    monitor = LoopLagMonitor()
+
+    async def limited(index: int):
+        async with semaphore:
+            await _run_session(
+                runner, model, personas[index % len(personas)], index, latencies, errors
+            )
+
+    flights_before = {flight.name: flight.stats() for flight in (search_flight, research_flight)}
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*[limited(index) for index in range(sessions)])
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "turns": len(latencies),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "elapsed_s": round(elapsed, 4),
+        "turns_per_s": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "sessions_per_s": round((sessions - len(errors)) / elapsed, 3) if elapsed else 0.0,
+        "latency_s": {
+            "p50": round(percentile(latencies, 0.50), 4),
+            "p95": round(percentile(latencies, 0.95), 4),
+            "p99": round(percentile(latencies, 0.99), 4),
+            "max": round(max(latencies, default=0.0), 4),
+        },
+        "loop_lag_s": {
+            "p50": round(percentile(monitor.samples, 0.50), 4),
+            "p99": round(percentile(monitor.samples, 0.99), 4),
+            "max": round(max(monitor.samples, default=0.0), 4),
+        },
+        "coalescing": {
+            flight.name: _flight_delta(flights_before[flight.name], flight.stats())
+            for flight in (search_flight, research_flight)
+        },
+    }
+
+
+def saturation_point(levels: list, min_gain: float = 0.1) -> Optional[int]:
+    """
+    First concurrency level whose throughput gain over the previous level
+    is below `min_gain` (relative), i.e. where adding sessions stops paying off.
+    """
+    for previous, current in zip(levels, levels[1:]):
+        if current["turns_per_s"] < previous["turns_per_s"] * (1 + min_gain):
+            return current["concurrency"]
+    return None
+
+
+def run_load(
+    concurrency_levels: list,
+    sessions: Optional[int] = None,
+    personas: Optional[list] = None,
+    live: bool = False,
+    cassette: str = DEFAULT_CASSETTE,
+    latency: float = 0.0,
+    token_latency: float = 0.0,
+    search_latency: Optional[float] = None,
+) -> dict:
+    """
+    Runs every concurrency level in turn.
+
+    Args:
+        concurrency_levels: Concurrent sessions per level
+        sessions: Sessions per level (defaults to the level's concurrency)
+        personas: Personas to cycle through
+        live: Use the configured Gemini models instead of the stub
+        cassette: Recording replayed by the stub model
+        latency: Stub seconds per model call
+        token_latency: Stub seconds per output token
+        search_latency: Stub seconds per SearchAgent call
+
+    Returns:
+        Result dictionary with one entry per level
+    """
+    personas = personas or DEFAULT_PERSONAS
+    levels = []
+
+    async def run_all():
+        for concurrency in concurrency_levels:
+            if live:
+                levels.append(await run_level(concurrency, sessions or concurrency, personas, None))
+                continue
+            with StubModel(cassette, latency, token_latency, search_latency) as model:
+                levels.append(await run_level(concurrency, sessions or concurrency, personas, model))
+
+    if live:
+        asyncio.run(run_all())
+    else:
+        with offline_environment():
+            asyncio.run(run_all())
+
+    return {
+        "benchmark": "load",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {
+            "backend": "live" if live else "stub",
+            "latency": latency,
+            "token_latency": token_latency,
+            "search_latency": search_latency,
+            "personas": [asdict(persona) for persona in personas],
+        },
+        "levels": levels,
+        "saturation_concurrency": saturation_point(levels),
+    }
+
+
+def print_report(result: dict) -> None:
+    print(f"{'conc':>5}{'turns':>7}{'err':>5}{'turns/s':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'lag p99':>9}{'lag max':>9}")
+    for level in result["levels"]:
+        latency, lag = level["latency_s"], level["loop_lag_s"]
+        print(f"{level['concurrency']:>5}{level['turns']:>7}{level['errors']:>5}"
+              f"{level['turns_per_s']:>9.1f}{latency['p50'] * 1000:>9.1f}"
+              f"{latency['p95'] * 1000:>9.1f}{latency['p99'] * 1000:>9.1f}"
+              f"{lag['p99'] * 1000:>9.1f}{lag['max'] * 1000:>9.1f}")
+        for sample in level["error_samples"]:
+            print(f"      ! {sample}")
+        for name, flight in level["coalescing"].items():
+            if flight["coalesced"]:
+                print(f"      {name}: {flight['coalesced']}/{flight['calls']} calls coalesced "
+                      f"({flight['dedup_ratio']:.0%})")
+    saturation = result["saturation_concurrency"]
+    print()
+    print(f"Throughput saturates at concurrency {saturation}" if saturation
+          else "No saturation within the tested levels")
+
+
+def _load_personas(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [Persona(**persona) for persona in json.load(f)]
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent multi-session load generator")
+    parser.add_argument("--concurrency", default="1,5,10,25,50",
+                        help="Comma-separated concurrency levels")
+    parser.add_argument("--sessions", type=int, default=None,
+                        help="Sessions per level (defaults to the concurrency)")
+    parser.add_argument("--personas", help="JSON list of {domain, level, learning_style, hours}")
+    parser.add_argument("--live", action="store_true", help="Use live models instead of the stub")
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    parser.add_argument("--search-latency", type=float, default=None)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "load.json"))
+    args = parser.parse_args(argv)
+
+    result = run_load(
+        concurrency_levels=[int(level) for level in args.concurrency.split(",") if level],
+        sessions=args.sessions,
+        personas=_load_personas(args.personas) if args.personas else None,
+        live=args.live,
+        cassette=args.cassette,
+        latency=args.latency,
+        token_latency=args.token_latency,
+        search_latency=args.search_latency,
+    )
+    print_report(result)
+    save_result(result, args.output)
+    print(f"\nResults written to {args.output}")
+    return 1 if any(level["errors"] for level in result["levels"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
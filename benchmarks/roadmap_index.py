@@ -0,0 +1,154 @@
+"""
+Roadmap Index Benchmark
+Measures how long the approved-roadmap store takes to ingest, rebuild its
+similarity index and look up the nearest roadmap for a profile at scale
+
+Usage:
+    python -m benchmarks.roadmap_index [--roadmaps 100000] [--queries 1000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from roadmap_agent.config import config
+from roadmap_agent.roadmap_store import RoadmapStore
+
+from .e2e import RESULTS_DIR, save_result
+from .load import percentile
+
+_FIELDS = [
+    "Frontend", "Backend", "Full Stack", "Data", "Cloud", "DevOps", "Security",
+    "Mobile", "Game", "Embedded", "Machine Learning", "QA", "Site Reliability",
+    "Database", "Blockchain", "AR/VR", "Robotics", "Network", "Platform", "BI",
+]
+_ROLES = ["Developer", "Engineer", "Analyst", "Architect", "Specialist"]
+_LEVELS = ["complete beginner", "some basics", "intermediate", "advanced"]
+_STYLES = ["video tutorials", "reading", "hands-on practice", "a mixed approach"]
+_HOURS = ["1 hour per day", "2 hours", "3 hours per day", "4 hours", "30 minutes"]
+
+
+def synthetic_profile(rng: random.Random) -> dict:
+    """A random learner profile drawn from 100 domains and common answers."""
+    return {
+        "target_domain": f"{rng.choice(_FIELDS)} {rng.choice(_ROLES)}",
+        "experience_level": rng.choice(_LEVELS),
+        "learning_style": rng.choice(_STYLES),
+        "time_commitment": rng.choice(_HOURS),
+    }
+
+
+def _roadmap_text(profile: dict, number: int) -> str:
+    weeks = "\n".join(
+        f"## Week {week}: {profile['target_domain']} part {week}\n"
+        + "".join(f"### Day {day}: Topic {number}-{week}-{day}\n" for day in range(1, 6))
+        for week in range(1, 5)
+    )
+    return f"# {profile['target_domain']} Roadmap\n\n{weeks}"
+
+
+def run_roadmap_index(roadmaps: int = 100_000, queries: int = 1000, seed: int = 0) -> dict:
+    """
+    Fills a fresh store with synthetic approved roadmaps and times it.
+
+    Args:
+        roadmaps: Number of roadmaps to store
+        queries: Number of nearest-roadmap lookups to time
+        seed: Random seed for the profiles
+
+    Returns:
+        Result dictionary with ingest, rebuild, cold-load and lookup timings
+    """
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "roadmaps.sqlite3")
+        store = RoadmapStore(path)
+
+        started = time.perf_counter()
+        profiles = [synthetic_profile(rng) for _ in range(roadmaps)]
+        store.add_many(
+            (profile, _roadmap_text(profile, number)) for number, profile in enumerate(profiles)
+        )
+        ingest_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        store.rebuild()
+        rebuild_s = time.perf_counter() - started
+        index_bytes = os.path.getsize(store.index_path)
+        store.close()
+
+        # A new process: the first lookup loads the saved index
+        store = RoadmapStore(path)
+        started = time.perf_counter()
+        store.nearest(synthetic_profile(rng))
+        cold_lookup_s = time.perf_counter() - started
+
+        latencies, matched = [], 0
+        for _ in range(queries):
+            profile = synthetic_profile(rng)
+            started = time.perf_counter()
+            match = store.nearest(profile, min_score=config.roadmap_seed_min_score)
+            latencies.append(time.perf_counter() - started)
+            matched += match is not None
+
+        # A roadmap approved after the rebuild is appended on the next lookup
+        profile = synthetic_profile(rng)
+        store.add(profile, _roadmap_text(profile, roadmaps))
+        started = time.perf_counter()
+        store.nearest(profile)
+        append_lookup_s = time.perf_counter() - started
+        store.close()
+
+    return {
+        "benchmark": "roadmap_index",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {"roadmaps": roadmaps, "queries": queries, "seed": seed},
+        "ingest_s": round(ingest_s, 4),
+        "rebuild_s": round(rebuild_s, 4),
+        "index_bytes": index_bytes,
+        "cold_lookup_s": round(cold_lookup_s, 4),
+        "append_lookup_s": round(append_lookup_s, 6),
+        "lookup_s": {
+            "mean": round(sum(latencies) / len(latencies), 6) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.50), 6),
+            "p95": round(percentile(latencies, 0.95), 6),
+            "p99": round(percentile(latencies, 0.99), 6),
+        },
+        "match_rate": matched / queries if queries else 0.0,
+    }
+
+
+def print_report(result: dict) -> None:
+    lookup = result["lookup_s"]
+    print(f"Roadmaps:       {result['settings']['roadmaps']}")
+    print(f"Ingest:         {result['ingest_s'] * 1000:.1f} ms")
+    print(f"Rebuild:        {result['rebuild_s'] * 1000:.1f} ms "
+          f"({result['index_bytes'] / 1024:.0f} KiB index)")
+    print(f"Cold lookup:    {result['cold_lookup_s'] * 1000:.1f} ms")
+    print(f"Lookup:         p50 {lookup['p50'] * 1000:.2f} ms, p95 {lookup['p95'] * 1000:.2f} ms, "
+          f"p99 {lookup['p99'] * 1000:.2f} ms")
+    print(f"After an add:   {result['append_lookup_s'] * 1000:.2f} ms")
+    print(f"Seed match rate {result['match_rate']:.0%}")
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Roadmap similarity index benchmark")
+    parser.add_argument("--roadmaps", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "roadmap_index.json"))
+    args = parser.parse_args(argv)
+
+    result = run_roadmap_index(args.roadmaps, args.queries, args.seed)
+    print_report(result)
+    save_result(result, args.output)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
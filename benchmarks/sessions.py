@@ -0,0 +1,215 @@
+"""
+Session Service Benchmark
+Compares SqliteSessionService with InMemorySessionService as the number of
+stored sessions grows: Python memory held by the service, per-turn read and
+write latency, and the standard conversation run end to end on each
+
+Every simulated session replays the events of one recorded conversation
+(stub model), turn by turn the way Runner does: read the session, then
+append the turn's events.
+
+Usage:
+    python -m benchmarks.sessions [--sessions 100,500,1000]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Optional
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+
+from roadmap_agent.config import config
+from roadmap_agent.session_store import SqliteSessionService
+from tests.test_agent import DEFAULT_CASSETTE
+
+from .e2e import RESULTS_DIR, offline_environment, run_conversation, save_result
+from .load import percentile
+from .stub_model import StubModel
+
+APP_NAME = "roadmap_sessions_bench"
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux only)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _services(directory: str) -> dict:
+    # SQLite first: resident memory never shrinks after the in-memory run
+    return {
+        "sqlite": SqliteSessionService(
+            os.path.join(directory, "sessions.sqlite3"),
+            pool_size=config.session_pool_size,
+            flush_max_events=config.session_flush_max_events,
+            flush_interval_seconds=config.session_flush_interval_seconds,
+            lazy_state_bytes=config.session_lazy_state_bytes,
+        ),
+        "memory": InMemorySessionService(),
+    }
+
+
+async def _record_turns(model: StubModel) -> list:
+    """Runs the conversation once and returns its events as JSON, grouped by turn."""
+    service = InMemorySessionService()
+    result = await run_conversation(model, session_service=service)
+    session = await service.get_session(
+        app_name="roadmap_bench", user_id="bench", session_id=result["session_id"]
+    )
+    turns: OrderedDict = OrderedDict()
+    for event in session.events:
+        turns.setdefault(event.invocation_id, []).append(
+            event.model_dump_json(exclude_none=True)
+        )
+    return list(turns.values())
+
+
+async def _fill(service, turns: list, first: int, last: int, reads: list, writes: list) -> None:
+    """Replays the recorded turns into sessions `first` .. `last - 1`."""
+    for number in range(first, last):
+        user_id = f"user-{number % 100}"
+        session = await service.create_session(
+            app_name=APP_NAME, user_id=user_id, session_id=f"session-{number}"
+        )
+        for turn in turns:
+            started = time.perf_counter()
+            session = await service.get_session(
+                app_name=APP_NAME, user_id=user_id, session_id=session.id
+            )
+            reads.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            for data in turn:
+                event = Event.model_validate_json(data)
+                event.id = Event.new_id()
+                await service.append_event(session, event)
+            writes.append((time.perf_counter() - started) / len(turn))
+    if hasattr(service, "flush"):
+        await service.flush()
+
+
+async def _scale(name: str, service, turns: list, checkpoints: list) -> dict:
+    reads: list = []
+    writes: list = []
+    levels = []
+    stored = 0
+    gc.collect()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    for checkpoint in checkpoints:
+        await _fill(service, turns, stored, checkpoint, reads, writes)
+        stored = checkpoint
+        gc.collect()
+        levels.append({
+            "sessions": checkpoint,
+            "traced_bytes": tracemalloc.get_traced_memory()[0] - baseline,
+            "rss_bytes": _rss_bytes(),
+        })
+        print(f"  {name}: {checkpoint} sessions")
+    elapsed = time.perf_counter() - started
+    return {
+        "levels": levels,
+        "fill_s": round(elapsed, 4),
+        "read_s": {"p50": round(percentile(reads, 0.5), 6), "p99": round(percentile(reads, 0.99), 6)},
+        "append_s": {"p50": round(percentile(writes, 0.5), 6), "p99": round(percentile(writes, 0.99), 6)},
+    }
+
+
+def run_sessions(checkpoints: Optional[list] = None, cassette: str = DEFAULT_CASSETTE) -> dict:
+    """
+    Benchmarks both session services.
+
+    Args:
+        checkpoints: Increasing session counts at which memory is sampled
+        cassette: Recording replayed by the stub model
+
+    Returns:
+        Result dictionary with the end-to-end run and the scaling levels per
+        service
+    """
+    checkpoints = sorted(checkpoints or [100, 500, 1000])
+    result = {
+        "benchmark": "sessions",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {
+            "checkpoints": checkpoints,
+            "flush_max_events": config.session_flush_max_events,
+            "flush_interval_seconds": config.session_flush_interval_seconds,
+            "lazy_state_bytes": config.session_lazy_state_bytes,
+        },
+        "conversation": {},
+        "services": {},
+    }
+    with offline_environment(), tempfile.TemporaryDirectory() as directory:
+        services = _services(directory)
+        with StubModel(cassette) as model:
+            turns = asyncio.run(_record_turns(model))
+        result["settings"]["events_per_session"] = sum(len(turn) for turn in turns)
+
+        for name, service in services.items():
+            # The standard conversation through Runner on this service
+            with StubModel(cassette) as model:
+                run = asyncio.run(run_conversation(model, session_service=service))
+            result["conversation"][name] = {"wall_s": run["wall_s"]}
+
+        tracemalloc.start()
+        try:
+            for name, service in services.items():
+                result["services"][name] = asyncio.run(_scale(name, service, turns, checkpoints))
+        finally:
+            tracemalloc.stop()
+        services["sqlite"].close()
+        result["services"]["sqlite"]["db_bytes"] = sum(
+            os.path.getsize(os.path.join(directory, entry)) for entry in os.listdir(directory)
+        )
+    return result
+
+
+def print_report(result: dict) -> None:
+    print(f"Events per session: {result['settings']['events_per_session']}")
+    for name, conversation in result["conversation"].items():
+        print(f"Conversation on {name}: {conversation['wall_s'] * 1000:.1f} ms")
+    print()
+    print(f"{'service':>8}{'sessions':>10}{'traced MiB':>12}{'rss MiB':>10}")
+    for name, service in result["services"].items():
+        for level in service["levels"]:
+            rss = level["rss_bytes"]
+            print(f"{name:>8}{level['sessions']:>10}{level['traced_bytes'] / 2**20:>12.1f}"
+                  f"{rss / 2**20 if rss else float('nan'):>10.1f}")
+    print()
+    for name, service in result["services"].items():
+        print(f"{name}: fill {service['fill_s']:.1f} s, "
+              f"read p50 {service['read_s']['p50'] * 1000:.2f} ms / p99 {service['read_s']['p99'] * 1000:.2f} ms, "
+              f"append p50 {service['append_s']['p50'] * 1e6:.0f} us / p99 {service['append_s']['p99'] * 1e6:.0f} us")
+    if "db_bytes" in result["services"].get("sqlite", {}):
+        print(f"sqlite database: {result['services']['sqlite']['db_bytes'] / 2**20:.1f} MiB")
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="SQLite vs in-memory session service benchmark")
+    parser.add_argument("--sessions", default="100,500,1000",
+                        help="Comma-separated session counts at which memory is sampled")
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "sessions.json"))
+    args = parser.parse_args(argv)
+
+    result = run_sessions([int(level) for level in args.sessions.split(",")], args.cassette)
+    print_report(result)
+    save_result(result, args.output)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
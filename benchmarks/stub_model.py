@@ -0,0 +1,146 @@
+"""
+Stub Model Backend
+Replays the recorded conversation with simulated model latency and output size
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from roadmap_agent.cassette import Cassette, agent_name
+from roadmap_agent.tool_agents import SEARCH_AGENT_NAME
+
+_FILLER = "lorem"
+
+# Replay position owner for the current task (one per simulated session)
+_scope: ContextVar[Optional[str]] = ContextVar("stub_model_scope", default=None)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _request_text(llm_request: LlmRequest) -> str:
+    return "".join(
+        part.text or ""
+        for content in llm_request.contents
+        for part in content.parts or []
+    )
+
+
+class StubModel(Cassette):
+    """
+    Cassette replay that behaves like a slow model.
+
+    Every call waits `latency` seconds plus `token_latency` per output token
+    (SearchAgent calls use `search_latency` instead of `latency`, standing in
+    for the search tool); streamed calls wait `latency` before the first
+    chunk and `token_latency` per token of each chunk. Text responses can be padded with
+    `extra_output_tokens` filler tokens, and every response reports estimated
+    token usage.
+
+    Calls made inside `session_scope()` get their own replay position, so
+    many concurrent sessions can replay the same recording.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        latency: float = 0.0,
+        token_latency: float = 0.0,
+        search_latency: Optional[float] = None,
+        extra_output_tokens: int = 0,
+    ):
+        # Benchmark variants change requests on purpose, so mismatches are expected
+        super().__init__(path, mode="replay", match="order")
+        self.latency = latency
+        self.token_latency = token_latency
+        self.search_latency = latency if search_latency is None else search_latency
+        self.extra_output_tokens = extra_output_tokens
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.simulated_seconds = 0.0
+        self._scoped: dict = {}
+
+    @contextmanager
+    def session_scope(self, name: str) -> Iterator[None]:
+        """Replays the recording from the start for calls made inside the block."""
+        token = _scope.set(name)
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+            self._scoped.pop(name, None)
+
+    def _cursor(self):
+        scope = _scope.get()
+        if scope is None:
+            return super()._cursor()
+        if scope not in self._scoped:
+            self._scoped[scope] = self._new_cursor()
+        return self._scoped[scope]
+
+    def replay(self, llm_request: LlmRequest) -> list[LlmResponse]:
+        responses = super().replay(llm_request)
+        input_tokens = estimate_tokens(_request_text(llm_request))
+
+        for response in responses:
+            parts = response.content.parts if response.content else None
+            if not parts:
+                continue
+            text_parts = [part for part in parts if part.text]
+            if text_parts and self.extra_output_tokens:
+                text_parts[-1].text += "\n\n" + " ".join([_FILLER] * self.extra_output_tokens)
+            output_tokens = sum(estimate_tokens(part.text) for part in text_parts)
+            if not text_parts:
+                output_tokens = estimate_tokens(str(parts))
+            response.usage_metadata = types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=input_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=input_tokens + output_tokens,
+            )
+            self.output_tokens += output_tokens
+
+        self.calls += 1
+        self.input_tokens += input_tokens
+        return responses
+
+    def replay_delay(self, llm_request: LlmRequest, responses: list[LlmResponse]) -> float:
+        is_search = agent_name(llm_request) == SEARCH_AGENT_NAME
+        base = self.search_latency if is_search else self.latency
+        tokens = sum(
+            response.usage_metadata.candidates_token_count or 0
+            for response in responses
+            if response.usage_metadata
+        )
+        delay = base + self.token_latency * tokens
+        self.simulated_seconds += delay
+        return delay
+
+    def chunk_delay(self, llm_request: LlmRequest, piece: LlmResponse, first: bool) -> float:
+        if piece.partial:
+            tokens = sum(estimate_tokens(part.text or "") for part in piece.content.parts)
+        else:
+            usage = piece.usage_metadata
+            tokens = (usage.candidates_token_count or 0) if usage else 0
+        delay = self.token_latency * tokens
+        if first:
+            is_search = agent_name(llm_request) == SEARCH_AGENT_NAME
+            delay += self.search_latency if is_search else self.latency
+        self.simulated_seconds += delay
+        return delay
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "model_calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "simulated_model_seconds": round(self.simulated_seconds, 4),
+        }
+
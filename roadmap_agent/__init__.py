@@ -1,6 +1,14 @@
+from importlib import import_module
 
+from roadmap_agent.lazy import lazy_attributes
 
-from roadmap_agent.agent import root_agent
-from roadmap_agent.tool_agents import search_agent
+__all__ = ["root_agent", "search_agent", "create_root_agent", "create_app"]
 
-__all__ = ["root_agent", "search_agent"]
\ No newline at end of file
+# Importing the package stays cheap: google-adk is loaded and the agent
+# graph built the first time one of these names is used
+__getattr__ = lazy_attributes(globals(), {
+    "root_agent": lambda: import_module("roadmap_agent.agent").root_agent,
+    "create_root_agent": lambda: import_module("roadmap_agent.agent").create_root_agent,
+    "create_app": lambda: import_module("roadmap_agent.agent").create_app,
+    "search_agent": lambda: import_module("roadmap_agent.tool_agents").search_agent,
+})
\ No newline at end of file
@@ -3,32 +3,58 @@
 """
 Main Roadmap Agent - Career Preparation Roadmap Generator
 Orchestrates sub-agents to create personalized 4-week job prep roadmaps
+
+The agent graph is built on first access to `root_agent`, `app` or
+`plugins` (or explicitly with `create_root_agent` / `create_app`), not when
+the module is imported.
 """
 
 import datetime
 from google.adk.agents import Agent
-from google.adk.tools import FunctionTool, agent_tool
+from google.adk.apps import App
+from google.adk.tools import FunctionTool
 
-from .config import config
-from .tool_agents import search_agent 
+from .agent_utils import with_config
+from .config import RoadmapConfiguration, config, configure_environment
+from .lazy import lazy_attributes
+from .model_scheduler import scheduled_model
+from .tool_agents import create_search_tool
 from .sub_agents import (
-    domain_researcher,
-    robust_roadmap_planner,
-    resource_curator,
-    practice_advisor,
-    roadmap_editor,
+    create_domain_researcher,
+    create_robust_roadmap_planner,
+    create_resource_curator,
+    create_practice_advisor,
+    create_roadmap_editor,
+    create_resource_practice_stage,
 )
 from .tools import (
+    record_user_profile,
     analyze_job_market,
     find_learning_resources,
     save_roadmap_to_file,
 )
+from .history_compaction import HistoryCompactionPlugin, history_compaction_plugin
+from .instrumentation import instrumentation_plugin
+
+_PARALLEL_ENRICHMENT_STEPS = """    5-6. **Curate Resources & Add Practice:** Once the roadmap is approved, use the
+       `resource_practice_stage` agent. It finds specific learning materials
+       (videos, articles, courses) matching the user's learning style preference and
+       recommends hands-on projects, coding challenges, and practice exercises for
+       each week at the same time.
+    
+"""
+
+_SEQUENTIAL_ENRICHMENT_STEPS = """    5. **Curate Resources:** Use the `resource_curator` to find specific learning materials 
+       (videos, articles, courses) matching the user's learning style preference.
+    
+    6. **Add Practice:** Use the `practice_advisor` to recommend hands-on projects, 
+       coding challenges, and practice exercises for each week.
+    
+"""
+
 
-interactive_roadmap_agent = Agent(
-    name="interactive_roadmap_agent",
-    model=config.worker_model,
-    description="Career preparation roadmap assistant that creates personalized 4-week study plans for job seekers.",
-    instruction=f"""
+def _instruction(enrichment_steps: str) -> str:
+    return f"""
     You are a career preparation assistant specializing in creating personalized 4-week roadmaps for job seekers.
     
     Your workflow is as follows:
@@ -42,6 +68,7 @@ interactive_roadmap_agent = Agent(
          c) Hands-on practice (projects, coding challenges)
          d) Mixed approach (combination of all)
        - Time commitment per day (e.g., 2 hours, 4 hours)
+       Once you have all four answers, record them with `record_user_profile`.
     
     2. **Research Domain:** Use the `domain_researcher` agent to analyze current job market requirements,
        key skills, technologies, and interview topics for the specified domain.
@@ -55,13 +82,7 @@ interactive_roadmap_agent = Agent(
        - Additional or fewer topics
        Continue refining until approved.
     
-    5. **Curate Resources:** Use the `resource_curator` to find specific learning materials 
-       (videos, articles, courses) matching the user's learning style preference.
-    
-    6. **Add Practice:** Use the `practice_advisor` to recommend hands-on projects, 
-       coding challenges, and practice exercises for each week.
-    
-    7. **Review & Edit:** Present the complete roadmap with resources. 
+{enrichment_steps}    7. **Review & Edit:** Present the complete roadmap with resources. 
        Use `roadmap_editor` to make any final adjustments based on user feedback.
     
     8. **Export:** When approved, ask for a filename and save using `save_roadmap_to_file`.
@@ -76,21 +97,82 @@ interactive_roadmap_agent = Agent(
     - Suggest weekend projects for hands-on experience
     
     Current date: {datetime.datetime.now().strftime("%Y-%m-%d")}
-    """,
-    sub_agents=[
-        domain_researcher,
-        robust_roadmap_planner,
-        resource_curator,
-        practice_advisor,
-        roadmap_editor,
-    ],
-    tools=[
-        FunctionTool(analyze_job_market),
-        FunctionTool(find_learning_resources),
-        FunctionTool(save_roadmap_to_file),
-        agent_tool.AgentTool(agent=search_agent),  
-    ],
-    output_key="final_roadmap",
-)
+    """
+
+
+def create_root_agent(config: RoadmapConfiguration = config) -> Agent:
+    """
+    Builds the orchestrator and all of its sub-agents.
+
+    Each call returns a new agent graph, so graphs for different
+    configurations can be used side by side. The configuration decides how
+    the graph is built (models, parallel or sequential enrichment, sharded
+    curation, incremental editing) and is bound into its agents, tools and
+    callbacks, which read runtime switches such as caching, checkpoints and
+    validation rules from it. Process-wide stores (caches, the resource
+    index, the model scheduler) are shared by every graph.
+
+    Args:
+        config: Configuration to build the graph for
+
+    Returns:
+        The `interactive_roadmap_agent`
+    """
+    configure_environment()
+    if config.parallel_enrichment:
+        enrichment_steps = _PARALLEL_ENRICHMENT_STEPS
+        enrichment_agents = [create_resource_practice_stage(config)]
+    else:
+        enrichment_steps = _SEQUENTIAL_ENRICHMENT_STEPS
+        enrichment_agents = [create_resource_curator(config), create_practice_advisor(config)]
+
+    return Agent(
+        name="interactive_roadmap_agent",
+        model=scheduled_model(config.worker_model, config),
+        description="Career preparation roadmap assistant that creates personalized 4-week study plans for job seekers.",
+        instruction=_instruction(enrichment_steps),
+        sub_agents=[
+            create_domain_researcher(config),
+            create_robust_roadmap_planner(config),
+            *enrichment_agents,
+            create_roadmap_editor(config),
+        ],
+        tools=[
+            FunctionTool(record_user_profile),
+            FunctionTool(analyze_job_market),
+            FunctionTool(with_config(find_learning_resources, config)),
+            FunctionTool(save_roadmap_to_file),
+            create_search_tool(config),
+        ],
+        output_key="final_roadmap",
+    )
+
+
+def create_plugins(config: RoadmapConfiguration = config) -> list:
+    """Runner plugins enabled by a configuration."""
+    plugins = [instrumentation_plugin] if config.enable_instrumentation else []
+    if config.enable_history_compaction:
+        # The shared plugin is the one whose stats instrumentation reports
+        plugins.append(
+            history_compaction_plugin
+            if config is history_compaction_plugin.config
+            else HistoryCompactionPlugin(config)
+        )
+    return plugins
+
+
+def create_app(config: RoadmapConfiguration = config) -> App:
+    """Bundles a new agent graph with its plugins for `adk web` / `adk run`."""
+    return App(name="roadmap_agent", root_agent=create_root_agent(config), plugins=create_plugins(config))
+
+
+def _default_app() -> App:
+    # Shares the graph and plugins behind `root_agent` and `plugins`
+    return App(name="roadmap_agent", root_agent=__getattr__("root_agent"), plugins=__getattr__("plugins"))
+
 
-root_agent = interactive_roadmap_agent
\ No newline at end of file
+__getattr__ = lazy_attributes(globals(), {
+    "root_agent": create_root_agent,
+    "plugins": create_plugins,
+    "app": _default_app,
+})
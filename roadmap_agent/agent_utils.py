@@ -2,8 +2,29 @@
 Utility functions for agents
 """
 
+import functools
+import inspect
+from typing import Callable, Optional
+
+from google.adk.agents import BaseAgent
 from google.adk.agents.callback_context import CallbackContext
-from google.genai.types import Content
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+
+from .config import RoadmapConfiguration
+from .roadmap_model import digest, parse_roadmap, structure_key
+
+# State keys holding roadmap-shaped markdown that get a parsed twin in state
+STRUCTURED_KEYS = (
+    "roadmap_outline",
+    "final_roadmap",
+    "learning_resources",
+    "practice_activities",
+)
+
+# State keys written by `record_user_profile`
+PROFILE_KEYS = ("target_domain", "experience_level", "learning_style", "time_commitment")
 
 
 def suppress_output_callback(callback_context: CallbackContext) -> Content:
@@ -17,4 +38,117 @@ def suppress_output_callback(callback_context: CallbackContext) -> Content:
     Returns:
         Empty Content object to suppress output
     """
-    return Content()
\ No newline at end of file
+    return Content()
+
+
+def with_config(function: Callable, config: RoadmapConfiguration) -> Callable:
+    """
+    Binds a configuration to a callback or tool function's `config` parameter.
+
+    Agent factories use it so a graph's callbacks and tools read the
+    configuration the graph was built with. The result keeps the function's
+    name, docstring and sync/async kind, and its signature without `config`,
+    so ADK builds the same tool declaration as for the plain function.
+    
+    Args:
+        function: Function with a `config` keyword parameter
+        config: Configuration to bind
+    
+    Returns:
+        Function to pass to an agent or `FunctionTool`
+    """
+    bound = functools.partial(function, config=config)
+    if inspect.iscoroutinefunction(function):
+        async def wrapper(*args, **kwargs):
+            return await bound(*args, **kwargs)
+    else:
+        def wrapper(*args, **kwargs):
+            return bound(*args, **kwargs)
+
+    functools.update_wrapper(wrapper, function)
+    signature = inspect.signature(function)
+    wrapper.__signature__ = signature.replace(
+        parameters=[param for name, param in signature.parameters.items() if name != "config"]
+    )
+    wrapper.__annotations__ = {
+        name: annotation for name, annotation in function.__annotations__.items() if name != "config"
+    }
+    return wrapper
+
+
+def learner_profile(state) -> dict:
+    """Returns the profile fields recorded in `state` (unset ones left out)."""
+    return {key: state[key] for key in PROFILE_KEYS if state.get(key)}
+
+
+def store_roadmap_structure(callback_context: CallbackContext) -> None:
+    """
+    Stores the parsed structure of every roadmap-shaped state value that
+    changed, under `<key>_structure`, so downstream steps can skip re-parsing.
+    
+    Args:
+        callback_context: Context from the agent callback
+    """
+    state = callback_context.state
+    for key in STRUCTURED_KEYS:
+        text = state.get(key)
+        if not text:
+            continue
+        stored = state.get(structure_key(key))
+        if stored and stored.get("digest") == digest(text):
+            continue
+        state[structure_key(key)] = parse_roadmap(text).to_dict()
+    return None
+
+
+async def run_agent_isolated(
+    agent: BaseAgent,
+    request: str,
+    state: Optional[dict] = None,
+    plugins: Optional[list] = None,
+    user_id: str = "roadmap_agent",
+) -> tuple[str, dict]:
+    """
+    Runs an agent to completion in a throwaway in-memory session.
+
+    Used for work that happens outside the conversation (background refreshes,
+    per-shard generation) so it never touches the caller's session history.
+    
+    Args:
+        agent: Agent to run; must not be attached to a parent agent
+        request: User message sent to the agent
+        state: Initial session state
+        plugins: Runner plugins to forward (e.g. from the parent invocation)
+        user_id: User id for the throwaway session
+    
+    Returns:
+        Tuple of (final response text, final session state)
+    """
+    runner = Runner(
+        app_name=agent.name,
+        agent=agent,
+        session_service=InMemorySessionService(),
+        plugins=list(plugins or []),
+    )
+    session = await runner.session_service.create_session(
+        app_name=agent.name, user_id=user_id, state=dict(state or {})
+    )
+
+    last_text = ""
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session.id,
+        new_message=Content(role="user", parts=[Part.from_text(text=request)]),
+    ):
+        if event.content and event.content.parts:
+            text = "".join(
+                part.text for part in event.content.parts
+                if part.text and not part.thought
+            )
+            if text:
+                last_text = text
+
+    session = await runner.session_service.get_session(
+        app_name=agent.name, user_id=user_id, session_id=session.id
+    )
+    return last_text, dict(session.state)
@@ -0,0 +1,335 @@
+"""
+Batch Roadmap Generation
+Generates roadmaps for a JSONL file of learner profiles without the chat flow
+
+Each profile runs research -> plan -> curate + practice -> export on a
+bounded worker pool. Progress is appended to `batch_progress.jsonl` in the
+output directory, so rerunning the same command after a crash skips the
+profiles that were already exported:
+
+    python -m roadmap_agent.batch cohort.jsonl --output-dir roadmaps/ --workers 4
+
+Profile records accept `domain` (or `target_domain`), `level`
+(`experience_level`), `style` (`learning_style`) and `hours` per day
+(`time_commitment`), plus an optional `id` used (slugged) as the output
+filename.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from typing import Optional
+
+from google.adk.agents import SequentialAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+
+from .agent import create_plugins
+from .agent_utils import run_agent_isolated
+from .config import RoadmapConfiguration, config, configure_environment
+from .domain_store import normalize_domain, normalize_level
+from .model_scheduler import call_priority
+from .roadmap_model import approved_roadmap, digest
+from .sub_agents import (
+    create_domain_researcher,
+    create_practice_advisor,
+    create_resource_curator,
+    create_resource_practice_stage,
+    create_robust_roadmap_planner,
+)
+from .tools import save_roadmap_to_file
+from .validation import roadmap_issues
+
+APP_NAME = "roadmap_batch"
+PROGRESS_FILE = "batch_progress.jsonl"
+
+_FIELD_ALIASES = {
+    "target_domain": ("target_domain", "domain"),
+    "experience_level": ("experience_level", "level"),
+    "learning_style": ("learning_style", "style"),
+    "time_commitment": ("time_commitment", "hours", "hours_per_day"),
+}
+_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def create_pipeline(config: RoadmapConfiguration = config) -> SequentialAgent:
+    """Builds the conversation's planning and enrichment stages as one pipeline."""
+    return SequentialAgent(
+        name="batch_roadmap_pipeline",
+        description="Plans and enriches one roadmap without user interaction.",
+        sub_agents=[
+            create_robust_roadmap_planner(config),
+            *(
+                [create_resource_practice_stage(config)]
+                if config.parallel_enrichment
+                else [create_resource_curator(config), create_practice_advisor(config)]
+            ),
+        ],
+    )
+
+
+def profile_slug(profile_id: str) -> str:
+    """Filename-safe form of a profile id (lowercase words joined by "-")."""
+    return _SLUG.sub("-", str(profile_id).lower()).strip("-")
+
+
+def read_profiles(path: str) -> list:
+    """
+    Reads learner profiles from a JSONL file.
+
+    Args:
+        path: JSONL file with one profile record per line
+
+    Returns:
+        List of (profile id, profile) pairs in file order
+    """
+    profiles = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            profile = {}
+            for key, aliases in _FIELD_ALIASES.items():
+                value = next((record[alias] for alias in aliases if record.get(alias)), None)
+                if value is not None:
+                    profile[key] = value
+            if not profile.get("target_domain"):
+                raise ValueError(f"Profile without a domain in {path}: {line.strip()}")
+            if isinstance(profile.get("time_commitment"), (int, float)):
+                profile["time_commitment"] = f"{profile['time_commitment']} hours per day"
+
+            # Ids name the output files, so they can't contain paths
+            profile_id = profile_slug(record.get("id") or "")
+            if not profile_id:
+                slug = profile_slug(profile["target_domain"])
+                profile_id = f"{slug}-{digest(json.dumps(profile, sort_keys=True))[:8]}"
+            profiles.append((profile_id, profile))
+    return profiles
+
+
+def load_progress(output_dir: str) -> dict:
+    """Returns the last recorded progress entry per profile id."""
+    path = os.path.join(output_dir, PROGRESS_FILE)
+    progress = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by a crash
+                    continue
+                progress[entry["id"]] = entry
+    return progress
+
+
+def _record_progress(output_dir: str, entry: dict) -> None:
+    with open(os.path.join(output_dir, PROGRESS_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _profile_lines(profile: dict) -> str:
+    return "\n".join(
+        f"- {key.replace('_', ' ').title()}: {value}" for key, value in profile.items()
+    )
+
+
+class BatchRun:
+    """
+    One batch: the shared runner, the per-domain research tasks and the
+    output directory.
+
+    Research for a domain and level runs once per batch; every profile
+    with the same domain and level awaits the same task. The researcher
+    itself still goes through the cross-session domain cache, so batches
+    also reuse analyses from earlier batches and conversations.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        format_type: str = "markdown",
+        config: RoadmapConfiguration = config,
+    ):
+        configure_environment()
+        self.output_dir = output_dir
+        self.format_type = format_type
+        self.config = config
+        self.plugins = create_plugins(config)
+        self.researcher = create_domain_researcher(config)
+        self.runner = Runner(
+            app_name=APP_NAME,
+            agent=create_pipeline(config),
+            session_service=InMemorySessionService(),
+            plugins=list(self.plugins),
+        )
+        self._research: dict = {}
+
+    async def research(self, profile: dict) -> str:
+        """Returns the domain analysis for a profile, shared within the batch."""
+        domain, level = profile["target_domain"], profile.get("experience_level")
+        key = (normalize_domain(domain), normalize_level(level))
+        task = self._research.get(key)
+        if task is None or (task.done() and (task.cancelled() or task.exception())):
+            task = asyncio.ensure_future(self._run_research(domain, level, profile))
+            self._research[key] = task
+        return await task
+
+    async def _run_research(self, domain: str, level: Optional[str], profile: dict) -> str:
+        _, state = await run_agent_isolated(
+            self.researcher,
+            f"Research the current job market for the {domain} role "
+            f"at the {level or 'entry'} level.",
+            state=profile,
+            plugins=self.plugins,
+            user_id=APP_NAME,
+        )
+        return state.get("domain_analysis") or ""
+
+    async def generate(self, profile_id: str, profile: dict) -> dict:
+        """
+        Generates and exports the roadmap for one profile.
+
+        Args:
+            profile_id: Output filename; must be a slug (see `profile_slug`)
+            profile: Learner profile
+
+        Returns:
+            Progress entry for the profile
+        """
+        if profile_slug(profile_id) != profile_id:
+            raise ValueError(f"Profile id is not a filename-safe slug: {profile_id!r}")
+        started = time.perf_counter()
+        # Batch calls queue behind interactive turns sharing the quota
+        with call_priority("batch"):
+            analysis = await self.research(profile)
+
+            session = await self.runner.session_service.create_session(
+                app_name=APP_NAME,
+                user_id=APP_NAME,
+                state={**profile, "domain_analysis": analysis},
+            )
+            message = (
+                f"Create a 4-week preparation roadmap for this learner. The profile is "
+                f"final; do not ask questions.\n\nLearner profile:\n{_profile_lines(profile)}"
+                f"\n\nDomain analysis:\n{analysis or '(not available)'}"
+            )
+            # Sessions are dropped once read, so a large cohort doesn't pile
+            # up roadmaps and event histories in the session service
+            try:
+                async for _ in self.runner.run_async(
+                    user_id=APP_NAME,
+                    session_id=session.id,
+                    new_message=Content(role="user", parts=[Part.from_text(text=message)]),
+                ):
+                    pass
+                state = (await self.runner.session_service.get_session(
+                    app_name=APP_NAME, user_id=APP_NAME, session_id=session.id
+                )).state
+            finally:
+                await self.runner.session_service.delete_session(
+                    app_name=APP_NAME, user_id=APP_NAME, session_id=session.id
+                )
+
+        roadmap = approved_roadmap(state)
+        if roadmap is None:
+            raise RuntimeError("The planner produced no roadmap")
+        sections = [roadmap.source.strip()]
+        if state.get("learning_resources"):
+            sections.append(f"# Learning Resources\n\n{state['learning_resources'].strip()}")
+        if state.get("practice_activities"):
+            sections.append(f"# Practice Activities\n\n{state['practice_activities'].strip()}")
+
+        saved = await save_roadmap_to_file(
+            "\n\n".join(sections),
+            os.path.join(self.output_dir, profile_id),
+            self.format_type,
+        )
+        if saved["status"] != "success":
+            raise RuntimeError(saved["message"])
+        return {
+            "id": profile_id,
+            "status": "done",
+            "path": saved["path"],
+            "issues": len(roadmap_issues(roadmap, self.config)),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+async def run_batch(
+    profiles: list,
+    output_dir: str,
+    workers: int = 4,
+    format_type: str = "markdown",
+    config: RoadmapConfiguration = config,
+) -> dict:
+    """
+    Generates roadmaps for many profiles, resuming an earlier run.
+
+    Profiles already recorded as done in the output directory's progress
+    file are skipped; failed ones are retried.
+
+    Args:
+        profiles: (profile id, profile) pairs, see `read_profiles`
+        output_dir: Directory for the exported roadmaps and the progress file
+        workers: Profiles generated at the same time
+        format_type: Export format ("markdown" or "json")
+        config: Configuration the batch's agents and plugins are built with
+
+    Returns:
+        Summary with done, skipped and failed counts
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    progress = load_progress(output_dir)
+    pending = [
+        (profile_id, profile) for profile_id, profile in profiles
+        if progress.get(profile_id, {}).get("status") != "done"
+    ]
+    batch = BatchRun(output_dir, format_type, config)
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in pending:
+        queue.put_nowait(item)
+    summary = {"total": len(profiles), "skipped": len(profiles) - len(pending), "done": 0, "failed": 0}
+
+    async def worker() -> None:
+        while not queue.empty():
+            profile_id, profile = queue.get_nowait()
+            try:
+                entry = await batch.generate(profile_id, profile)
+            except Exception as error:
+                entry = {"id": profile_id, "status": "failed", "error": f"{type(error).__name__}: {error}"}
+            summary[entry["status"]] += 1
+            await asyncio.to_thread(_record_progress, output_dir, entry)
+            print(f"[{summary['done'] + summary['failed']}/{len(pending)}] {profile_id}: {entry['status']}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(max(1, min(workers, len(pending))))])
+    summary["wall_s"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Batch roadmap generation from JSONL profiles")
+    parser.add_argument("profiles", help="JSONL file of learner profiles")
+    parser.add_argument("--output-dir", default="batch_roadmaps")
+    parser.add_argument("--workers", type=int, default=config.batch_workers)
+    parser.add_argument("--format", choices=["markdown", "json"], default="markdown")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(run_batch(
+        read_profiles(args.profiles), args.output_dir, args.workers, args.format
+    ))
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+LLM Cassettes
+Record model (and SearchAgent) responses to a file and replay them offline
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import deque
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.google_llm import Gemini
+from google.adk.models.registry import LLMRegistry
+from google.genai.types import Content, Part
+
+CASSETTE_VERSION = 1
+
+# Size of the text chunks a streamed replay is cut into
+STREAM_CHUNK_CHARS = 160
+
+# ADK adds this line to every agent's system instruction
+_AGENT_NAME = re.compile(r'internal name is "([^"]+)"')
+
+_active: Optional["Cassette"] = None
+
+logger = logging.getLogger(__name__)
+
+
+class CassetteMiss(LookupError):
+    """Raised when a replayed run makes a model call the cassette doesn't have."""
+
+
+def agent_name(llm_request: LlmRequest) -> str:
+    """Returns the name of the agent that built a request."""
+    config = llm_request.config
+    match = _AGENT_NAME.search(str(config.system_instruction or "")) if config else None
+    return match.group(1) if match else ""
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    """
+    Hashes the parts of a request that identify a model call.
+
+    The system instruction is left out (it embeds the current date), as are
+    function call ids, which are generated per run. The working directory
+    (part of the paths tools report) is replaced by a placeholder.
+
+    Args:
+        llm_request: Outgoing model request
+
+    Returns:
+        Hex digest
+    """
+    parts = []
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                parts.append([content.role, "text", part.text])
+            elif part.function_call:
+                parts.append([content.role, "call", part.function_call.name, part.function_call.args])
+            elif part.function_response:
+                parts.append([
+                    content.role,
+                    "response",
+                    part.function_response.name,
+                    part.function_response.response,
+                ])
+    payload = json.dumps(
+        {"agent": agent_name(llm_request), "model": llm_request.model, "contents": parts},
+        sort_keys=True,
+        default=str,
+    ).replace(json.dumps(os.getcwd())[1:-1], "<cwd>")
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _ReplayCursor:
+    """Tracks which recordings of a cassette a replay has used."""
+
+    def __init__(self, interactions: list[dict]):
+        self.by_key: dict[str, deque] = {}
+        self.by_agent: dict[str, deque] = {}
+        self.used: set[int] = set()
+        for index, interaction in enumerate(interactions):
+            self.by_key.setdefault(interaction["key"], deque()).append(index)
+            self.by_agent.setdefault(interaction["agent"], deque()).append(index)
+
+    def next_unused(self, queue: Optional[deque]) -> Optional[int]:
+        while queue:
+            index = queue.popleft()
+            if index not in self.used:
+                return index
+        return None
+
+
+class Cassette:
+    """
+    A file of recorded model calls.
+
+    In "record" mode every call goes to `backend` and its responses are kept;
+    `save()` writes them out. In "replay" mode calls are answered from the
+    file by exact request match. What happens when no recording matches
+    depends on `match`:
+
+    - "strict": `CassetteMiss` is raised, so a changed prompt fails the run
+    - "warn" (default): the next unused recording of the same agent is
+      replayed and a warning names the agent
+    - "order": the same fallback without the warning, for runs that vary
+      the requests on purpose (the benchmarks' stub model)
+
+    Use as a context manager, which installs the cassette for every Gemini
+    model name and saves recordings on exit.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", backend: type = Gemini, match: str = "warn"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if match not in ("strict", "warn", "order"):
+            raise ValueError(f"Unknown cassette match: {match}")
+        self.path = path
+        self.mode = mode
+        self.backend = backend
+        self.match = match
+        self.interactions: list[dict] = []
+        self.exact_hits = 0
+        self.order_hits = 0
+        self._replay = _ReplayCursor([])
+
+        if mode == "replay":
+            self.load()
+
+    def load(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}")
+
+        self.interactions = data["interactions"]
+        self._replay = self._new_cursor()
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": CASSETTE_VERSION, "interactions": self.interactions},
+                f,
+                indent=1,
+                ensure_ascii=False,
+            )
+            f.write("\n")
+
+    def _cursor(self) -> _ReplayCursor:
+        """Replay position used for the current call."""
+        return self._replay
+
+    def _new_cursor(self) -> _ReplayCursor:
+        return _ReplayCursor(self.interactions)
+
+    def replay(self, llm_request: LlmRequest) -> list[LlmResponse]:
+        """
+        Returns the recorded responses for a request.
+
+        Raises:
+            CassetteMiss: If no recording matches the request (with
+                match="strict") or none is left for the request's agent
+        """
+        name = agent_name(llm_request)
+        cursor = self._cursor()
+        index = cursor.next_unused(cursor.by_key.get(request_key(llm_request)))
+        if index is not None:
+            self.exact_hits += 1
+        else:
+            if self.match == "strict":
+                raise CassetteMiss(f"No recorded model call matches a request from {name!r} in {self.path}")
+            if self.match == "warn":
+                logger.warning(
+                    "No recorded model call matches a request from %r in %s; replaying the "
+                    "agent's next recording (re-record the cassette if the prompts changed)",
+                    name,
+                    self.path,
+                )
+            index = cursor.next_unused(cursor.by_agent.get(name))
+            if index is None:
+                raise CassetteMiss(f"No recorded model call left for agent {name!r} in {self.path}")
+            self.order_hits += 1
+
+        cursor.used.add(index)
+        return [
+            LlmResponse.model_validate(response)
+            for response in self.interactions[index]["responses"]
+        ]
+
+    def replay_delay(self, llm_request: LlmRequest, responses: list[LlmResponse]) -> float:
+        """Seconds to wait before returning replayed responses (none by default)."""
+        return 0.0
+
+    def chunk_delay(self, llm_request: LlmRequest, piece: LlmResponse, first: bool) -> float:
+        """Seconds to wait before each piece of a streamed replay (none by default)."""
+        return 0.0
+
+    async def stream(
+        self, llm_request: LlmRequest, responses: list[LlmResponse]
+    ) -> AsyncGenerator[LlmResponse, None]:
+        """
+        Replays responses the way a streaming (SSE) backend returns them:
+        text in partial chunks followed by the aggregated response, other
+        responses (function calls) as they are.
+        """
+        first = True
+        for response in responses:
+            parts = response.content.parts if response.content else None
+            text = "".join(part.text for part in parts or [] if part.text and not part.thought)
+            pieces = [
+                LlmResponse(
+                    content=Content(role="model", parts=[Part.from_text(text=chunk)]),
+                    partial=True,
+                )
+                for chunk in (
+                    text[start:start + STREAM_CHUNK_CHARS]
+                    for start in range(0, len(text), STREAM_CHUNK_CHARS)
+                )
+            ] or [response]
+            for piece in pieces:
+                delay = self.chunk_delay(llm_request, piece, first)
+                first = False
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                yield piece
+            if pieces[0] is not response:
+                yield response
+
+    def record(self, llm_request: LlmRequest) -> list:
+        """
+        Starts recording a model call.
+
+        The entry is added when the call starts, so recordings of one agent
+        keep the order in which that agent made its calls.
+
+        Returns:
+            List to append the call's serialized responses to
+        """
+        interaction = {
+            "agent": agent_name(llm_request),
+            "model": llm_request.model,
+            "key": request_key(llm_request),
+            "responses": [],
+        }
+        self.interactions.append(interaction)
+        return interaction["responses"]
+
+    def stats(self) -> dict:
+        return {
+            "interactions": len(self.interactions),
+            "exact_hits": self.exact_hits,
+            "order_hits": self.order_hits,
+            "unused": len(self.interactions) - len(self._replay.used),
+        }
+
+    def install(self) -> None:
+        """Routes every Gemini model name through this cassette."""
+        global _active
+        _active = self
+        LLMRegistry.register(CassetteLlm)
+        LLMRegistry.resolve.cache_clear()
+
+    def uninstall(self) -> None:
+        global _active
+        if _active is self:
+            _active = None
+        LLMRegistry.register(Gemini)
+        LLMRegistry.resolve.cache_clear()
+
+    def __enter__(self) -> "Cassette":
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.uninstall()
+        if self.mode == "record":
+            self.save()
+
+
+class CassetteLlm(BaseLlm):
+    """Model that records to, or replays from, the installed cassette."""
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return Gemini.supported_models()
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        cassette = _active
+        if cassette is None:
+            raise RuntimeError("No cassette installed")
+
+        if cassette.mode == "replay":
+            responses = cassette.replay(llm_request)
+            if stream:
+                async for response in cassette.stream(llm_request, responses):
+                    yield response
+                return
+            delay = cassette.replay_delay(llm_request, responses)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            for response in responses:
+                yield response
+            return
+
+        # Key the request before the backend gets a chance to amend it
+        recorded = cassette.record(llm_request)
+        async for response in cassette.backend(model=self.model).generate_content_async(
+            llm_request, stream=stream
+        ):
+            # Streamed chunks are re-derived from the aggregated response on replay
+            if not response.partial:
+                recorded.append(response.model_dump(mode="json", exclude_none=True))
+            yield response
@@ -0,0 +1,140 @@
+"""
+Stage Checkpoints
+Lets a retried turn skip the workflow stages that already completed
+
+When a stage finishes (`domain_researcher`, `robust_roadmap_planner`,
+`resource_curator`, `practice_advisor`), a checkpoint with a fingerprint
+of its inputs (the state it reads and the user message of the turn) and
+a digest of its output is stored in session state. When the same turn is
+sent again after a failure (a model timeout, a restarted process with the
+SQLite session service), stages whose checkpoint still matches are
+skipped and the workflow continues at the stage that failed.
+
+Only stages the turn asked for (by transfer, directly or through a parent
+stage) are skipped; the agent answering the user keeps running so it can
+route the turn. Repeats within one turn (validation retries) always run.
+"""
+
+import json
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai.types import Content
+
+from .agent_utils import PROFILE_KEYS
+from .config import RoadmapConfiguration, config
+from .roadmap_model import approved_roadmap, digest
+
+CHECKPOINTS_KEY = "stage_checkpoints"
+
+# Stage agent -> (output state key, state keys it reads); "approved_roadmap"
+# stands for the roadmap the user is working with (see `approved_roadmap`)
+STAGES = {
+    "domain_researcher": ("domain_analysis", ("target_domain", "experience_level")),
+    "robust_roadmap_planner": ("roadmap_outline", (*PROFILE_KEYS, "domain_analysis")),
+    "resource_curator": ("learning_resources", (*PROFILE_KEYS, "approved_roadmap")),
+    "practice_advisor": ("practice_activities", (*PROFILE_KEYS, "approved_roadmap")),
+}
+
+checkpoint_stats = {
+    "recorded": 0,
+    "skipped": 0,
+}
+
+
+def _user_text(callback_context: CallbackContext) -> str:
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+def _input(state, key: str):
+    if key == "approved_roadmap":
+        roadmap = approved_roadmap(state)
+        return roadmap.source if roadmap else None
+    return state.get(key)
+
+
+def stage_fingerprint(stage: str, state, user_text: str) -> str:
+    """Digest of a stage's inputs: the state keys it reads and the turn's message."""
+    _, inputs = STAGES[stage]
+    return digest(json.dumps(
+        [{key: _input(state, key) for key in inputs}, user_text], sort_keys=True, default=str
+    ))
+
+
+def _requested(callback_context: CallbackContext) -> bool:
+    """True when this turn transferred to the agent or to one of its parents."""
+    context = callback_context._invocation_context
+    names = set()
+    agent = context.agent
+    while agent is not None:
+        names.add(agent.name)
+        agent = agent.parent_agent
+    return any(
+        event.invocation_id == context.invocation_id
+        and event.actions
+        and event.actions.transfer_to_agent in names
+        for event in context.session.events
+    )
+
+
+def skip_checkpointed_stage(
+    callback_context: CallbackContext, config: RoadmapConfiguration = config
+) -> Optional[Content]:
+    """
+    Skips a stage whose inputs and output are unchanged since it last
+    completed in an earlier invocation.
+
+    Args:
+        callback_context: Context from the agent callback
+        config: Configuration of the stage's graph
+
+    Returns:
+        Empty Content to skip the stage, or None to run it
+    """
+    stage = callback_context.agent_name
+    if not config.enable_stage_checkpoints or stage not in STAGES:
+        return None
+    state = callback_context.state
+    checkpoint = (state.get(CHECKPOINTS_KEY) or {}).get(stage)
+    if not checkpoint or checkpoint["invocation_id"] == callback_context.invocation_id:
+        return None
+
+    output_key, _ = STAGES[stage]
+    output = state.get(output_key)
+    if (
+        not output
+        or digest(output) != checkpoint["output_digest"]
+        or stage_fingerprint(stage, state, _user_text(callback_context)) != checkpoint["fingerprint"]
+        or not _requested(callback_context)
+    ):
+        return None
+
+    checkpoint_stats["skipped"] += 1
+    return Content()
+
+
+def record_stage_checkpoint(
+    callback_context: CallbackContext, config: RoadmapConfiguration = config
+) -> None:
+    """Stores the checkpoint of a stage that just completed."""
+    stage = callback_context.agent_name
+    if not config.enable_stage_checkpoints or stage not in STAGES:
+        return None
+    state = callback_context.state
+    output_key, _ = STAGES[stage]
+    output = state.get(output_key)
+    if not output:
+        return None
+
+    checkpoints = dict(state.get(CHECKPOINTS_KEY) or {})
+    checkpoints[stage] = {
+        "fingerprint": stage_fingerprint(stage, state, _user_text(callback_context)),
+        "output_digest": digest(output),
+        "invocation_id": callback_context.invocation_id,
+    }
+    state[CHECKPOINTS_KEY] = checkpoints
+    checkpoint_stats["recorded"] += 1
+    return None
@@ -11,9 +11,6 @@ from dataclasses import dataclass
 from dotenv import load_dotenv
 load_dotenv()
 
-os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "FALSE"
-os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
-
 
 @dataclass
 class RoadmapConfiguration:
@@ -29,9 +26,115 @@ class RoadmapConfiguration:
     tool_agent_model: str = "gemini-2.0-flash-exp"
     
     max_research_iterations: int = 5
+    
+    # Run resource curation and practice recommendations concurrently
+    parallel_enrichment: bool = True
+    
+    # Curate resources week by week, at most this many weeks at a time
+    shard_resource_curation: bool = True
+    resource_curation_concurrency: int = 4
+    
+    # Regenerate only the weeks that feedback refers to
+    incremental_editing: bool = True
+    incremental_edit_max_weeks: int = 2
+    
+    # Repair failing weeks of an outline instead of regenerating all of it
+    targeted_repair: bool = True
+    max_repair_weeks: int = 2
     default_weeks: int = 4
+    min_days_per_week: int = 4
     supported_learning_styles: list = None
     
+    # Outline validation counts days and required terms over the whole
+    # roadmap (at least 15 days); the strict mode requires min_days_per_week
+    # days and every term in each week, so more outlines are retried or repaired
+    strict_week_validation: bool = False
+    
+    # Model policy per agent group: "cascade" tries worker_model first and
+    # escalates to critic_model when validation fails; "worker" / "critic"
+    # pin one model
+    model_policies: dict = None
+    
+    # Local cache directory shared by all persistent stores
+    cache_dir: str = os.getenv("ROADMAP_CACHE_DIR", ".roadmap_cache")
+    
+    # SearchAgent result cache
+    enable_search_cache: bool = True
+    search_cache_ttl_seconds: int = 24 * 60 * 60
+    search_cache_max_entries: int = 5000
+    
+    # Cross-session domain analysis cache
+    enable_domain_cache: bool = True
+    domain_cache_max_age_seconds: int = 7 * 24 * 60 * 60
+    domain_cache_refresh_after_seconds: int = 5 * 24 * 60 * 60
+    domain_cache_hot_min_hits: int = 3
+    
+    # Local learning-resource catalog queried by `find_learning_resources`;
+    # matches below min_score fall back to the SearchAgent
+    enable_resource_index: bool = True
+    resource_index_min_score: float = 0.3
+    resource_index_max_results: int = 5
+    
+    # Seed the planner with the nearest approved roadmap for a similar profile
+    enable_roadmap_seeding: bool = True
+    roadmap_seed_min_score: float = 0.5
+    
+    # Share one in-flight SearchAgent run / domain research between
+    # concurrent identical requests from different sessions
+    coalesce_requests: bool = True
+    
+    # Curate resources and practice for a validated outline in the background
+    # while the user reviews it; approval reuses whatever is still current
+    speculative_enrichment: bool = True
+    speculation_max_sessions: int = 1000
+    
+    # Under SSE streaming, send planner/editor output as one partial event
+    # per completed week instead of per token chunk
+    stream_roadmap_by_week: bool = True
+    
+    # Checkpoint each completed stage with a fingerprint of its inputs so a
+    # retried turn skips the stages that already finished (checkpoints.py)
+    enable_stage_checkpoints: bool = True
+    
+    # Compact the history sent with each model call: superseded roadmap
+    # versions become stubs, earlier tool chatter is cut, and the oldest
+    # turns are summarized when a request exceeds the budget (estimated
+    # tokens, ~4 characters each); see history_compaction.py
+    enable_history_compaction: bool = True
+    history_token_budget: int = 16000
+    history_chatter_max_chars: int = 300
+    
+    # Outbound model calls (model_scheduler.py): per-model token buckets
+    # (requests per minute and burst), admitted by priority (interactive
+    # turns, then batch, then background work); a 429 halves the model's
+    # rate, pauses it and retries the call with backoff. The defaults are
+    # the Gemini API paid tier 1 limits of the two 2.5 models; set your
+    # project's quota. Models not listed (the SearchAgent's
+    # tool_agent_model by default: its experimental quota would throttle
+    # every search) are not limited, but still back off and retry on a 429
+    enable_model_scheduler: bool = True
+    model_rate_limits: dict = None
+    model_max_retries: int = 4
+    model_backoff_seconds: float = 2.0
+    model_backoff_max_seconds: float = 60.0
+    
+    # Profiles generated at the same time by `python -m roadmap_agent.batch`
+    batch_workers: int = 4
+    
+    # Session service from `session_store.create_session_service`: "memory"
+    # or "sqlite" (WAL database, defaults to <cache_dir>/sessions.sqlite3);
+    # events are written in batches and large state values load on access
+    session_backend: str = os.getenv("ROADMAP_SESSION_BACKEND", "memory")
+    session_db_path: str = None
+    session_pool_size: int = 4
+    session_flush_max_events: int = 64
+    session_flush_interval_seconds: float = 0.05
+    session_lazy_state_bytes: int = 4096
+    
+    # Per-agent/model/tool metrics and structured logs (see instrumentation.py)
+    enable_instrumentation: bool = True
+    metrics_max_sessions: int = 1000
+    
     def __post_init__(self):
         if self.supported_learning_styles is None:
             self.supported_learning_styles = [
@@ -40,6 +143,27 @@ class RoadmapConfiguration:
                 "hands-on",
                 "mixed"
             ]
+        if self.model_policies is None:
+            self.model_policies = {
+                "roadmap_planner": "cascade",
+                "roadmap_editor": "cascade",
+            }
+        if self.model_rate_limits is None:
+            self.model_rate_limits = {
+                "gemini-2.5-pro": {"requests_per_minute": 150, "burst": 10},
+                "gemini-2.5-flash": {"requests_per_minute": 1000, "burst": 50},
+            }
+
+
+config = RoadmapConfiguration()
 
 
-config = RoadmapConfiguration()
\ No newline at end of file
+def configure_environment() -> None:
+    """
+    Points google-genai at the Gemini API (not Vertex AI).
+
+    Called when an agent graph is built rather than at import, so importing
+    the package leaves `os.environ` alone; a missing `GOOGLE_API_KEY` is
+    reported by the first model call.
+    """
+    os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "FALSE"
\ No newline at end of file
@@ -0,0 +1,409 @@
+"""
+Domain Analysis Store
+Cross-session cache of `domain_analysis` keyed by domain and experience level
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai.types import Content, Part
+
+from .agent_utils import run_agent_isolated
+from .checkpoints import record_stage_checkpoint
+from .config import RoadmapConfiguration, config
+from .model_scheduler import call_priority
+from .single_flight import SingleFlight
+from .validation import validate_domain_analysis
+
+
+_NON_WORD = re.compile(r"[^\w+#]+")
+_ROLE_SUFFIXES = ("job", "jobs", "role", "roles", "position", "positions")
+
+_LEVEL_ALIASES = [
+    ("beginner", ("beginner", "no experience", "new to", "fresher", "none")),
+    ("basics", ("basic", "some")),
+    ("intermediate", ("intermediate",)),
+    ("advanced", ("advanced", "senior", "expert")),
+]
+
+
+def normalize_domain(domain: str) -> str:
+    """
+    Normalizes a job domain so spelling variants share a cache entry.
+
+    "Front-end Developer role" and "frontend developer" map to the same key.
+    """
+    text = _NON_WORD.sub(" ", domain.lower().replace("-", ""))
+    words = text.split()
+    while words and words[-1] in _ROLE_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def normalize_level(level: Optional[str]) -> str:
+    """Maps free-text experience levels onto a small set of buckets."""
+    if not level:
+        return "any"
+    text = level.lower()
+    for bucket, aliases in _LEVEL_ALIASES:
+        if any(alias in text for alias in aliases):
+            return bucket
+    return " ".join(_NON_WORD.sub(" ", text).split()) or "any"
+
+
+class DomainAnalysisStore:
+    """
+    SQLite-backed store of domain analyses with staleness tracking.
+
+    Each entry records how often it was served so frequently requested
+    ("hot") domains can be refreshed before they expire.
+    """
+
+    def __init__(self, path: str, max_age_seconds: int):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS domain_analysis (
+                    domain TEXT NOT NULL,
+                    level TEXT NOT NULL,
+                    analysis TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0,
+                    last_hit_at REAL,
+                    PRIMARY KEY (domain, level)
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, domain: str, level: Optional[str]) -> Optional[tuple[str, float]]:
+        """
+        Looks up a fresh analysis for a domain and experience level.
+
+        Args:
+            domain: Target job domain
+            level: User's experience level
+
+        Returns:
+            Tuple of (analysis, age in seconds), or None on a miss or expiry
+        """
+        key = (normalize_domain(domain), normalize_level(level))
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT analysis, created_at FROM domain_analysis "
+                "WHERE domain = ? AND level = ?",
+                key,
+            ).fetchone()
+
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE domain_analysis SET hit_count = hit_count + 1, "
+                "last_hit_at = ? WHERE domain = ? AND level = ?",
+                (now, *key),
+            )
+            conn.commit()
+            self.hits += 1
+            return row[0], now - row[1]
+
+    def put(self, domain: str, level: Optional[str], analysis: str) -> None:
+        """Stores a freshly generated analysis, keeping the entry's hit count."""
+        key = (normalize_domain(domain), normalize_level(level))
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                """
+                INSERT INTO domain_analysis (domain, level, analysis, created_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (domain, level) DO UPDATE SET
+                    analysis = excluded.analysis,
+                    created_at = excluded.created_at
+                """,
+                (*key, analysis, time.time()),
+            )
+            conn.commit()
+
+    def hot_entries(self, min_hits: int, older_than_seconds: float) -> list[tuple[str, str]]:
+        """
+        Lists frequently served entries that are due for a refresh.
+
+        Args:
+            min_hits: Minimum number of times the entry was served
+            older_than_seconds: Minimum age of the entry
+
+        Returns:
+            List of (domain, level) keys, most requested first
+        """
+        cutoff = time.time() - older_than_seconds
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT domain, level FROM domain_analysis "
+                "WHERE hit_count >= ? AND created_at <= ? "
+                "ORDER BY hit_count DESC",
+                (min_hits, cutoff),
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def stats(self) -> dict:
+        with self._lock:
+            (size,) = self._connection().execute(
+                "SELECT COUNT(*) FROM domain_analysis"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+domain_store = DomainAnalysisStore(
+    path=os.path.join(config.cache_dir, "domain_analysis.sqlite3"),
+    max_age_seconds=config.domain_cache_max_age_seconds,
+)
+
+# State flag that makes the researcher skip the cache (used by refreshes)
+BYPASS_KEY = "domain_cache_bypass"
+_SEEN_KEY = "domain_analysis_digest"
+# Cache key of the domain the session's `domain_analysis` was produced for
+_FOR_KEY = "domain_analysis_for"
+
+_refresh_tasks: dict[tuple[str, str], asyncio.Task] = {}
+
+# In-flight research per domain and level, shared by every session
+research_flight = SingleFlight("domain_research")
+
+# (invocation id, cache key) -> future of research a session runs itself
+# while other sessions wait for it (see `_lead_research`)
+_led_research: dict[tuple[str, str], asyncio.Future] = {}
+
+
+def _digest(text: Optional[str]) -> Optional[str]:
+    if not text:
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def refresh_domain_analysis(
+    domain: str,
+    level: Optional[str],
+    agent=None,
+    plugins: Optional[list] = None,
+) -> Optional[str]:
+    """
+    Regenerates and stores the analysis for one domain outside any session.
+
+    Args:
+        domain: Target job domain
+        level: Experience level
+        agent: Researcher agent to run (defaults to a copy of `domain_researcher`)
+        plugins: Runner plugins to forward
+
+    Returns:
+        The new analysis, or None if the researcher produced nothing
+    """
+    if agent is None:
+        from .sub_agents.domain_researcher import domain_researcher as agent
+    if agent.parent_agent is not None:
+        agent = agent.clone()
+
+    _, state = await run_agent_isolated(
+        agent,
+        f"Research the current job market for the {domain} role "
+        f"at the {level or 'entry'} level.",
+        state={
+            "target_domain": domain,
+            "experience_level": level,
+            BYPASS_KEY: True,
+        },
+        plugins=plugins,
+    )
+    return state.get("domain_analysis")
+
+
+def _cache_key(domain: str, level: Optional[str]) -> str:
+    return f"{normalize_domain(domain)}|{normalize_level(level)}"
+
+
+def _lead_research(callback_context: CallbackContext, key: str) -> None:
+    """
+    Lets sessions that research the same domain and level meanwhile wait
+    for this session's researcher run.
+
+    The run's result is handed over by `store_domain_analysis`. If the run
+    ends without reaching it (an error), the waiting sessions get None and
+    research on their own.
+    """
+    future = research_flight.lead(key)
+    led = (callback_context.invocation_id, key)
+    _led_research[led] = future
+
+    def release(_) -> None:
+        if _led_research.get(led) is future:
+            del _led_research[led]
+        if not future.done():
+            future.set_result(None)
+
+    asyncio.current_task().add_done_callback(release)
+
+
+def _finish_research(callback_context: CallbackContext, key: str, analysis: Optional[str]) -> None:
+    future = _led_research.pop((callback_context.invocation_id, key), None)
+    if future is not None and not future.done():
+        future.set_result(analysis)
+
+
+def _schedule_refresh(domain: str, level: Optional[str], agent, plugins) -> None:
+    key = (normalize_domain(domain), normalize_level(level))
+    task = _refresh_tasks.get(key)
+    if task is not None and not task.done():
+        return
+    with call_priority("background"):
+        task = asyncio.get_running_loop().create_task(
+            refresh_domain_analysis(domain, level, agent=agent, plugins=plugins)
+        )
+    _refresh_tasks[key] = task
+    task.add_done_callback(lambda _: _refresh_tasks.pop(key, None))
+
+
+async def refresh_hot_domains(agent=None, plugins: Optional[list] = None) -> int:
+    """
+    Refreshes every hot domain that is past the refresh threshold.
+
+    Intended for a periodic warm-up job so the first user of the day is
+    served from the cache.
+
+    Returns:
+        Number of domains refreshed
+    """
+    entries = await asyncio.to_thread(
+        domain_store.hot_entries,
+        min_hits=config.domain_cache_hot_min_hits,
+        older_than_seconds=config.domain_cache_refresh_after_seconds,
+    )
+    with call_priority("background"):
+        for domain, level in entries:
+            await refresh_domain_analysis(domain, level, agent=agent, plugins=plugins)
+    return len(entries)
+
+
+async def serve_cached_domain_analysis(
+    callback_context: CallbackContext, config: RoadmapConfiguration = config
+) -> Optional[Content]:
+    """
+    Serves `domain_analysis` from the store instead of running the researcher.
+
+    On a miss with `config.coalesce_requests` on, a session that finds
+    another session already researching the same domain and level waits
+    for that run and serves its result. Otherwise the researcher runs in
+    this session as usual, and sessions arriving meanwhile wait for it.
+    Falls through (returns None) when the profile is unknown, when the cache
+    is bypassed, when the session already has an analysis for this domain,
+    or when the cached or shared analysis is missing or fails validation.
+    Hot entries past the refresh threshold are served and refreshed in the
+    background. Serving ends the researcher's run before its after
+    callbacks, so the stage checkpoint is recorded here.
+
+    Args:
+        callback_context: Context from the agent callback
+        config: Configuration of the researcher's graph
+
+    Returns:
+        Cached or shared analysis as the agent's response, or None to run the agent
+    """
+    state = callback_context.state
+    domain = state.get("target_domain")
+    if not domain or state.get(BYPASS_KEY):
+        return None
+
+    level = state.get("experience_level")
+    key = _cache_key(domain, level)
+    first_research = state.get(_FOR_KEY) != key or not state.get("domain_analysis")
+
+    cached = None
+    if config.enable_domain_cache and first_research:
+        cached = await asyncio.to_thread(domain_store.get, domain, level)
+
+    if cached is not None:
+        analysis, age = cached
+        if age > config.domain_cache_refresh_after_seconds:
+            invocation_context = callback_context._invocation_context
+            _schedule_refresh(
+                domain,
+                level,
+                agent=invocation_context.agent,
+                plugins=invocation_context.plugin_manager.plugins,
+            )
+    elif first_research and config.coalesce_requests:
+        if research_flight.in_flight(key) is not None:
+            analysis = await research_flight.join(key)
+        else:
+            _lead_research(callback_context, key)
+            analysis = None
+    else:
+        analysis = None
+
+    if not analysis or not validate_domain_analysis(analysis)["valid"]:
+        state[_SEEN_KEY] = _digest(state.get("domain_analysis"))
+        return None
+
+    state["domain_analysis"] = analysis
+    state[_FOR_KEY] = key
+    record_stage_checkpoint(callback_context, config)
+    return Content(role="model", parts=[Part.from_text(text=analysis)])
+
+
+async def store_domain_analysis(
+    callback_context: CallbackContext, config: RoadmapConfiguration = config
+) -> None:
+    """
+    Saves a newly generated `domain_analysis` to the store if it is valid,
+    and hands it to the sessions waiting for this session's research.
+    """
+    state = callback_context.state
+    domain = state.get("target_domain")
+    analysis = state.get("domain_analysis")
+    if domain:
+        _finish_research(callback_context, _cache_key(domain, state.get("experience_level")), analysis)
+    if not config.enable_domain_cache or not domain or not analysis:
+        return None
+    if not validate_domain_analysis(analysis)["valid"]:
+        return None
+
+    level = state.get("experience_level")
+    if _digest(analysis) != state.get(_SEEN_KEY):
+        await asyncio.to_thread(domain_store.put, domain, level, analysis)
+    state[_FOR_KEY] = _cache_key(domain, level)
+    return None
@@ -0,0 +1,235 @@
+"""
+Roadmap Export
+Atomic markdown/JSON export of roadmaps, with a structured JSON document
+(weeks -> days -> resources) and async and batch entry points
+"""
+
+import asyncio
+import json
+import os
+import stat
+import tempfile
+from datetime import datetime
+from typing import Optional
+
+from .roadmap_model import parse_roadmap
+
+SCHEMA_VERSION = 2
+
+_SECTIONS = ("objectives", "concepts", "practice", "resources")
+
+# The process umask, read once (reading it means setting it, which is not
+# thread-safe, and exports run on worker threads)
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+# JSON Schema of the documents written for format_type="json"
+ROADMAP_JSON_SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "title": "Career preparation roadmap",
+    "type": "object",
+    "required": ["metadata", "preamble", "weeks", "content"],
+    "properties": {
+        "metadata": {
+            "type": "object",
+            "required": ["generated", "type", "schema_version"],
+            "properties": {
+                "generated": {"type": "string"},
+                "type": {"const": "career_preparation_roadmap"},
+                "schema_version": {"const": SCHEMA_VERSION},
+            },
+        },
+        "preamble": {"type": "string"},
+        "weeks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["number", "title", "days", *_SECTIONS],
+                "properties": {
+                    "number": {"type": "integer"},
+                    "title": {"type": "string"},
+                    **{section: _STRING_LIST for section in _SECTIONS},
+                    "days": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "required": ["label", "number", "title", *_SECTIONS],
+                            "properties": {
+                                "label": {"type": "string"},
+                                "number": {"type": ["integer", "null"]},
+                                "title": {"type": "string"},
+                                **{section: _STRING_LIST for section in _SECTIONS},
+                            },
+                        },
+                    },
+                },
+            },
+        },
+        "content": {"type": "string", "description": "The roadmap as markdown"},
+    },
+}
+
+_MARKDOWN_TEMPLATE = """---
+Generated: {timestamp}
+Type: Career Preparation Roadmap
+---
+
+{content}
+
+---
+**Note:** This roadmap was generated by an AI assistant. Adjust based on your learning pace and circumstances.
+Remember to track your progress and don't hesitate to modify the plan as needed.
+"""
+
+
+def roadmap_document(roadmap_content: str, timestamp: Optional[str] = None) -> dict:
+    """
+    Builds the structured JSON document for a roadmap.
+
+    Sections that repeat a week (e.g. "## Week 2 Resources" appended after
+    the outline) are merged into that week.
+
+    Args:
+        roadmap_content: Roadmap markdown
+        timestamp: Generation time (defaults to now)
+
+    Returns:
+        Document matching `ROADMAP_JSON_SCHEMA`
+    """
+    roadmap = parse_roadmap(roadmap_content)
+    weeks: dict = {}
+    for week in roadmap.weeks:
+        merged = weeks.setdefault(week.number, {
+            "number": week.number,
+            "title": week.title,
+            "days": [],
+            **{section: [] for section in _SECTIONS},
+        })
+        for section in _SECTIONS:
+            merged[section].extend(getattr(week, section))
+        merged["days"].extend(
+            {
+                "label": day.label,
+                "number": day.number,
+                "title": day.title,
+                **{section: list(getattr(day, section)) for section in _SECTIONS},
+            }
+            for day in week.days
+        )
+
+    return {
+        "metadata": {
+            "generated": timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "type": "career_preparation_roadmap",
+            "schema_version": SCHEMA_VERSION,
+        },
+        "preamble": roadmap.preamble.strip(),
+        "weeks": list(weeks.values()),
+        "content": roadmap_content,
+    }
+
+
+def _file_mode(path: str) -> int:
+    """Mode for `path`: the existing file's, or what `open` would create."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def atomic_write(path: str, text: str) -> None:
+    """
+    Writes a file so readers see either the old or the complete new content.
+
+    The text goes to a temporary file in the same directory, is flushed to
+    disk and then renamed over `path`. The file keeps the permissions of
+    the file it replaces (a new file gets the usual 0666 minus umask, not
+    the 0600 of the temporary file).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, _file_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def export_roadmap(roadmap_content: str, filename: str, format_type: str = "markdown") -> dict:
+    """
+    Writes a roadmap file (blocking); see `save_roadmap_to_file`.
+
+    Returns:
+        Dictionary with save status
+    """
+    try:
+        # Ensure proper file extension
+        if format_type == "markdown" and not filename.endswith(".md"):
+            filename += ".md"
+        elif format_type == "json" and not filename.endswith(".json"):
+            filename += ".json"
+
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if format_type == "markdown":
+            text = _MARKDOWN_TEMPLATE.format(timestamp=timestamp, content=roadmap_content)
+        elif format_type == "json":
+            text = json.dumps(
+                roadmap_document(roadmap_content, timestamp), indent=2, ensure_ascii=False
+            )
+        else:
+            raise ValueError(f"Unsupported format: {format_type}")
+        atomic_write(filename, text)
+
+        return {
+            "status": "success",
+            "filename": filename,
+            "path": os.path.abspath(filename),
+            "message": f"Roadmap saved successfully to {filename}",
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to save roadmap: {str(e)}",
+        }
+
+
+async def export_roadmap_async(
+    roadmap_content: str, filename: str, format_type: str = "markdown"
+) -> dict:
+    """Runs `export_roadmap` in the default thread pool, off the event loop."""
+    return await asyncio.to_thread(export_roadmap, roadmap_content, filename, format_type)
+
+
+async def export_roadmaps(exports: list, format_type: str = "markdown") -> list:
+    """
+    Exports many roadmaps in one call, writing them concurrently off the
+    event loop.
+
+    Args:
+        exports: Dictionaries with `roadmap_content`, `filename` and optionally
+            `format_type` (defaults to `format_type`)
+        format_type: Default output format
+
+    Returns:
+        One save status per export, in order
+    """
+    return await asyncio.gather(*[
+        export_roadmap_async(
+            export["roadmap_content"],
+            export["filename"],
+            export.get("format_type", format_type),
+        )
+        for export in exports
+    ])
@@ -0,0 +1,258 @@
+"""
+History Compaction
+Keeps model requests small in long refine loops by compacting the
+conversation history each agent sees
+
+Every refine or edit round adds another full roadmap to the session, and
+every agent that runs later gets all of them (plus the other agents'
+tool calls) in its prompt. Before each model call the plugin rewrites
+`llm_request.contents`, leaving the session itself untouched:
+
+1. Roadmap versions from earlier turns that a later version supersedes
+   become a one-line stub naming their weeks.
+2. Tool calls and results from earlier turns are cut to
+   `history_chatter_max_chars`.
+3. If the request is still above `history_token_budget`, the oldest
+   turns are replaced by one summary message (which carries the latest
+   roadmap version if it was among them).
+
+The current turn (from the last user message on) is never changed.
+"""
+
+import json
+import re
+from typing import Optional
+
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+from .config import RoadmapConfiguration, config
+from .metrics import metrics
+
+_WEEK_HEADING = re.compile(
+    r"^(?:\[[\w-]+\] said: )?#{1,4}\s*(Week\s+\d+\b[^\n]*)", re.MULTILINE | re.IGNORECASE
+)
+_AGENT_PREFIX = re.compile(r"^(\[[\w-]+\] said: )")
+_CONTEXT_HEADER = "For context:"
+_COMPACTED = " ... [compacted]"
+
+tokens_before = metrics.counter("history_tokens_before_total", "Estimated prompt tokens before compaction")
+tokens_saved = metrics.counter("history_tokens_saved_total", "Estimated prompt tokens removed by compaction")
+tokens_saved_per_turn = metrics.histogram(
+    "history_tokens_saved_per_turn",
+    "Estimated prompt tokens removed by compaction per turn, over all model calls",
+    buckets=(0, 100, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _part_text(part: types.Part) -> str:
+    if part.text:
+        return part.text
+    if part.function_call:
+        return json.dumps(part.function_call.args or {}, default=str)
+    if part.function_response:
+        return json.dumps(part.function_response.response or {}, default=str)
+    return ""
+
+
+def content_tokens(contents: list) -> int:
+    """Estimated tokens of a list of `Content`s."""
+    return sum(
+        estimate_tokens(_part_text(part))
+        for content in contents
+        for part in content.parts or []
+    )
+
+
+def roadmap_weeks(text: str) -> list:
+    """Week headings of a roadmap-shaped text (empty for anything else)."""
+    weeks = _WEEK_HEADING.findall(text or "")
+    return weeks if len(weeks) >= 2 else []
+
+
+def _is_user_message(content: types.Content) -> bool:
+    """True for a message the user typed (not tool results or other agents' context)."""
+    if content.role != "user" or not content.parts:
+        return False
+    if any(part.function_response for part in content.parts):
+        return False
+    return content.parts[0].text != _CONTEXT_HEADER
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit].rstrip() + _COMPACTED
+
+
+def _stub(text: str, weeks: list) -> str:
+    prefix = _AGENT_PREFIX.match(text)
+    titles = "; ".join(week.strip() for week in weeks)
+    return f"{prefix.group(1) if prefix else ''}[Superseded roadmap version: {titles}]"
+
+
+def _compact_part(part: types.Part, superseded: bool, limit: int) -> Optional[types.Part]:
+    """Returns a compacted copy of an earlier-turn part, or None to keep it."""
+    if part.text:
+        weeks = roadmap_weeks(part.text)
+        if superseded and weeks:
+            return types.Part(text=_stub(part.text, weeks))
+        if not weeks and re.match(r"^\[[\w-]+\] (called tool|`)", part.text):
+            text = _truncate(part.text, limit)
+            return types.Part(text=text) if text != part.text else None
+        return None
+    if part.function_response:
+        payload = json.dumps(part.function_response.response or {}, default=str)
+        if len(payload) <= limit:
+            return None
+        return types.Part(function_response=types.FunctionResponse(
+            id=part.function_response.id,
+            name=part.function_response.name,
+            response={"result": _truncate(payload, limit)},
+        ))
+    return None
+
+
+def _summary_lines(content: types.Content, limit: int) -> list:
+    lines = []
+    for part in content.parts or []:
+        if part.function_call:
+            lines.append(f"- called `{part.function_call.name}`")
+        elif part.text and part.text != _CONTEXT_HEADER:
+            speaker = "User" if _is_user_message(content) else "Assistant"
+            text = part.text
+            prefix = _AGENT_PREFIX.match(text)
+            if prefix:
+                speaker, text = prefix.group(1)[1:].split("]")[0], text[prefix.end():]
+            weeks = roadmap_weeks(text)
+            if weeks:
+                text = f"[roadmap: {'; '.join(week.strip() for week in weeks)}]"
+            first_line = text.strip().split("\n")[0]
+            lines.append(f"- {speaker}: {_truncate(first_line, limit)}")
+    return lines
+
+
+def compact_contents(
+    contents: list,
+    budget: int,
+    chatter_max_chars: int = 300,
+) -> list:
+    """
+    Compacts the history of a model request.
+
+    Args:
+        contents: `llm_request.contents`; not modified
+        budget: Estimated token budget for the whole history
+        chatter_max_chars: Length kept of earlier tool calls and results
+
+    Returns:
+        New list of contents (shares unchanged `Content` objects)
+    """
+    user_turns = [index for index, content in enumerate(contents) if _is_user_message(content)]
+    current = user_turns[-1] if user_turns else len(contents)
+
+    # The newest roadmap-shaped part anywhere in the history stays as is
+    latest = None
+    for index, content in enumerate(contents):
+        for position, part in enumerate(content.parts or []):
+            if part.text and roadmap_weeks(part.text):
+                latest = (index, position)
+
+    compacted = []
+    for index, content in enumerate(contents):
+        if index >= current or not content.parts:
+            compacted.append(content)
+            continue
+        parts, changed = [], False
+        for position, part in enumerate(content.parts):
+            replacement = _compact_part(
+                part, superseded=(index, position) != latest, limit=chatter_max_chars
+            )
+            parts.append(replacement or part)
+            changed = changed or replacement is not None
+        compacted.append(types.Content(role=content.role, parts=parts) if changed else content)
+
+    total = content_tokens(compacted)
+    if total <= budget or not user_turns:
+        return compacted
+
+    # Still too large: fold the oldest turns into one summary message
+    turn_starts = [0, *[index for index in user_turns if index > 0]]
+    lines, latest_text, cut = [], None, 0
+    for start, end in zip(turn_starts, turn_starts[1:]):
+        if end > current or total <= budget:
+            break
+        for index in range(start, end):
+            lines.extend(_summary_lines(contents[index], chatter_max_chars))
+            if latest and latest[0] == index:
+                latest_text = contents[index].parts[latest[1]].text
+        total -= content_tokens(compacted[start:end])
+        cut = end
+    if not cut:
+        return compacted
+
+    summary = "Summary of the earlier conversation:\n" + "\n".join(dict.fromkeys(lines))
+    if latest_text:
+        summary += f"\n\nLatest roadmap version:\n{_AGENT_PREFIX.sub('', latest_text)}"
+    return [types.Content(role="user", parts=[types.Part(text=summary)]), *compacted[cut:]]
+
+
+class HistoryCompactionPlugin(BasePlugin):
+    """
+    Runner plugin that compacts every model request's history (see the
+    module docstring) and records the estimated tokens saved per turn,
+    using the budget of the configuration it was created for.
+    """
+
+    def __init__(self, config: RoadmapConfiguration = config):
+        super().__init__(name="history_compaction")
+        self.config = config
+        self.requests = 0
+        self.compacted = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self._turn_savings: dict = {}
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        if not self.config.enable_history_compaction or not llm_request.contents:
+            return None
+        before = content_tokens(llm_request.contents)
+        contents = compact_contents(
+            llm_request.contents,
+            self.config.history_token_budget,
+            self.config.history_chatter_max_chars,
+        )
+        after = content_tokens(contents)
+
+        self.requests += 1
+        self.tokens_before += before
+        self.tokens_after += after
+        tokens_before.inc(before, agent=callback_context.agent_name)
+        invocation_id = callback_context.invocation_id
+        self._turn_savings[invocation_id] = self._turn_savings.get(invocation_id, 0) + before - after
+        if after < before:
+            llm_request.contents = contents
+            self.compacted += 1
+            tokens_saved.inc(before - after, agent=callback_context.agent_name)
+        return None
+
+    async def after_run_callback(self, *, invocation_context):
+        saved = self._turn_savings.pop(invocation_context.invocation_id, None)
+        if saved is not None:
+            tokens_saved_per_turn.observe(saved)
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "compacted": self.compacted,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "tokens_saved": self.tokens_before - self.tokens_after,
+        }
+
+
+history_compaction_plugin = HistoryCompactionPlugin()
@@ -0,0 +1,269 @@
+"""
+Instrumentation
+Per-agent, per-model and per-tool timing, token and call-count metrics,
+recorded through runner plugin callbacks
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Optional
+
+from google.adk.plugins.base_plugin import BasePlugin
+
+from .checkpoints import checkpoint_stats
+from .config import config
+from .domain_store import domain_store, research_flight
+from .history_compaction import history_compaction_plugin
+from .metrics import metrics
+from .model_cascade import cascade_stats
+from .model_scheduler import model_scheduler
+from .resource_index import resource_index
+from .roadmap_store import roadmap_store
+from .speculation import speculative_tasks
+from .sub_agents.roadmap_planner import repair_stats
+from .tool_agents import SEARCH_AGENT_NAME, search_cache, search_flight
+
+logger = logging.getLogger("roadmap_agent.metrics")
+
+# Session that isolated runs (shards, refreshes, SearchAgent) are attributed to
+_root_session: ContextVar[Optional[str]] = ContextVar("metrics_root_session", default=None)
+
+agent_runs = metrics.counter("agent_runs_total", "Agent runs")
+agent_retries = metrics.counter(
+    "agent_retries_total", "Agent re-runs within the same invocation (loop retries)"
+)
+agent_seconds = metrics.histogram("agent_duration_seconds", "Agent wall time, sub-agents included")
+model_calls = metrics.counter("model_calls_total", "Model calls")
+model_errors = metrics.counter("model_errors_total", "Failed model calls")
+model_seconds = metrics.histogram("model_duration_seconds", "Model call latency")
+input_tokens = metrics.counter("model_input_tokens_total", "Prompt tokens")
+output_tokens = metrics.counter("model_output_tokens_total", "Response tokens")
+tool_calls = metrics.counter("tool_calls_total", "Tool calls")
+tool_errors = metrics.counter("tool_errors_total", "Failed tool calls")
+tool_seconds = metrics.histogram("tool_duration_seconds", "Tool wall time")
+search_calls = metrics.counter("search_agent_calls_total", "SearchAgent invocations")
+
+
+def _empty_summary() -> dict:
+    return {
+        "agents": {},
+        "model_calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "tool_calls": 0,
+        "retries": 0,
+        "search_calls": 0,
+    }
+
+
+class InstrumentationPlugin(BasePlugin):
+    """
+    Records wall time, tokens, retries and SearchAgent calls.
+
+    Every measurement goes to the process-wide `metrics` registry, to a
+    per-session summary (see `session_summary`) and, as one JSON object per
+    line, to the "roadmap_agent.metrics" logger at INFO level.
+
+    Runs started inside a session (sharded curation, section edits, the
+    SearchAgent) are counted towards that session.
+    """
+
+    def __init__(self, max_sessions: int = 1000):
+        super().__init__(name="roadmap_instrumentation")
+        self.max_sessions = max_sessions
+        self.sessions: OrderedDict = OrderedDict()
+        self._started: dict = {}
+        self._seen_agents: set = set()
+        self._run_tokens: dict = {}
+
+    def _session_id(self, session_id: str) -> str:
+        return _root_session.get() or session_id
+
+    def _summary(self, session_id: str) -> dict:
+        session_id = self._session_id(session_id)
+        summary = self.sessions.get(session_id)
+        if summary is None:
+            summary = self.sessions[session_id] = _empty_summary()
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        else:
+            self.sessions.move_to_end(session_id)
+        return summary
+
+    def session_summary(self, session_id: str) -> Optional[dict]:
+        """Returns the metrics recorded for one session, if still retained."""
+        return self.sessions.get(session_id)
+
+    def _log(self, kind: str, **fields) -> None:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({"kind": kind, **fields}, default=str))
+
+    async def before_run_callback(self, *, invocation_context):
+        if _root_session.get() is None:
+            self._run_tokens[invocation_context.invocation_id] = _root_session.set(
+                invocation_context.session.id
+            )
+        return None
+
+    async def after_run_callback(self, *, invocation_context):
+        self._seen_agents = {
+            key for key in self._seen_agents if key[0] != invocation_context.invocation_id
+        }
+        token = self._run_tokens.pop(invocation_context.invocation_id, None)
+        if token is not None:
+            try:
+                _root_session.reset(token)
+            except ValueError:  # finished in another context
+                _root_session.set(None)
+        return None
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        key = (callback_context.invocation_id, agent.name)
+        self._started[("agent",) + key] = time.perf_counter()
+        if key in self._seen_agents:
+            agent_retries.inc(agent=agent.name)
+            self._summary(callback_context._invocation_context.session.id)["retries"] += 1
+        self._seen_agents.add(key)
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        started = self._started.pop(("agent", callback_context.invocation_id, agent.name), None)
+        if started is None:
+            return None
+        elapsed = time.perf_counter() - started
+        session_id = callback_context._invocation_context.session.id
+
+        agent_runs.inc(agent=agent.name)
+        agent_seconds.observe(elapsed, agent=agent.name)
+        stats = self._summary(session_id)["agents"].setdefault(agent.name, {"runs": 0, "seconds": 0.0})
+        stats["runs"] += 1
+        stats["seconds"] += elapsed
+        self._log(
+            "agent",
+            session=self._session_id(session_id),
+            invocation=callback_context.invocation_id,
+            agent=agent.name,
+            duration_ms=round(elapsed * 1000, 2),
+        )
+        return None
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        self._started[("model", callback_context.invocation_id, callback_context.agent_name)] = (
+            time.perf_counter()
+        )
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        if llm_response.partial:
+            return None
+        started = self._started.pop(
+            ("model", callback_context.invocation_id, callback_context.agent_name), None
+        )
+        elapsed = time.perf_counter() - started if started is not None else 0.0
+        agent_name = callback_context.agent_name
+        usage = llm_response.usage_metadata
+        prompt = (usage.prompt_token_count or 0) if usage else 0
+        response = (usage.candidates_token_count or 0) if usage else 0
+        model = llm_response.model_version or ""
+
+        model_calls.inc(agent=agent_name)
+        model_seconds.observe(elapsed, agent=agent_name)
+        input_tokens.inc(prompt, agent=agent_name)
+        output_tokens.inc(response, agent=agent_name)
+
+        summary = self._summary(callback_context._invocation_context.session.id)
+        summary["model_calls"] += 1
+        summary["input_tokens"] += prompt
+        summary["output_tokens"] += response
+        self._log(
+            "model",
+            session=self._session_id(callback_context._invocation_context.session.id),
+            invocation=callback_context.invocation_id,
+            agent=agent_name,
+            model=model,
+            duration_ms=round(elapsed * 1000, 2),
+            input_tokens=prompt,
+            output_tokens=response,
+        )
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        self._started.pop(("model", callback_context.invocation_id, callback_context.agent_name), None)
+        model_errors.inc(agent=callback_context.agent_name, error=type(error).__name__)
+        return None
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self._started[("tool", tool_context.function_call_id, tool.name)] = time.perf_counter()
+        return None
+
+    def _finish_tool(self, tool, tool_context, error: Optional[Exception] = None) -> None:
+        started = self._started.pop(("tool", tool_context.function_call_id, tool.name), None)
+        elapsed = time.perf_counter() - started if started is not None else 0.0
+        session_id = tool_context._invocation_context.session.id
+
+        tool_calls.inc(tool=tool.name)
+        tool_seconds.observe(elapsed, tool=tool.name)
+        summary = self._summary(session_id)
+        summary["tool_calls"] += 1
+        if tool.name == SEARCH_AGENT_NAME:
+            search_calls.inc(agent=tool_context.agent_name)
+            summary["search_calls"] += 1
+        if error is not None:
+            tool_errors.inc(tool=tool.name, error=type(error).__name__)
+        self._log(
+            "tool",
+            session=self._session_id(session_id),
+            invocation=tool_context.invocation_id,
+            agent=tool_context.agent_name,
+            tool=tool.name,
+            duration_ms=round(elapsed * 1000, 2),
+            error=type(error).__name__ if error is not None else None,
+        )
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        self._finish_tool(tool, tool_context)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        self._finish_tool(tool, tool_context, error)
+        return None
+
+
+def _cascade_gauges() -> dict:
+    gauges: dict = {}
+    for group, counters in cascade_stats.items():
+        for field, value in counters.items():
+            gauges.setdefault(field, {})[group] = value
+    return gauges
+
+
+def _coalescing_gauges() -> dict:
+    gauges: dict = {}
+    for flight in (search_flight, research_flight):
+        for field, value in flight.stats().items():
+            gauges.setdefault(field, {})[flight.name] = value
+    return gauges
+
+
+def _register_collectors() -> None:
+    if search_cache is not None:
+        metrics.register_collector("search_cache", search_cache.stats, "SearchCache counters")
+    metrics.register_collector("domain_cache", domain_store.stats, "Domain analysis store counters")
+    metrics.register_collector("resource_index", resource_index.stats, "Local resource index lookups")
+    metrics.register_collector("roadmap_store", roadmap_store.stats, "Approved roadmap seed lookups")
+    metrics.register_collector("model_cascade", _cascade_gauges, "Model cascade counters by group")
+    metrics.register_collector("roadmap_repair", lambda: dict(repair_stats), "Targeted repair counters")
+    metrics.register_collector("coalescing", _coalescing_gauges, "Single-flight request coalescing")
+    metrics.register_collector("speculation", speculative_tasks.stats, "Speculative enrichment tasks")
+    metrics.register_collector("stage_checkpoints", lambda: dict(checkpoint_stats), "Stage checkpoints")
+    metrics.register_collector(
+        "history_compaction", history_compaction_plugin.stats, "Prompt history compaction"
+    )
+    metrics.register_collector("model_scheduler", model_scheduler.stats, "Model call queues by model")
+
+
+_register_collectors()
+instrumentation_plugin = InstrumentationPlugin(max_sessions=config.metrics_max_sessions)
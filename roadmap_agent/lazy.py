@@ -0,0 +1,36 @@
+"""
+Lazy Module Attributes
+Builds module-level agents on first access instead of at import
+"""
+
+import threading
+from typing import Any, Callable
+
+_lock = threading.RLock()
+
+
+def lazy_attributes(namespace: dict, factories: dict) -> Callable[[str], Any]:
+    """
+    Creates a module `__getattr__` (PEP 562) for attributes built on demand.
+
+    The first access to a name calls its factory and stores the result in
+    the module, so later accesses are plain attribute lookups.
+
+    Args:
+        namespace: The module's `globals()`
+        factories: Maps attribute names to zero-argument factories
+
+    Returns:
+        Function to assign to the module's `__getattr__`
+    """
+    def __getattr__(name: str) -> Any:
+        factory = factories.get(name)
+        if factory is None:
+            raise AttributeError(f"module {namespace['__name__']!r} has no attribute {name!r}")
+        # Factories may build other lazy attributes, so the lock is reentrant
+        with _lock:
+            if name not in namespace:
+                namespace[name] = factory()
+        return namespace[name]
+
+    return __getattr__
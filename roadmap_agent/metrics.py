@@ -0,0 +1,198 @@
+"""
+Metrics Registry
+In-process counters, histograms and gauge collectors with a Prometheus text dump
+"""
+
+import math
+import threading
+from typing import Callable, Optional
+
+# Latency buckets in seconds, from fast tools to slow model calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels: Optional[dict]) -> tuple:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: Optional[tuple] = None) -> str:
+    pairs = list(key) + list(extra or ())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.values: dict = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(_label_key(labels), 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.values.clear()
+
+    def samples(self) -> list:
+        return [(self.name, key, None, value) for key, value in sorted(self.values.items())]
+
+
+class Histogram:
+    """Bucketed distribution (cumulative buckets, sum and count) with labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.values: dict = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            counts, total, count = self.values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            counts = [
+                bucket_count + (1 if value <= bound else 0)
+                for bucket_count, bound in zip(counts, self.buckets)
+            ]
+            self.values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels) -> int:
+        return self.values.get(_label_key(labels), (None, 0.0, 0))[2]
+
+    def total(self, **labels) -> float:
+        return self.values.get(_label_key(labels), (None, 0.0, 0))[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.values.clear()
+
+    def samples(self) -> list:
+        samples = []
+        for key, (counts, total, count) in sorted(self.values.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                samples.append((f"{self.name}_bucket", key, (("le", _format_value(bound)),), bucket_count))
+            samples.append((f"{self.name}_bucket", key, (("le", "+Inf"),), count))
+            samples.append((f"{self.name}_sum", key, None, total))
+            samples.append((f"{self.name}_count", key, None, count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Holds the process's metrics.
+
+    Besides counters and histograms updated as things happen, collectors are
+    callables run at dump time that report current values of stats kept
+    elsewhere (cache hit rates, cascade counters) as gauges.
+    """
+
+    def __init__(self, prefix: str = "roadmap"):
+        self.prefix = prefix
+        self._metrics: dict = {}
+        self._collectors: dict = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs):
+        full_name = f"{self.prefix}_{name}"
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, help_text, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {full_name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "", buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def register_collector(self, name: str, collect: Callable[[], dict], help_text: str = "") -> None:
+        """
+        Registers a gauge collector.
+
+        Args:
+            name: Metric name prefix (e.g. "search_cache")
+            collect: Returns {field: number} or {field: {label value: number}}
+            help_text: Description for the dump
+        """
+        self._collectors[f"{self.prefix}_{name}"] = (collect, help_text)
+
+    def reset(self) -> None:
+        """
+        Zeroes every counter and histogram in place.
+
+        Metrics stay registered, so the module-level objects that modules
+        created with `counter` / `histogram` keep reporting. Collectors
+        read their stats at dump time and are left alone.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+    def render(self) -> str:
+        """
+        Renders every metric in the Prometheus text exposition format.
+
+        Returns:
+            Text dump, one sample per line
+        """
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for sample_name, key, extra, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(key, extra)} {_format_value(value)}")
+
+        for prefix, (collect, help_text) in sorted(self._collectors.items()):
+            try:
+                values = collect() or {}
+            except Exception as e:  # a broken collector must not break the dump
+                lines.append(f"# collector {prefix} failed: {type(e).__name__}")
+                continue
+            for field, value in sorted(values.items()):
+                name = f"{prefix}_{field}"
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+                if isinstance(value, dict):
+                    for label, labelled_value in sorted(value.items()):
+                        lines.append(
+                            f"{name}{_format_labels((('group', label),))} {_format_value(labelled_value)}"
+                        )
+                elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
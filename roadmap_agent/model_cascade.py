@@ -0,0 +1,122 @@
+"""
+Model Cascade
+Runs planner and editor calls on the worker model first and escalates to the
+critic model only after validation fails
+"""
+
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest
+
+from .config import RoadmapConfiguration, config
+
+PLANNER = "roadmap_planner"
+EDITOR = "roadmap_editor"
+
+# Agents whose model is chosen by the cascade, and the policy they follow
+AGENT_GROUPS = {
+    "roadmap_planner": PLANNER,
+    "roadmap_week_repairer": PLANNER,
+    "roadmap_editor": EDITOR,
+    "full_roadmap_editor": EDITOR,
+    "roadmap_section_editor": EDITOR,
+}
+
+# State key mapping group -> invocation id (or True) once a group escalated
+ESCALATION_KEY = "model_escalation"
+
+cascade_stats: dict = {}
+
+
+def _stats(group: str) -> dict:
+    return cascade_stats.setdefault(
+        group, {"worker_calls": 0, "critic_calls": 0, "escalations": 0}
+    )
+
+
+def policy_for(group: str, config: RoadmapConfiguration = config) -> str:
+    """Returns the configured policy ("cascade", "worker" or "critic") for a group."""
+    return config.model_policies.get(group, "critic")
+
+
+def model_for(group: str, escalated: bool = False, config: RoadmapConfiguration = config) -> str:
+    """
+    Picks the model for a call.
+
+    Args:
+        group: Cascade group (PLANNER or EDITOR)
+        escalated: Whether validation already failed for this group
+        config: Configuration with the models and policies
+
+    Returns:
+        Model name
+    """
+    policy = policy_for(group, config)
+    if policy == "worker":
+        return config.worker_model
+    if policy == "cascade" and not escalated:
+        return config.worker_model
+    return config.critic_model
+
+
+def can_escalate(group: str, config: RoadmapConfiguration = config) -> bool:
+    return policy_for(group, config) == "cascade"
+
+
+def is_escalated(state, group: str, invocation_id: Optional[str]) -> bool:
+    marker = (state.get(ESCALATION_KEY) or {}).get(group)
+    return marker is True or (marker is not None and marker == invocation_id)
+
+
+def escalation_delta(state, group: str, invocation_id: str) -> dict:
+    """
+    Records an escalation and returns the state delta that marks it.
+
+    Args:
+        state: Current session state
+        group: Cascade group that failed validation
+        invocation_id: Invocation the escalation applies to
+
+    Returns:
+        State delta to attach to an event
+    """
+    _stats(group)["escalations"] += 1
+    markers = dict(state.get(ESCALATION_KEY) or {})
+    markers[group] = invocation_id
+    return {ESCALATION_KEY: markers}
+
+
+def escalated_state(group: str) -> dict:
+    """Initial state for an isolated run that should use the escalated model."""
+    return {ESCALATION_KEY: {group: True}}
+
+
+def cascade_model_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+    config: RoadmapConfiguration = config,
+) -> None:
+    """
+    Sets the model of each request according to the agent's cascade policy.
+
+    Args:
+        callback_context: Context from the model callback
+        llm_request: Outgoing model request (mutated in place)
+        config: Configuration with the models and policies
+    """
+    group = AGENT_GROUPS.get(callback_context.agent_name)
+    if group is None:
+        return None
+
+    escalated = is_escalated(
+        callback_context.state, group, callback_context.invocation_id
+    )
+    llm_request.model = model_for(group, escalated, config)
+
+    stats = _stats(group)
+    if llm_request.model == config.worker_model:
+        stats["worker_calls"] += 1
+    else:
+        stats["critic_calls"] += 1
+    return None
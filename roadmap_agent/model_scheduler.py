@@ -0,0 +1,383 @@
+"""
+Model Scheduler
+Per-model rate limits and priority queueing for outbound model calls
+
+Every agent's model is a `ScheduledLlm`. At call time it resolves the
+real backend for the request's model (Gemini, or an installed cassette),
+so cascade escalations are limited as the model they really use. The call
+then goes through the process-wide `model_scheduler`:
+
+- Each model in `model_rate_limits` has a token bucket (requests per
+  minute, burst). A call takes one token; when none is left it waits in
+  the model's queue. The quota belongs to the API project, so graphs
+  built for different configurations share a model's bucket, created
+  from the limits of the first call to it.
+- Waiting calls are admitted by priority, then in arrival order:
+  interactive turns first, then batch generation, then background work
+  (speculative enrichment, domain refreshes). The priority comes from
+  the task making the call (see `call_priority`).
+- A 429 (RESOURCE_EXHAUSTED) pauses the model for the server's retry
+  delay, or an exponential backoff, and halves its rate. The call is
+  retried in place up to `model_max_retries` times if nothing was streamed
+  yet, so quota errors don't turn into LoopAgent retries. Each success
+  wins back part of the rate.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import re
+import time
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Callable, Iterator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from pydantic import Field, PrivateAttr
+
+from .config import RoadmapConfiguration, config
+from .metrics import metrics
+
+# Priority classes, most urgent first
+PRIORITIES = ("interactive", "batch", "background")
+
+# Share of the configured rate a model keeps however often it is throttled
+MIN_RATE_FRACTION = 0.1
+# Share of the configured rate won back per successful call
+RECOVERY_FRACTION = 0.05
+
+_priority: ContextVar[str] = ContextVar("model_call_priority", default="interactive")
+
+queue_wait = metrics.histogram(
+    "model_queue_wait_seconds",
+    "Time model calls waited for a rate-limit token",
+    buckets=(0, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+rate_limited = metrics.counter("model_rate_limited_total", "Model calls rejected with 429")
+retries = metrics.counter("model_call_retries_total", "Model calls retried after a 429")
+
+
+@contextmanager
+def call_priority(priority: str) -> Iterator[None]:
+    """
+    Runs the model calls made in the block, and in tasks started from it,
+    at `priority` (one of `PRIORITIES`).
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for a quota error (HTTP 429 / RESOURCE_EXHAUSTED)."""
+    return getattr(error, "code", None) == 429 or getattr(error, "status", None) == "RESOURCE_EXHAUSTED"
+
+
+def retry_delay(error: Exception) -> Optional[float]:
+    """Seconds the server asked to wait (RetryInfo.retryDelay), if any."""
+    details = getattr(error, "details", None)
+    if not isinstance(details, dict):
+        return None
+    for detail in (details.get("error") or {}).get("details") or []:
+        match = re.fullmatch(r"([\d.]+)s", str(detail.get("retryDelay", "")))
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self._updated) * self.rate)
+        self._updated = max(self._updated, now)
+
+    def take(self) -> float:
+        """
+        Takes one token if there is one.
+
+        Returns:
+            0 when a token was taken, otherwise the seconds until one is due
+        """
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def drain(self, until: float) -> None:
+        """Empties the bucket; it refills again from `until` (clock time)."""
+        self.tokens = 0.0
+        self._updated = max(self._updated, until)
+
+
+class _ModelLane:
+    """Token bucket, waiting calls and counters of one model."""
+
+    def __init__(self, requests_per_minute: float, burst: float):
+        self.limit = requests_per_minute / 60
+        self.bucket = TokenBucket(self.limit, max(1.0, burst))
+        self.waiters: list = []
+        self.paused_until = 0.0
+        self.consecutive_limits = 0
+        self.pump: Optional[asyncio.Task] = None
+        self.admitted = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.rate_limited = 0
+        self.retries = 0
+
+
+class ModelScheduler:
+    """
+    Process-wide admission control for model calls (see the module
+    docstring). Models without a configured limit pass straight through.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[dict] = None,
+        max_retries: int = 4,
+        backoff_seconds: float = 2.0,
+        backoff_max_seconds: float = 60.0,
+    ):
+        self.limits = limits
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._lanes: dict = {}
+        self._order = itertools.count()
+
+    def _lane(self, model: str, limits: Optional[dict] = None) -> Optional[_ModelLane]:
+        lane = self._lanes.get(model)
+        if lane is None:
+            if limits is None:
+                limits = self.limits if self.limits is not None else config.model_rate_limits
+            limit = (limits or {}).get(model)
+            if not limit:
+                return None
+            lane = self._lanes[model] = _ModelLane(limit["requests_per_minute"], limit.get("burst", 1))
+        return lane
+
+    def _admit(self, lane: _ModelLane) -> float:
+        """Takes a token unless the model is paused; returns the wait otherwise."""
+        now = time.monotonic()
+        if now < lane.paused_until:
+            return lane.paused_until - now
+        return lane.bucket.take()
+
+    async def _pump(self, lane: _ModelLane) -> None:
+        loop = asyncio.get_running_loop()
+        while lane.waiters:
+            _, _, future = lane.waiters[0]
+            # Skip callers that gave up (or belong to a finished event loop)
+            if future.done() or future.get_loop() is not loop:
+                heapq.heappop(lane.waiters)
+                continue
+            delay = self._admit(lane)
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(lane.waiters)
+            future.set_result(None)
+        lane.pump = None
+
+    async def acquire(
+        self, model: str, priority: Optional[str] = None, limits: Optional[dict] = None
+    ) -> None:
+        """
+        Waits until a call to `model` may start.
+
+        Args:
+            model: Model name
+            priority: One of `PRIORITIES`; defaults to the caller's `call_priority`
+            limits: Rate limits by model (defaults to the scheduler's limits)
+        """
+        lane = self._lane(model, limits)
+        if lane is None:
+            return
+        priority = priority or _priority.get()
+        started = time.perf_counter()
+        if lane.waiters or self._admit(lane):
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            heapq.heappush(lane.waiters, (PRIORITIES.index(priority), next(self._order), future))
+            lane.queued += 1
+            lane.max_queued = max(lane.max_queued, len(lane.waiters))
+            if lane.pump is None or lane.pump.done() or lane.pump.get_loop() is not loop:
+                lane.pump = loop.create_task(self._pump(lane))
+            try:
+                await future
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+        lane.admitted += 1
+        queue_wait.observe(time.perf_counter() - started, model=model, priority=priority)
+
+    def record_rate_limit(self, model: str, delay: Optional[float] = None, attempt: int = 1) -> float:
+        """
+        Backs a model off after a 429.
+
+        Args:
+            model: Model that returned the error
+            delay: Server-requested retry delay in seconds
+            attempt: Consecutive 429s of the call (used for models without
+                a limit, which don't keep their own count)
+
+        Returns:
+            Seconds to wait before the next call to the model
+        """
+        rate_limited.inc(model=model)
+        lane = self._lanes.get(model)
+        if lane is not None:
+            lane.rate_limited += 1
+            lane.consecutive_limits += 1
+            attempt = lane.consecutive_limits
+        if delay is None:
+            backoff = self.backoff_seconds * 2 ** (attempt - 1)
+            delay = min(self.backoff_max_seconds, backoff) * random.uniform(0.5, 1.0)
+        if lane is None:
+            return delay
+        now = time.monotonic()
+        lane.paused_until = max(lane.paused_until, now + delay)
+        lane.bucket.rate = max(lane.limit * MIN_RATE_FRACTION, lane.bucket.rate / 2)
+        lane.bucket.drain(lane.paused_until)
+        return delay
+
+    def record_success(self, model: str) -> None:
+        """Lets a model that was backed off win back part of its rate."""
+        lane = self._lanes.get(model)
+        if lane is None:
+            return
+        lane.consecutive_limits = 0
+        lane.bucket.rate = min(lane.limit, lane.bucket.rate + lane.limit * RECOVERY_FRACTION)
+
+    async def call(
+        self,
+        model: str,
+        generate: Callable[[], AsyncGenerator[LlmResponse, None]],
+        limits: Optional[dict] = None,
+    ) -> AsyncGenerator[LlmResponse, None]:
+        """
+        Runs one model call under the model's limit, retrying on 429.
+
+        Args:
+            model: Model name
+            generate: Starts the call (a fresh response generator per attempt)
+            limits: Rate limits by model (defaults to the scheduler's limits)
+
+        Yields:
+            The call's responses
+        """
+        priority = _priority.get()
+        attempt = 0
+        while True:
+            await self.acquire(model, priority, limits)
+            streamed = False
+            try:
+                async with aclosing(generate()) as responses:
+                    async for response in responses:
+                        streamed = True
+                        yield response
+            except Exception as error:
+                if not is_rate_limit_error(error):
+                    raise
+                delay = self.record_rate_limit(model, retry_delay(error), attempt + 1)
+                if streamed or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                retries.inc(model=model)
+                lane = self._lanes.get(model)
+                if lane is not None:
+                    lane.retries += 1
+                else:
+                    # Limited models wait in `acquire` until the pause ends
+                    await asyncio.sleep(delay)
+                continue
+            self.record_success(model)
+            return
+
+    def stats(self) -> dict:
+        gauges: dict = {}
+        for model, lane in self._lanes.items():
+            for field, value in (
+                ("queue_depth", len(lane.waiters)),
+                ("max_queue_depth", lane.max_queued),
+                ("queued", lane.queued),
+                ("admitted", lane.admitted),
+                ("rate_limited", lane.rate_limited),
+                ("retries", lane.retries),
+                ("requests_per_minute", round(lane.bucket.rate * 60, 3)),
+            ):
+                gauges.setdefault(field, {})[model] = value
+        return gauges
+
+
+model_scheduler = ModelScheduler(
+    max_retries=config.model_max_retries,
+    backoff_seconds=config.model_backoff_seconds,
+    backoff_max_seconds=config.model_backoff_max_seconds,
+)
+
+
+class ScheduledLlm(BaseLlm):
+    """
+    Model that sends every call through `model_scheduler`, using the
+    backend registered for the request's model at call time and the rate
+    limits of its configuration.
+    """
+
+    config: RoadmapConfiguration = Field(default_factory=lambda: config)
+    _backends: dict = PrivateAttr(default_factory=dict)
+
+    def _backend(self, model: str) -> BaseLlm:
+        """
+        Backend for `model`, built once and reused (building one creates an
+        API client). It is rebuilt when a different backend class is
+        registered for the model, i.e. when a cassette is installed or removed.
+        """
+        backend_class = LLMRegistry.resolve(model)
+        backend = self._backends.get(model)
+        if type(backend) is not backend_class:
+            backend = self._backends[model] = backend_class(model=model)
+        return backend
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        model = llm_request.model or self.model
+        backend = self._backend(model)
+        if not self.config.enable_model_scheduler:
+            async with aclosing(backend.generate_content_async(llm_request, stream=stream)) as responses:
+                async for response in responses:
+                    yield response
+            return
+        async with aclosing(model_scheduler.call(
+            model,
+            lambda: backend.generate_content_async(llm_request, stream=stream),
+            self.config.model_rate_limits,
+        )) as responses:
+            async for response in responses:
+                yield response
+
+    def connect(self, llm_request: LlmRequest):
+        return self._backend(llm_request.model or self.model).connect(llm_request)
+
+
+def scheduled_model(model: str, config: RoadmapConfiguration = config) -> ScheduledLlm:
+    """Model for an agent: `model` behind the process-wide scheduler."""
+    return ScheduledLlm(model=model, config=config)
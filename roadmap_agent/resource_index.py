@@ -0,0 +1,371 @@
+"""
+Local Learning-Resource Index
+SQLite catalog of learning resources with a TF-IDF index for offline lookups
+
+Grow the catalog from curated roadmaps (markdown or JSON saved by
+`save_roadmap_to_file`) or JSONL records:
+
+    python -m roadmap_agent.resource_index ingest roadmaps/*.md --difficulty beginner
+    python -m roadmap_agent.resource_index stats
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Optional
+from urllib.parse import urlparse
+
+from .config import config
+from .domain_store import normalize_level
+from .roadmap_model import parse_roadmap
+
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+RESOURCE_TYPES = ("video", "course", "article", "interactive")
+
+_LEVEL_RANK = {"beginner": 0, "basics": 1, "intermediate": 2, "advanced": 3}
+
+_MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\((https?://[^\s)]+)\)")
+_BARE_LINK = re.compile(r"https?://[^\s)\]>\"']+")
+_TITLE_STRIP = " \t*#:-–|()[]"
+
+# Host and wording hints, checked in order; anything else is an article
+_TYPE_HINTS = [
+    ("video", ("youtube.com", "youtu.be", "vimeo.com", "video", "watch", "playlist")),
+    ("course", ("coursera.org", "udemy.com", "edx.org", "udacity.com", "course", "bootcamp")),
+    ("interactive", (
+        "leetcode.com", "hackerrank.com", "exercism.org", "codewars.com", "kaggle.com",
+        "freecodecamp.org/learn", "codecademy.com", "practice", "exercise",
+        "interactive", "challenge",
+    )),
+]
+
+
+def normalize_resource_type(resource_type: Optional[str]) -> str:
+    """Maps free-text resource types onto `RESOURCE_TYPES` ("mixed" if unknown)."""
+    text = (resource_type or "").lower()
+    if text in ("reading", "documentation", "docs", "book", "tutorial"):
+        return "article"
+    if text in ("hands-on", "practice", "project", "exercise"):
+        return "interactive"
+    return text if text in RESOURCE_TYPES else "mixed"
+
+
+def infer_resource_type(url: str, text: str = "") -> str:
+    """Guesses a resource's type from its URL and the text around it."""
+    haystack = f"{url} {text}".lower()
+    for resource_type, hints in _TYPE_HINTS:
+        if any(hint in haystack for hint in hints):
+            return resource_type
+    return "article"
+
+
+@dataclass(slots=True)
+class Resource:
+    """A catalogued learning resource."""
+
+    url: str
+    title: str
+    topic: str
+    resource_type: str = "article"
+    difficulty: str = "any"
+    quality: float = 0.5
+    seen_count: int = 1
+
+    @property
+    def document(self) -> str:
+        """Text the TF-IDF index matches topics against."""
+        return f"{self.title} {self.topic}"
+
+
+class ResourceIndex:
+    """
+    Catalog of learning resources with an in-memory TF-IDF index.
+
+    Resources live in a small SQLite database keyed by URL; the TF-IDF
+    matrix is built on the first search and rebuilt after the catalog
+    changes. `search` ranks resources by text similarity to the topic,
+    weighted by difficulty fit and quality, and reports the best raw
+    similarity as its confidence so callers can fall back to live search.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lookups = 0
+        self.confident = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._resources: Optional[list] = None
+        self._vectorizer: Optional["TfidfVectorizer"] = None
+        self._matrix = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resources (
+                    url TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    resource_type TEXT NOT NULL,
+                    difficulty TEXT NOT NULL,
+                    quality REAL NOT NULL,
+                    seen_count INTEGER NOT NULL DEFAULT 1,
+                    added_at REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def add(self, resources: Iterable[Resource]) -> int:
+        """
+        Adds resources to the catalog.
+
+        A URL that is already catalogued counts as another sighting: its
+        seen count goes up, and its quality becomes the higher of the stored
+        quality, the new one and the popularity score `1 - 0.5 ** seen_count`.
+
+        Args:
+            resources: Resources to add
+
+        Returns:
+            Number of resources that were new to the catalog
+        """
+        added = 0
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            for resource in resources:
+                row = conn.execute(
+                    "SELECT quality, seen_count FROM resources WHERE url = ?",
+                    (resource.url,),
+                ).fetchone()
+                if row is None:
+                    conn.execute(
+                        "INSERT INTO resources VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            resource.url, resource.title, resource.topic,
+                            resource.resource_type, resource.difficulty,
+                            resource.quality, resource.seen_count, now,
+                        ),
+                    )
+                    added += 1
+                else:
+                    seen_count = row[1] + resource.seen_count
+                    quality = max(row[0], resource.quality, 1 - 0.5 ** seen_count)
+                    conn.execute(
+                        "UPDATE resources SET quality = ?, seen_count = ? WHERE url = ?",
+                        (quality, seen_count, resource.url),
+                    )
+            conn.commit()
+            self._resources = None
+        return added
+
+    def _ensure_index(self) -> None:
+        # Called with the lock held
+        if self._resources is not None:
+            return
+        rows = self._connection().execute(
+            "SELECT url, title, topic, resource_type, difficulty, quality, seen_count "
+            "FROM resources ORDER BY added_at, url"
+        ).fetchall()
+        self._resources = [Resource(*row) for row in rows]
+        if not rows:
+            self._vectorizer = self._matrix = None
+            return
+        # scikit-learn is only loaded once the catalog is searched
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self._vectorizer = TfidfVectorizer(
+            ngram_range=(1, 2),
+            sublinear_tf=True,
+            token_pattern=r"(?u)\b\w[\w+#]*",
+        )
+        self._matrix = self._vectorizer.fit_transform(
+            resource.document for resource in self._resources
+        )
+
+    def search(
+        self,
+        topic: str,
+        resource_type: str = "mixed",
+        difficulty: Optional[str] = None,
+        limit: int = 5,
+        min_score: Optional[float] = None,
+    ) -> tuple[list, float]:
+        """
+        Finds the catalogued resources that best match a topic.
+
+        Args:
+            topic: Learning topic (e.g., "SQL joins")
+            resource_type: Type to restrict to, or "mixed" for any
+            difficulty: Learner's level; closer levels rank higher
+            limit: Maximum number of resources to return
+            min_score: Confidence counted as a confident lookup in `stats`
+                (defaults to `config.resource_index_min_score`)
+
+        Returns:
+            Tuple of (list of (Resource, score), confidence), where confidence
+            is the best text similarity among the returned resources
+        """
+        wanted_type = normalize_resource_type(resource_type)
+        level = _LEVEL_RANK.get(normalize_level(difficulty))
+        with self._lock:
+            self.lookups += 1
+            self._ensure_index()
+            if self._matrix is None:
+                return [], 0.0
+            similarity = (
+                self._matrix @ self._vectorizer.transform([topic]).T
+            ).toarray().ravel()
+            resources = self._resources
+
+        ranked = []
+        for position in similarity.nonzero()[0]:
+            resource = resources[position]
+            if wanted_type != "mixed" and resource.resource_type != wanted_type:
+                continue
+            rank = _LEVEL_RANK.get(resource.difficulty)
+            fit = 0.9 if level is None or rank is None else 1.0 - 0.2 * abs(level - rank)
+            relevance = float(similarity[position])
+            score = relevance * fit * (0.5 + 0.5 * resource.quality)
+            ranked.append((score, relevance, resource))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        ranked = ranked[:limit]
+
+        confidence = max((relevance for _, relevance, _ in ranked), default=0.0)
+        if min_score is None:
+            min_score = config.resource_index_min_score
+        if confidence >= min_score:
+            self.confident += 1
+        return [(resource, score) for score, _, resource in ranked], confidence
+
+    def stats(self) -> dict:
+        with self._lock:
+            (size,) = self._connection().execute("SELECT COUNT(*) FROM resources").fetchone()
+        return {
+            "lookups": self.lookups,
+            "confident": self.confident,
+            "fallbacks": self.lookups - self.confident,
+            "size": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._resources = None
+
+
+resource_index = ResourceIndex(os.path.join(config.cache_dir, "resource_index.sqlite3"))
+
+
+def extract_resources(markdown: str, difficulty: Optional[str] = None) -> list:
+    """
+    Extracts the linked resources from a curated roadmap.
+
+    Each link becomes a resource whose topic is the week and day it appears
+    under; its title is the link text (or the rest of the line) and its type
+    is inferred from the URL and wording. Links outside any week are skipped.
+
+    Args:
+        markdown: Roadmap or learning-resources markdown
+        difficulty: Experience level the roadmap was written for
+
+    Returns:
+        List of Resources, one per distinct URL
+    """
+    roadmap = parse_roadmap(markdown)
+    level = normalize_level(difficulty)
+    sections = []
+    for week in roadmap.weeks:
+        first_day = week.days[0].start if week.days else week.end
+        sections.append((week.start, first_day, week.title))
+        sections.extend(
+            (day.start, day.end, " - ".join(filter(None, [week.title, day.title])))
+            for day in week.days
+        )
+
+    resources = {}
+    for start, end, topic in sections:
+        for line in markdown[start:end].splitlines():
+            links = _MARKDOWN_LINK.findall(line) or [
+                (_BARE_LINK.sub("", line), url) for url in _BARE_LINK.findall(line)
+            ]
+            for title, url in links:
+                url = url.rstrip(".,;")
+                title = title.replace("**", "").strip(_TITLE_STRIP) or urlparse(url).netloc
+                if url in resources or not (topic or title):
+                    continue
+                resources[url] = Resource(
+                    url=url,
+                    title=title,
+                    topic=topic,
+                    resource_type=infer_resource_type(url, line),
+                    difficulty=level,
+                )
+    return list(resources.values())
+
+
+def _read_resources(path: str, difficulty: Optional[str]) -> list:
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".jsonl"):
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        return [
+            Resource(
+                url=record["url"],
+                title=record.get("title") or record["url"],
+                topic=record.get("topic", ""),
+                resource_type=normalize_resource_type(record.get("type"))
+                if record.get("type") else infer_resource_type(record["url"]),
+                difficulty=normalize_level(record.get("difficulty") or difficulty),
+                quality=float(record.get("quality", 0.5)),
+            )
+            for record in records
+        ]
+    if path.endswith(".json"):
+        text = json.loads(text).get("content", "")
+    return extract_resources(text, difficulty)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local learning-resource index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser(
+        "ingest", help="Add resources from roadmaps (.md/.json) or catalog records (.jsonl)"
+    )
+    ingest.add_argument("paths", nargs="+")
+    ingest.add_argument("--difficulty", help="Level the roadmaps were written for")
+    commands.add_parser("stats", help="Print catalog counters")
+    parser.add_argument("--index", default=resource_index.path, help="Catalog database path")
+    args = parser.parse_args(argv)
+
+    index = ResourceIndex(args.index)
+    if args.command == "ingest":
+        for path in args.paths:
+            resources = _read_resources(path, args.difficulty)
+            added = index.add(resources)
+            print(f"{path}: {len(resources)} resources, {added} new")
+    print(json.dumps(index.stats(), indent=2))
+    index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
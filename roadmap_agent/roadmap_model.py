@@ -0,0 +1,390 @@
+"""
+Structured Roadmap Model
+Compact weeks -> days representation of roadmap markdown with a single-pass parser
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+_WEEKDAYS = "monday|tuesday|wednesday|thursday|friday|saturday|sunday|weekend"
+_LABELS = (
+    r"learning[ ]objectives?|objectives?|goals?|key[ ]concepts|concepts|topics"
+    "|practice|exercises?|hands-on|resources|materials"
+)
+
+# One alternation so every line is classified by a single regex match.
+_LINE = re.compile(
+    rf"""
+    ^[ \t]*(?:
+        (?:\#{{1,6}}[ \t]*)?\**[ \t]*week[ \t]+(?P<week>\d+)\b(?P<week_title>.*)
+      | (?:\#{{1,6}}[ \t]*|[-*+][ \t]+)?\**[ \t]*
+        (?:day[ \t]+(?P<day>\d+)(?:[ \t]*[-–&][ \t]*\d+)?|(?P<weekday>{_WEEKDAYS}))\b
+        (?P<day_title>.*)
+      | (?:\#{{1,6}}[ \t]*|[-*+][ \t]+)?\**[ \t]*(?P<label>{_LABELS})\**[ \t]*:\**[ \t]*
+        (?P<label_rest>.*)
+      | \#{{1,6}}[ \t]*(?P<heading_label>{_LABELS})\b[ \t]*:?(?P<heading_rest>.*)
+      | (?:[-*+]|\d+\.)[ \t]+(?P<item>.*)
+    )
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+_LINK = re.compile(r"https?://[^\s)\]>\"']+")
+_TITLE_STRIP = " \t*#:-–"
+
+_SECTION_FOR_LABEL = {
+    "objective": "objectives",
+    "goal": "objectives",
+    "concept": "concepts",
+    "topic": "concepts",
+    "practice": "practice",
+    "exercise": "practice",
+    "hands-on": "practice",
+    "resource": "resources",
+    "material": "resources",
+}
+
+
+def _section_for(label: str) -> str:
+    label = label.lower()
+    for prefix, section in _SECTION_FOR_LABEL.items():
+        if prefix in label:
+            return section
+    return "objectives"
+
+
+def digest(text: str) -> str:
+    """Returns a short content hash used to tag derived state values."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(slots=True)
+class Day:
+    """A single day (or weekend block) of a roadmap week."""
+
+    label: str
+    number: Optional[int] = None
+    title: str = ""
+    objectives: list = field(default_factory=list)
+    concepts: list = field(default_factory=list)
+    practice: list = field(default_factory=list)
+    resources: list = field(default_factory=list)
+    start: int = 0
+    end: int = 0
+
+
+@dataclass(slots=True)
+class Week:
+    """A roadmap week and its days, with the span it covers in the source."""
+
+    number: int
+    title: str = ""
+    days: list = field(default_factory=list)
+    objectives: list = field(default_factory=list)
+    concepts: list = field(default_factory=list)
+    practice: list = field(default_factory=list)
+    resources: list = field(default_factory=list)
+    start: int = 0
+    end: int = 0
+
+
+@dataclass(slots=True)
+class Roadmap:
+    """
+    Parsed roadmap.
+
+    Weeks and days keep character spans into `source`, so sections can be
+    sliced out or replaced without re-rendering the rest of the document.
+    """
+
+    source: str
+    weeks: list = field(default_factory=list)
+    preamble_end: int = 0
+
+    @property
+    def preamble(self) -> str:
+        return self.source[:self.preamble_end]
+
+    @property
+    def day_count(self) -> int:
+        return sum(len(week.days) for week in self.weeks)
+
+    def week(self, number: int) -> Optional[Week]:
+        for week in self.weeks:
+            if week.number == number:
+                return week
+        return None
+
+    def week_text(self, week: Week) -> str:
+        return self.source[week.start:week.end]
+
+    def day_text(self, day: Day) -> str:
+        return self.source[day.start:day.end]
+
+    def with_weeks_replaced(self, replacements: dict) -> "Roadmap":
+        """
+        Returns a new roadmap with the text of some weeks replaced.
+
+        Untouched weeks and the preamble are copied byte for byte.
+
+        Args:
+            replacements: Mapping of week number to new week markdown
+
+        Returns:
+            Re-parsed roadmap
+        """
+        parts = [self.preamble]
+        for week in self.weeks:
+            text = replacements.get(week.number)
+            if text is None:
+                parts.append(self.week_text(week))
+            else:
+                parts.append(_with_section_break(text, self.week_text(week)))
+        known = {week.number for week in self.weeks}
+        for number in sorted(set(replacements) - known):
+            if parts and not parts[-1].endswith("\n\n"):
+                parts.append("\n" if parts[-1].endswith("\n") else "\n\n")
+            parts.append(replacements[number].strip() + "\n")
+        return parse_roadmap("".join(parts))
+
+    def to_dict(self) -> dict:
+        """Returns a JSON-serializable form without the source text."""
+        return {
+            "digest": digest(self.source),
+            "preamble_end": self.preamble_end,
+            "weeks": [
+                {
+                    "number": week.number,
+                    "title": week.title,
+                    "objectives": week.objectives,
+                    "concepts": week.concepts,
+                    "practice": week.practice,
+                    "resources": week.resources,
+                    "span": [week.start, week.end],
+                    "days": [
+                        {
+                            "label": day.label,
+                            "number": day.number,
+                            "title": day.title,
+                            "objectives": day.objectives,
+                            "concepts": day.concepts,
+                            "practice": day.practice,
+                            "resources": day.resources,
+                            "span": [day.start, day.end],
+                        }
+                        for day in week.days
+                    ],
+                }
+                for week in self.weeks
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, source: str) -> "Roadmap":
+        """Rebuilds a roadmap from `to_dict()` output and its source text."""
+        weeks = []
+        for week_data in data.get("weeks", []):
+            days = [
+                Day(
+                    label=day["label"],
+                    number=day["number"],
+                    title=day["title"],
+                    objectives=day["objectives"],
+                    concepts=day["concepts"],
+                    practice=day["practice"],
+                    resources=day["resources"],
+                    start=day["span"][0],
+                    end=day["span"][1],
+                )
+                for day in week_data["days"]
+            ]
+            weeks.append(Week(
+                number=week_data["number"],
+                title=week_data["title"],
+                days=days,
+                objectives=week_data["objectives"],
+                concepts=week_data["concepts"],
+                practice=week_data["practice"],
+                resources=week_data["resources"],
+                start=week_data["span"][0],
+                end=week_data["span"][1],
+            ))
+        return cls(source=source, weeks=weeks, preamble_end=data.get("preamble_end", 0))
+
+
+def _with_section_break(text: str, original: str) -> str:
+    """Keeps the blank-line spacing of the week being replaced."""
+    trailing = original[len(original.rstrip()):]
+    return text.strip() + (trailing or "\n")
+
+
+def _clean_title(text: str) -> str:
+    return text.strip(_TITLE_STRIP).replace("**", "").strip()
+
+
+def parse_roadmap(text: str) -> Roadmap:
+    """
+    Parses roadmap markdown into weeks, days and their sections in one pass.
+
+    Recognizes week headings ("## Week 1: ...", "**Week 2**"), day headings
+    ("### Day 3", "- **Monday**:", "Weekend"), labelled sections
+    ("Objective:", "**Key Concepts:**", "#### Practice") and links.
+    Content before the first week is kept as the preamble.
+
+    Args:
+        text: Roadmap markdown
+
+    Returns:
+        Parsed Roadmap
+    """
+    roadmap = Roadmap(source=text, preamble_end=len(text))
+    week: Optional[Week] = None
+    day: Optional[Day] = None
+    section: Optional[str] = None
+    offset = 0
+
+    for line in text.splitlines(keepends=True):
+        line_start = offset
+        offset += len(line)
+
+        match = _LINE.match(line)
+        group = match.lastgroup if match else None
+
+        if match and match.group("week") is not None:
+            if week is None:
+                roadmap.preamble_end = line_start
+            else:
+                week.end = line_start
+                if day is not None:
+                    day.end = line_start
+            week = Week(
+                number=int(match.group("week")),
+                title=_clean_title(match.group("week_title")),
+                start=line_start,
+            )
+            roadmap.weeks.append(week)
+            day = None
+            section = None
+        elif week is None:
+            continue
+        elif match and (match.group("day") is not None or match.group("weekday")):
+            if day is not None:
+                day.end = line_start
+            number = match.group("day")
+            day = Day(
+                label=f"Day {number}" if number else match.group("weekday").title(),
+                number=int(number) if number else None,
+                title=_clean_title(match.group("day_title")),
+                start=line_start,
+            )
+            week.days.append(day)
+            section = None
+        elif match and (match.group("label") or match.group("heading_label")):
+            label = match.group("label") or match.group("heading_label")
+            rest = match.group("label_rest") if match.group("label") else match.group("heading_rest")
+            section = _section_for(label)
+            rest = _clean_title(rest or "")
+            if rest and section != "resources":
+                getattr(day or week, section).append(rest)
+        elif section is not None and section != "resources":
+            item = match.group("item") if group == "item" else line.strip()
+            if item:
+                getattr(day or week, section).append(item.strip())
+
+        if "http" in line:
+            getattr(day or week, "resources").extend(_LINK.findall(line))
+
+    if week is not None:
+        week.end = len(text)
+        if day is not None:
+            day.end = len(text)
+    return roadmap
+
+
+def week_heading(line: str) -> Optional[int]:
+    """Returns the week number if `line` is a week heading, otherwise None."""
+    match = _LINE.match(line)
+    if match and match.group("week") is not None:
+        return int(match.group("week"))
+    return None
+
+
+def render_roadmap(roadmap: Roadmap) -> str:
+    """
+    Renders a roadmap back to markdown.
+
+    Parsed roadmaps render to their exact source. Roadmaps built from data
+    (no source text) are rendered from their fields.
+
+    Args:
+        roadmap: Roadmap to render
+
+    Returns:
+        Markdown text
+    """
+    if roadmap.source:
+        return roadmap.source
+
+    lines = []
+    for week in roadmap.weeks:
+        lines.append(f"## Week {week.number}: {week.title}".rstrip(": ") + "\n")
+        for day in week.days:
+            lines.append(f"### {day.label}: {day.title}".rstrip(": ") + "\n")
+            for heading, items in (
+                ("Objectives", day.objectives),
+                ("Concepts", day.concepts),
+                ("Practice", day.practice),
+                ("Resources", day.resources),
+            ):
+                if items:
+                    lines.append(f"**{heading}:**\n")
+                    lines.extend(f"- {item}\n" for item in items)
+            lines.append("\n")
+    return "".join(lines)
+
+
+def structure_key(state_key: str) -> str:
+    """Name of the state key holding the parsed form of `state_key`."""
+    return f"{state_key}_structure"
+
+
+def roadmap_from_state(state, state_key: str) -> Optional[Roadmap]:
+    """
+    Returns the parsed roadmap for a state key, reusing the stored structure
+    when it was built from the current text.
+
+    Args:
+        state: Session state (or any mapping)
+        state_key: Key holding roadmap markdown
+
+    Returns:
+        Parsed Roadmap, or None if the key is empty
+    """
+    text = state.get(state_key)
+    if not text:
+        return None
+    stored = state.get(structure_key(state_key))
+    if stored and stored.get("digest") == digest(text):
+        return Roadmap.from_dict(stored, text)
+    return parse_roadmap(text)
+
+
+def approved_roadmap(state) -> Optional[Roadmap]:
+    """
+    Returns the parsed roadmap the user is currently working with.
+
+    `final_roadmap` is also the orchestrator's output key, so it is only used
+    when it actually contains week sections; otherwise `roadmap_outline`.
+
+    Args:
+        state: Session state (or any mapping)
+
+    Returns:
+        Parsed Roadmap, or None if neither key is set
+    """
+    final_roadmap = roadmap_from_state(state, "final_roadmap")
+    if final_roadmap is not None and final_roadmap.weeks:
+        return final_roadmap
+    return roadmap_from_state(state, "roadmap_outline") or final_roadmap
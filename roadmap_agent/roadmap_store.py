@@ -0,0 +1,373 @@
+"""
+Approved Roadmap Store
+SQLite store of approved roadmaps with a TF-IDF index over learner profiles,
+used to seed the planner with the nearest past roadmap
+
+The index is refitted from the whole store (new vocabulary, fresh IDF
+weights) and saved next to the database with:
+
+    python -m roadmap_agent.roadmap_store rebuild
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest
+
+from .agent_utils import learner_profile
+from .config import RoadmapConfiguration, config
+from .domain_store import normalize_domain, normalize_level
+from .roadmap_model import approved_roadmap, digest
+from .validation import roadmap_issues
+
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def _hours(time_commitment: Optional[str]) -> str:
+    text = (time_commitment or "").lower()
+    match = _NUMBER.search(text)
+    if match is None:
+        return "any"
+    hours = float(match.group())
+    if "min" in text and "hour" not in text:
+        hours /= 60
+    return str(max(1, round(hours)))
+
+
+def _learning_style(learning_style: Optional[str]) -> str:
+    text = (learning_style or "").lower()
+    for style in config.supported_learning_styles:
+        if style in text:
+            return style
+    return "any"
+
+
+# Share of the domain similarity lost for each profile attribute that differs
+_ATTRIBUTE_WEIGHTS = {"level": 0.15, "style": 0.1, "hours": 0.05}
+
+
+def profile_key(profile: dict) -> dict:
+    """Normalized domain, level, learning style and daily hours of a profile."""
+    return {
+        "domain": normalize_domain(profile.get("target_domain") or ""),
+        "level": normalize_level(profile.get("experience_level")),
+        "style": _learning_style(profile.get("learning_style")),
+        "hours": _hours(profile.get("time_commitment")),
+    }
+
+
+class RoadmapStore:
+    """
+    Store of approved roadmaps, searchable by learner profile.
+
+    Roadmaps live in SQLite. Similarity is the cosine similarity of the
+    domains' TF-IDF vectors, scaled down for every profile attribute (level,
+    learning style, daily hours) that differs, so a roadmap for another
+    domain never wins on matching attributes alone. The index is loaded from
+    the file written by `rebuild` (or fitted on first use when there is
+    none); roadmaps added since are appended with the existing vocabulary
+    until the next rebuild.
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None):
+        self.path = path
+        self.index_path = index_path or f"{path}.index"
+        self.lookups = 0
+        self.matches = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._reset_index()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS roadmaps (
+                    id INTEGER PRIMARY KEY,
+                    digest TEXT NOT NULL UNIQUE,
+                    profile TEXT NOT NULL,
+                    domain TEXT NOT NULL,
+                    level TEXT NOT NULL,
+                    style TEXT NOT NULL,
+                    hours TEXT NOT NULL,
+                    roadmap TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def add_many(self, entries: Iterable[tuple[dict, str]]) -> int:
+        """
+        Stores approved roadmaps; a roadmap already stored for the same
+        profile is skipped.
+
+        Args:
+            entries: (learner profile, roadmap markdown) pairs
+
+        Returns:
+            Number of roadmaps added
+        """
+        now = time.time()
+        rows = [
+            (
+                digest(json.dumps([profile, roadmap], sort_keys=True)),
+                json.dumps(profile, sort_keys=True),
+                *profile_key(profile).values(),
+                roadmap,
+                now,
+            )
+            for profile, roadmap in entries
+        ]
+        with self._lock:
+            conn = self._connection()
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO roadmaps "
+                "(digest, profile, domain, level, style, hours, roadmap, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+            return conn.total_changes - before
+
+    def add(self, profile: dict, roadmap: str) -> bool:
+        """Stores one approved roadmap; returns False if it was already stored."""
+        return self.add_many([(profile, roadmap)]) == 1
+
+    def _rows(self, after_id: int = 0) -> list:
+        return self._connection().execute(
+            "SELECT id, domain, level, style, hours FROM roadmaps WHERE id > ? ORDER BY id",
+            (after_id,),
+        ).fetchall()
+
+    def _reset_index(self) -> None:
+        self._vectorizer = None
+        self._matrix = None
+        self._ids = np.zeros(0, dtype=np.int64)
+        # Attribute values are compared as integer codes: name -> (codes, value -> code)
+        self._attributes = {
+            name: (np.zeros(0, dtype=np.int32), {}) for name in _ATTRIBUTE_WEIGHTS
+        }
+
+    def _append_rows(self, rows: list, matrix) -> None:
+        import scipy.sparse as sp
+
+        self._matrix = matrix if self._matrix is None else sp.vstack([self._matrix, matrix]).tocsr()
+        self._ids = np.concatenate([self._ids, [row[0] for row in rows]]).astype(np.int64)
+        for column, name in enumerate(_ATTRIBUTE_WEIGHTS, start=2):
+            codes, vocabulary = self._attributes[name]
+            added = [vocabulary.setdefault(row[column], len(vocabulary)) for row in rows]
+            self._attributes[name] = (
+                np.concatenate([codes, np.array(added, dtype=np.int32)]), vocabulary
+            )
+
+    def _fit(self) -> None:
+        # Called with the lock held
+        self._reset_index()
+        rows = self._rows()
+        if not rows:
+            return
+        # scikit-learn is only loaded once an index is needed
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self._vectorizer = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True)
+        self._append_rows(rows, self._vectorizer.fit_transform(row[1] for row in rows).tocsr())
+
+    def _ensure_index(self) -> None:
+        # Called with the lock held
+        if self._vectorizer is None:
+            if os.path.exists(self.index_path):
+                import joblib
+
+                saved = joblib.load(self.index_path)
+                self._vectorizer = saved["vectorizer"]
+                self._matrix, self._ids, self._attributes = (
+                    saved["matrix"], saved["ids"], saved["attributes"]
+                )
+            else:
+                self._fit()
+                if self._vectorizer is None:
+                    return
+
+        rows = self._rows(int(self._ids[-1]) if len(self._ids) else 0)
+        if rows:
+            self._append_rows(rows, self._vectorizer.transform(row[1] for row in rows))
+
+    def rebuild(self) -> int:
+        """
+        Refits the index over every stored roadmap and saves it.
+
+        Returns:
+            Number of roadmaps indexed
+        """
+        with self._lock:
+            self._fit()
+            if self._vectorizer is None:
+                if os.path.exists(self.index_path):
+                    os.remove(self.index_path)
+                return 0
+            import joblib
+
+            joblib.dump(
+                {
+                    "vectorizer": self._vectorizer,
+                    "matrix": self._matrix,
+                    "ids": self._ids,
+                    "attributes": self._attributes,
+                },
+                self.index_path,
+            )
+            return len(self._ids)
+
+    def nearest(self, profile: dict, min_score: float = 0.0) -> Optional[tuple[str, float, dict]]:
+        """
+        Finds the stored roadmap whose profile is most similar to `profile`.
+
+        Ties go to the most recently stored roadmap.
+
+        Args:
+            profile: Learner profile (see `learner_profile`)
+            min_score: Minimum similarity score to accept
+
+        Returns:
+            Tuple of (roadmap, similarity, its profile), or None
+        """
+        with self._lock:
+            self.lookups += 1
+            self._ensure_index()
+            if self._matrix is None:
+                return None
+            key = profile_key(profile)
+            query = self._vectorizer.transform([key["domain"]]).toarray().ravel()
+            scores = self._matrix @ query
+            candidates = np.flatnonzero(scores)
+            if not candidates.size:
+                return None
+            penalty = np.zeros(candidates.size)
+            for name, weight in _ATTRIBUTE_WEIGHTS.items():
+                codes, vocabulary = self._attributes[name]
+                penalty += weight * (codes[candidates] != vocabulary.get(key[name], -1))
+            scores = scores[candidates] * (1.0 - penalty)
+            best = scores.max()
+            if best < min_score:
+                return None
+            row_id = int(self._ids[candidates[np.flatnonzero(scores == best)[-1]]])
+            roadmap, stored_profile = self._connection().execute(
+                "SELECT roadmap, profile FROM roadmaps WHERE id = ?", (row_id,)
+            ).fetchone()
+            self.matches += 1
+        return roadmap, float(best), json.loads(stored_profile)
+
+    def stats(self) -> dict:
+        with self._lock:
+            (size,) = self._connection().execute("SELECT COUNT(*) FROM roadmaps").fetchone()
+        return {"lookups": self.lookups, "matches": self.matches, "size": size}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._reset_index()
+
+
+roadmap_store = RoadmapStore(os.path.join(config.cache_dir, "roadmaps.sqlite3"))
+
+
+async def store_approved_roadmap(
+    callback_context: CallbackContext, config: RoadmapConfiguration = config
+) -> None:
+    """
+    Saves the roadmap being enriched as an approved roadmap for future seeds.
+
+    Only roadmaps that pass validation and have a recorded domain are kept.
+
+    Args:
+        callback_context: Context from the agent callback
+        config: Configuration of the agent's graph
+    """
+    if not config.enable_roadmap_seeding:
+        return None
+    state = callback_context.state
+    profile = learner_profile(state)
+    roadmap = approved_roadmap(state)
+    if not profile.get("target_domain") or roadmap is None or not roadmap.weeks:
+        return None
+    if roadmap_issues(roadmap, config):
+        return None
+    await asyncio.to_thread(roadmap_store.add, profile, roadmap.source)
+    return None
+
+
+async def seed_planner_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+    config: RoadmapConfiguration = config,
+) -> None:
+    """
+    Gives the planner the nearest approved roadmap as a template.
+
+    Args:
+        callback_context: Context from the model callback
+        llm_request: Outgoing model request (mutated in place)
+        config: Configuration of the agent's graph
+    """
+    if not config.enable_roadmap_seeding:
+        return None
+    profile = learner_profile(callback_context.state)
+    if not profile.get("target_domain"):
+        return None
+    match = await asyncio.to_thread(
+        roadmap_store.nearest, profile, min_score=config.roadmap_seed_min_score
+    )
+    if match is None:
+        return None
+
+    template, _, template_profile = match
+    described = ", ".join(f"{key.replace('_', ' ')}: {value}" for key, value in template_profile.items())
+    llm_request.append_instructions([
+        "An approved roadmap for a similar learner "
+        f"({described}) is given below as a template. Keep its structure and "
+        "format, and adapt topics, pacing and depth to the current learner.\n\n"
+        f"<template>\n{template}\n</template>"
+    ])
+    return None
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Approved roadmap store")
+    parser.add_argument("command", choices=["rebuild", "stats"])
+    parser.add_argument("--store", default=roadmap_store.path, help="Roadmap database path")
+    args = parser.parse_args(argv)
+
+    store = RoadmapStore(args.store)
+    if args.command == "rebuild":
+        started = time.perf_counter()
+        indexed = store.rebuild()
+        print(f"Indexed {indexed} roadmaps in {time.perf_counter() - started:.2f} s "
+              f"-> {store.index_path}")
+    print(json.dumps(store.stats(), indent=2))
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Search Result Cache
+Persistent, TTL-bounded store for SearchAgent results shared across sessions
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+_NON_WORD = re.compile(r"[^\w+#]+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a search request so near-identical queries share a cache entry.
+
+    Lowercases, drops punctuation (keeping '+' and '#' for names like C++ or C#)
+    and collapses whitespace.
+
+    Args:
+        query: Raw request text sent to the SearchAgent
+
+    Returns:
+        Normalized query string
+    """
+    return " ".join(_NON_WORD.sub(" ", query.lower()).split())
+
+
+class SearchCache:
+    """
+    On-disk cache of SearchAgent responses with TTL expiry and LRU eviction.
+
+    Entries live in a small SQLite database so they survive restarts and are
+    shared by every process pointing at the same file. Hit/miss counters are
+    kept in-process.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = 24 * 60 * 60,
+        max_entries: int = 5000,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS search_cache_accessed "
+                "ON search_cache (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(query: str) -> str:
+        return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+    def get(self, query: str) -> Optional[str]:
+        """
+        Returns the cached result for a query, or None on a miss or expiry.
+
+        Args:
+            query: Raw request text
+
+        Returns:
+            Cached result text, or None
+        """
+        key = self.make_key(query)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT result, created_at FROM search_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            result, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                conn.commit()
+                self.misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE search_cache SET accessed_at = ? WHERE key = ?",
+                (now, key),
+            )
+            conn.commit()
+            self.hits += 1
+            return result
+
+    def put(self, query: str, result: str) -> None:
+        """
+        Stores a result and evicts least-recently-used entries over capacity.
+
+        Args:
+            query: Raw request text
+            result: SearchAgent response text
+        """
+        if not result:
+            return
+
+        key = self.make_key(query)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO search_cache
+                    (key, query, result, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, normalize_query(query), result, now, now),
+            )
+
+            (count,) = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    """
+                    DELETE FROM search_cache WHERE key IN (
+                        SELECT key FROM search_cache
+                        ORDER BY accessed_at ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+                self.evictions += overflow
+            conn.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Deletes every entry older than the TTL.
+
+        Returns:
+            Number of entries removed
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                "DELETE FROM search_cache WHERE created_at < ?", (cutoff,)
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        """Removes all entries and resets the counters."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM search_cache")
+            conn.commit()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Returns cache counters.
+
+        Returns:
+            Dictionary with hits, misses, evictions, hit_rate and size
+        """
+        with self._lock:
+            (size,) = self._connection().execute(
+                "SELECT COUNT(*) FROM search_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,566 @@
+"""
+SQLite Session Service
+Durable ADK session service on a local SQLite database, for running the
+agent with many (mostly idle) sessions
+
+Sessions live only in the database: nothing is kept in memory between
+turns, so resident memory stays flat as the number of sessions grows. The
+database runs in WAL mode behind a small connection pool, so reads don't
+block the writer. Events are appended to an in-memory buffer and written
+in one transaction per batch (every `session_flush_max_events` events or
+`session_flush_interval_seconds`, whichever comes first, and always before
+a session is read, listed or deleted). A crash loses at most the last
+interval of events. State values larger than `session_lazy_state_bytes`
+are only read from the database when an agent accesses them.
+
+    runner = Runner(agent=root_agent, app_name="roadmap_app",
+                    session_service=create_session_service())
+"""
+
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Optional
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from .config import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id)
+);
+CREATE TABLE IF NOT EXISTS session_state (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, key)
+);
+CREATE TABLE IF NOT EXISTS user_state (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (app_name, user_id, key)
+);
+CREATE TABLE IF NOT EXISTS app_state (
+    app_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (app_name, key)
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session
+    ON events (app_name, user_id, session_id, seq);
+"""
+
+# Scope of a merged state key -> (table, key prefix, key columns)
+_SCOPES = {
+    "session": ("session_state", "", ("app_name", "user_id", "session_id")),
+    "user": ("user_state", State.USER_PREFIX, ("app_name", "user_id")),
+    "app": ("app_state", State.APP_PREFIX, ("app_name",)),
+}
+
+
+def _scope(key: str) -> tuple[str, str]:
+    """Splits a merged state key into its scope and stored key."""
+    if key.startswith(State.APP_PREFIX):
+        return "app", key[len(State.APP_PREFIX):]
+    if key.startswith(State.USER_PREFIX):
+        return "user", key[len(State.USER_PREFIX):]
+    return "session", key
+
+
+class LazyState(dict):
+    """
+    Session state whose large values are read from the database on first
+    access.
+
+    Keys of values that are not loaded yet are still reported by `in`,
+    `len()` and iteration; anything that needs every value (`items()`,
+    `copy()`, `json.dumps`, ...) loads the rest first.
+    """
+
+    def __init__(self, values: dict, lazy_keys: Iterable[str], loader):
+        super().__init__(values)
+        self._lazy = set(lazy_keys)
+        self._loader = loader
+
+    def _load(self, keys: Iterable[str]) -> None:
+        keys = [key for key in keys if key in self._lazy]
+        if keys:
+            dict.update(self, self._loader(keys))
+            self._lazy.difference_update(keys)
+
+    def _load_all(self) -> None:
+        self._load(list(self._lazy))
+
+    def __getitem__(self, key):
+        self._load([key])
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        self._load([key])
+        return dict.get(self, key, default)
+
+    def __contains__(self, key) -> bool:
+        return key in self._lazy or dict.__contains__(self, key)
+
+    def __setitem__(self, key, value) -> None:
+        self._lazy.discard(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key) -> None:
+        if key in self._lazy and not dict.__contains__(self, key):
+            self._lazy.discard(key)
+            return
+        self._lazy.discard(key)
+        dict.__delitem__(self, key)
+
+    def update(self, *args, **kwargs) -> None:
+        values = dict(*args, **kwargs)
+        self._lazy.difference_update(values)
+        dict.update(self, values)
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + len(self._lazy)
+
+    def __iter__(self) -> Iterator:
+        self._load_all()
+        return dict.__iter__(self)
+
+    def keys(self):
+        self._load_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._load_all()
+        return dict.values(self)
+
+    def items(self):
+        self._load_all()
+        return dict.items(self)
+
+    def copy(self) -> dict:
+        self._load_all()
+        return dict(dict.items(self))
+
+    def pop(self, key, *default):
+        self._load([key])
+        self._lazy.discard(key)
+        return dict.pop(self, key, *default)
+
+    def setdefault(self, key, default=None):
+        self._load([key])
+        return dict.setdefault(self, key, default)
+
+    def __eq__(self, other) -> bool:
+        self._load_all()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    def __repr__(self) -> str:
+        # Doesn't load: sessions show up in task reprs and log lines
+        shown = dict(dict.items(self), **{key: "<not loaded>" for key in self._lazy})
+        return repr(shown)
+
+    def __reduce_ex__(self, protocol):
+        # Copies and pickles are plain, fully loaded dicts
+        return dict, (self.copy(),)
+
+
+class _ConnectionPool:
+    """Fixed-size pool of SQLite connections in WAL mode."""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = max(1, size)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if self._created == 0:
+            conn.executescript(_SCHEMA)
+            conn.commit()
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrows a connection, opening one if the pool isn't full yet."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                conn = self._open() if self._created < self.size else None
+                if conn is not None:
+                    self._created += 1
+            if conn is None:
+                conn = self._idle.get()
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._created = 0
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    ADK session service backed by a local SQLite database.
+
+    Drop-in replacement for `InMemorySessionService`: app (`app:`), user
+    (`user:`) and session state are stored separately and merged into the
+    session on read, and `temp:` keys are never stored.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pool_size: int = 4,
+        flush_max_events: int = 64,
+        flush_interval_seconds: float = 0.05,
+        lazy_state_bytes: int = 4096,
+    ):
+        self.path = path
+        self.flush_max_events = flush_max_events
+        self.flush_interval_seconds = flush_interval_seconds
+        self.lazy_state_bytes = lazy_state_bytes
+        self._pool = _ConnectionPool(path, pool_size)
+        self._pending: list = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stats = {"events": 0, "flushes": 0, "lazy_loads": 0}
+
+    # Reads
+
+    def _state_rows(self, conn: sqlite3.Connection, scope: str, ids: tuple) -> tuple[dict, list]:
+        table, prefix, columns = _SCOPES[scope]
+        where = " AND ".join(f"{column} = ?" for column in columns)
+        values, lazy = {}, []
+        for key, value, size in conn.execute(
+            f"SELECT key, CASE WHEN size < ? THEN value END, size FROM {table} WHERE {where}",
+            (self.lazy_state_bytes, *ids[:len(columns)]),
+        ):
+            if size < self.lazy_state_bytes:
+                values[prefix + key] = json.loads(value)
+            else:
+                lazy.append(prefix + key)
+        return values, lazy
+
+    def _load_values(self, app_name: str, user_id: str, session_id: str, keys: list) -> dict:
+        """Reads the given (merged) state keys of a session."""
+        ids = (app_name, user_id, session_id)
+        loaded = {}
+        with self._pool.connection() as conn:
+            for key in keys:
+                scope, stored_key = _scope(key)
+                table, _, columns = _SCOPES[scope]
+                where = " AND ".join(f"{column} = ?" for column in columns)
+                row = conn.execute(
+                    f"SELECT value FROM {table} WHERE {where} AND key = ?",
+                    (*ids[:len(columns)], stored_key),
+                ).fetchone()
+                if row is not None:
+                    loaded[key] = json.loads(row[0])
+        self._stats["lazy_loads"] += len(loaded)
+        return loaded
+
+    def _read_session(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        events: bool = True,
+        get_config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        ids = (app_name, user_id, session_id)
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT update_time FROM sessions "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                ids,
+            ).fetchone()
+            if row is None:
+                return None
+
+            values, lazy = {}, []
+            for scope in ("session", "user", "app"):
+                scope_values, scope_lazy = self._state_rows(conn, scope, ids)
+                values.update(scope_values)
+                lazy.extend(scope_lazy)
+
+            loaded_events = []
+            if events:
+                query = (
+                    "SELECT data FROM events "
+                    "WHERE app_name = ? AND user_id = ? AND session_id = ?"
+                )
+                params: list = list(ids)
+                if get_config and get_config.after_timestamp:
+                    query += " AND timestamp >= ?"
+                    params.append(get_config.after_timestamp)
+                if get_config and get_config.num_recent_events:
+                    query = f"SELECT data FROM ({query} ORDER BY seq DESC LIMIT ?) "
+                    params.append(get_config.num_recent_events)
+                    rows = reversed(conn.execute(query, params).fetchall())
+                else:
+                    rows = conn.execute(query + " ORDER BY seq", params)
+                loaded_events = [Event.model_validate_json(data) for (data,) in rows]
+
+        session = Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            events=loaded_events,
+            last_update_time=row[0],
+        )
+        # Assigned after construction: validation would copy it into a plain dict
+        session.state = LazyState(
+            values, lazy, lambda keys: self._load_values(app_name, user_id, session_id, keys)
+        )
+        return session
+
+    # Writes
+
+    @staticmethod
+    def _encode_state(state: Optional[dict]) -> list:
+        """Encodes state values up front, so unserializable values fail the caller."""
+        return [
+            (*_scope(key), json.dumps(value))
+            for key, value in (state or {}).items()
+            if not key.startswith(State.TEMP_PREFIX)
+        ]
+
+    def _write_state(self, conn: sqlite3.Connection, ids: tuple, rows: list) -> None:
+        for scope, stored_key, encoded in rows:
+            table, _, columns = _SCOPES[scope]
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}, key, value, size) "
+                f"VALUES ({', '.join('?' * (len(columns) + 3))})",
+                (*ids[:len(columns)], stored_key, encoded, len(encoded)),
+            )
+
+    def _create(self, ids: tuple, state: Optional[dict]) -> Session:
+        rows = self._encode_state(state)
+        now = time.time()
+        with self._write_lock, self._pool.connection() as conn:
+            try:
+                conn.execute(
+                    "INSERT INTO sessions (app_name, user_id, session_id, create_time, update_time) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (*ids, now, now),
+                )
+            except sqlite3.IntegrityError:
+                raise AlreadyExistsError(f"Session with id {ids[2]} already exists.") from None
+            self._write_state(conn, ids, rows)
+            conn.commit()
+        return self._read_session(*ids)
+
+    def _drain(self) -> int:
+        """Writes every buffered event in one transaction."""
+        with self._write_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            updated: dict = {}
+            with self._pool.connection() as conn:
+                for ids, timestamp, data, state_rows in batch:
+                    conn.execute(
+                        "INSERT INTO events (app_name, user_id, session_id, timestamp, data) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (*ids, timestamp, data),
+                    )
+                    self._write_state(conn, ids, state_rows)
+                    updated[ids] = max(timestamp, updated.get(ids, 0.0))
+                conn.executemany(
+                    "UPDATE sessions SET update_time = MAX(update_time, ?) "
+                    "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                    [(timestamp, *ids) for ids, timestamp in updated.items()],
+                )
+                conn.commit()
+            self._stats["flushes"] += 1
+            self._stats["events"] += len(batch)
+            return len(batch)
+
+    def _delete(self, ids: tuple) -> None:
+        with self._write_lock, self._pool.connection() as conn:
+            for table in ("sessions", "session_state", "events"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                    ids,
+                )
+            conn.commit()
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self.flush_interval_seconds)
+        except asyncio.CancelledError:
+            # The event loop is shutting down: don't lose the buffer
+            self._drain()
+            raise
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Writes the buffered events now.
+
+        Returns:
+            Number of events written
+        """
+        if not self._pending:
+            return 0
+        return await asyncio.to_thread(self._drain)
+
+    # BaseSessionService
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        return await asyncio.to_thread(self._create, (app_name, user_id, session_id), state)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        await self.flush()
+        return await asyncio.to_thread(
+            self._read_session, app_name, user_id, session_id, True, config
+        )
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        await self.flush()
+
+        def _list() -> list:
+            with self._pool.connection() as conn:
+                if user_id is None:
+                    rows = conn.execute(
+                        "SELECT user_id, session_id FROM sessions WHERE app_name = ?",
+                        (app_name,),
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        "SELECT user_id, session_id FROM sessions "
+                        "WHERE app_name = ? AND user_id = ?",
+                        (app_name, user_id),
+                    ).fetchall()
+            sessions = [self._read_session(app_name, user, session, events=False) for user, session in rows]
+            return [session for session in sessions if session is not None]
+
+        return ListSessionsResponse(sessions=await asyncio.to_thread(_list))
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self.flush()
+        await asyncio.to_thread(self._delete, (app_name, user_id, session_id))
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        state_rows = self._encode_state(event.actions.state_delta if event.actions else None)
+        data = event.model_dump_json(exclude_none=True)
+        with self._pending_lock:
+            self._pending.append((
+                (session.app_name, session.user_id, session.id), event.timestamp, data, state_rows
+            ))
+            buffered = len(self._pending)
+
+        if buffered >= self.flush_max_events:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+        return event
+
+    # Maintenance
+
+    def stats(self) -> dict:
+        with self._pool.connection() as conn:
+            (sessions,) = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return {
+            "sessions": sessions,
+            "buffered_events": len(self._pending),
+            **self._stats,
+        }
+
+    def close(self) -> None:
+        """Writes any buffered events and closes the connections."""
+        self._drain()
+        self._pool.close()
+
+
+def create_session_service() -> BaseSessionService:
+    """
+    Session service selected by `config.session_backend`: "sqlite" for a
+    `SqliteSessionService` in the cache directory, anything else for an
+    `InMemorySessionService`.
+    """
+    if config.session_backend != "sqlite":
+        return InMemorySessionService()
+    return SqliteSessionService(
+        config.session_db_path or os.path.join(config.cache_dir, "sessions.sqlite3"),
+        pool_size=config.session_pool_size,
+        flush_max_events=config.session_flush_max_events,
+        flush_interval_seconds=config.session_flush_interval_seconds,
+        lazy_state_bytes=config.session_lazy_state_bytes,
+    )
@@ -0,0 +1,103 @@
+"""
+Single-Flight Coalescing
+Concurrent identical calls share one in-flight execution and its result
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+
+    The first caller for a key starts the call; callers arriving while it
+    is in flight wait for the same result (or exception) instead of
+    starting their own. The call runs as its own task, so a waiter that
+    is cancelled doesn't cancel it for the others. Nothing is kept once
+    the call completes; caching is left to the caller.
+
+    A caller that must run the work itself (inside its own session, say)
+    can `lead` the key instead; identical callers then `join` it until the
+    leader resolves the future it was given.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+        self._in_flight: dict = {}
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `call`, or joins the identical call already in flight.
+
+        Args:
+            key: Identity of the call (equal keys must mean equal results)
+            call: Coroutine function performing the call
+
+        Returns:
+            The call's result
+        """
+        if self.in_flight(key) is not None:
+            return await self.join(key)
+        self.calls += 1
+        self.executed += 1
+        task = asyncio.get_running_loop().create_task(call())
+        self._track(key, task)
+        return await asyncio.shield(task)
+
+    def in_flight(self, key: str) -> Optional[asyncio.Future]:
+        """The call for `key` in flight on the running event loop, if any."""
+        future = self._in_flight.get(key)
+        if future is None or future.done() or future.get_loop() is not asyncio.get_running_loop():
+            return None
+        return future
+
+    async def join(self, key: str) -> T:
+        """
+        Waits for the call for `key` in flight (see `in_flight`).
+
+        Returns:
+            The call's result
+        """
+        future = self.in_flight(key)
+        if future is None:
+            raise KeyError(key)
+        self.calls += 1
+        self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def lead(self, key: str) -> asyncio.Future:
+        """
+        Registers a call for `key` that the caller runs itself.
+
+        Returns:
+            Future the caller must resolve with the call's result (or
+            exception); identical callers `join` it until then
+        """
+        self.calls += 1
+        self.executed += 1
+        future = asyncio.get_running_loop().create_future()
+        self._track(key, future)
+        return future
+
+    def _track(self, key: str, future: asyncio.Future) -> None:
+        self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "dedup_ratio": self.coalesced / self.calls if self.calls else 0.0,
+            "in_flight": len(self._in_flight),
+        }
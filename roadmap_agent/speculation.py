@@ -0,0 +1,116 @@
+"""
+Speculative Tasks
+Background work started before the user asks for it, handed over by key
+when the real stage runs
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from .config import config
+from .model_scheduler import call_priority
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeTasks:
+    """
+    In-process store of background tasks, grouped per session.
+
+    Each task is identified by a key derived from its inputs (a content
+    hash), so a result is only reused when the inputs it was computed from
+    are unchanged. Starting a new set of jobs for a session cancels the
+    session's tasks whose keys are no longer wanted; tasks with keys that
+    are still wanted keep running.
+    """
+
+    def __init__(self, max_sessions: int = 1000):
+        self.max_sessions = max_sessions
+        self.started = 0
+        self.reused = 0
+        self.discarded = 0
+        self.failed = 0
+        self._sessions: OrderedDict = OrderedDict()
+
+    def _cancel(self, tasks: dict) -> None:
+        for task in tasks.values():
+            if not task.done():
+                task.cancel()
+            self.discarded += 1
+
+    def start(self, session_id: str, jobs: dict[str, Callable[[], Awaitable]]) -> None:
+        """
+        Starts speculative jobs for a session.
+
+        Args:
+            session_id: Session the results are meant for
+            jobs: Maps each result key to a coroutine function producing it
+        """
+        tasks = self._sessions.pop(session_id, {})
+        self._cancel({key: task for key, task in tasks.items() if key not in jobs})
+        tasks = {key: task for key, task in tasks.items() if key in jobs}
+
+        # Model calls made by the jobs queue behind interactive turns
+        with call_priority("background"):
+            for key, job in jobs.items():
+                if key not in tasks:
+                    tasks[key] = asyncio.get_running_loop().create_task(job())
+                    self.started += 1
+
+        self._sessions[session_id] = tasks
+        while len(self._sessions) > self.max_sessions:
+            _, evicted = self._sessions.popitem(last=False)
+            self._cancel(evicted)
+
+    async def take(self, session_id: str, key: str) -> Optional[object]:
+        """
+        Hands over a speculative result, waiting for it if it is still running.
+
+        Args:
+            session_id: Session the result was started for
+            key: Result key
+
+        Returns:
+            The task's result, or None if there is no usable one
+        """
+        task = self._sessions.get(session_id, {}).pop(key, None)
+        if task is None:
+            return None
+        if task.get_loop() is not asyncio.get_running_loop():
+            self._cancel({key: task})
+            return None
+
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            self.discarded += 1
+            return None
+        except Exception as e:  # the real stage will redo the work
+            logger.warning("Speculative task %s failed: %s: %s", key, type(e).__name__, e)
+            self.failed += 1
+            return None
+
+        self.reused += 1
+        return result
+
+    def discard(self, session_id: str) -> None:
+        """Cancels every speculative task of a session."""
+        self._cancel(self._sessions.pop(session_id, {}))
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "reused": self.reused,
+            "discarded": self.discarded,
+            "failed": self.failed,
+            "pending": sum(
+                not task.done() for tasks in self._sessions.values() for task in tasks.values()
+            ),
+        }
+
+
+speculative_tasks = SpeculativeTasks(max_sessions=config.speculation_max_sessions)
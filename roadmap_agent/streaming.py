@@ -0,0 +1,148 @@
+"""
+Roadmap Streaming
+Regroups streamed planner and editor output into one partial event per week,
+so the caller sees the roadmap while the full text is still being generated
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+from google.genai.types import Content, Part
+
+from .config import RoadmapConfiguration, config
+from .roadmap_model import week_heading
+
+# custom_metadata key carried by streamed events
+STREAM_KEY = "roadmap_stream"
+
+
+@dataclass
+class _Stream:
+    buffer: str = ""
+    scanned: int = 0  # end of the complete lines already looked at
+    emitted: int = 0  # end of the text already sent
+    week: Optional[int] = None  # week whose section is being accumulated
+    sections: int = 0
+
+
+class WeekStreamer:
+    """
+    Cuts a stream of text chunks into roadmap sections.
+
+    A section (the preamble, then each week) is complete once the heading
+    of the next week arrives. Headings are only matched on complete lines,
+    so a heading split across chunks is still recognized.
+    """
+
+    def __init__(self, max_streams: int = 1000):
+        self.max_streams = max_streams
+        self._streams: OrderedDict = OrderedDict()
+
+    def feed(self, key: tuple, text: str) -> list:
+        """
+        Adds a chunk to a stream.
+
+        Args:
+            key: Stream identity (invocation id, agent name)
+            text: Chunk text
+
+        Returns:
+            Completed sections as (week number or None for the preamble, text)
+        """
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = _Stream()
+            while len(self._streams) > self.max_streams:
+                self._streams.popitem(last=False)
+        stream.buffer += text
+
+        end = stream.buffer.rfind("\n") + 1
+        if end <= stream.scanned:
+            return []
+
+        sections = []
+        offset = stream.scanned
+        for line in stream.buffer[stream.scanned:end].splitlines(keepends=True):
+            number = week_heading(line)
+            if number is not None:
+                section = stream.buffer[stream.emitted:offset]
+                if section.strip():
+                    sections.append((stream.week, section))
+                stream.emitted = offset
+                stream.week = number
+            offset += len(line)
+        stream.scanned = end
+        stream.sections += len(sections)
+        return sections
+
+    def finish(self, key: tuple) -> int:
+        """Ends a stream and returns how many sections were sent for it."""
+        stream = self._streams.pop(key, None)
+        return stream.sections if stream else 0
+
+
+week_streamer = WeekStreamer()
+
+
+def _response_text(llm_response: LlmResponse) -> str:
+    content = llm_response.content
+    if not content or not content.parts:
+        return ""
+    return "".join(part.text for part in content.parts if part.text and not part.thought)
+
+
+def stream_weeks_callback(
+    callback_context: CallbackContext,
+    llm_response: LlmResponse,
+    config: RoadmapConfiguration = config,
+) -> Optional[LlmResponse]:
+    """
+    Turns token chunks of a streamed (SSE) model response into week events.
+
+    Partial responses are buffered and released as one partial event per
+    completed section; chunks that complete nothing are dropped. The final,
+    aggregated response is left intact, so `output_key` and validation still
+    see the full text; it carries the last week and is tagged with the
+    number of sections already sent. Partial events are never stored in the
+    session.
+
+    Args:
+        callback_context: Context from the model callback
+        llm_response: Model response (partial or final)
+        config: Configuration of the agent's graph
+
+    Returns:
+        Replacement response, or None to keep the original
+    """
+    if not config.stream_roadmap_by_week:
+        return None
+
+    key = (callback_context.invocation_id, callback_context.agent_name)
+    if not llm_response.partial:
+        sent = week_streamer.finish(key)
+        if not sent:
+            return None
+        llm_response.custom_metadata = {
+            **(llm_response.custom_metadata or {}),
+            STREAM_KEY: {"agent": callback_context.agent_name, "final": True, "sections": sent},
+        }
+        return llm_response
+
+    sections = week_streamer.feed(key, _response_text(llm_response))
+    if not sections:
+        # No content: the flow emits no event for this chunk
+        return LlmResponse(partial=True)
+    return LlmResponse(
+        partial=True,
+        content=Content(role="model", parts=[Part.from_text(text="".join(text for _, text in sections))]),
+        custom_metadata={
+            STREAM_KEY: {
+                "agent": callback_context.agent_name,
+                "weeks": [week for week, _ in sections if week is not None],
+                "preamble": any(week is None for week, _ in sections),
+            }
+        },
+    )
@@ -1,13 +1,15 @@
-from .domain_researcher import domain_researcher
-from .roadmap_planner import robust_roadmap_planner
-from .resource_curator import resource_curator
-from .practice_advisor import practice_advisor
-from .roadmap_editor import roadmap_editor
+from .domain_researcher import create_domain_researcher
+from .roadmap_planner import create_robust_roadmap_planner
+from .resource_curator import create_resource_curator
+from .practice_advisor import create_practice_advisor
+from .roadmap_editor import create_roadmap_editor
+from .enrichment_stage import create_resource_practice_stage
 
 __all__ = [
-    "domain_researcher",
-    "robust_roadmap_planner",
-    "resource_curator",
-    "practice_advisor",
-    "roadmap_editor",
+    "create_domain_researcher",
+    "create_robust_roadmap_planner",
+    "create_resource_curator",
+    "create_practice_advisor",
+    "create_roadmap_editor",
+    "create_resource_practice_stage",
 ]
\ No newline at end of file
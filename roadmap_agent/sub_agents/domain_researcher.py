@@ -5,17 +5,16 @@ Analyzes job market requirements for specified domains
 """
 
 from google.adk.agents import Agent
-from google.adk.tools import agent_tool
 
-from ..config import config
-from ..agent_utils import suppress_output_callback
-from ..tool_agents import search_agent  # Import the search agent
+from ..config import RoadmapConfiguration, config
+from ..agent_utils import suppress_output_callback, with_config
+from ..checkpoints import record_stage_checkpoint, skip_checkpointed_stage
+from ..domain_store import serve_cached_domain_analysis, store_domain_analysis
+from ..lazy import lazy_attributes
+from ..model_scheduler import scheduled_model
+from ..tool_agents import create_search_tool
 
-domain_researcher = Agent(
-    model=config.worker_model,  # Now using gemini-2.5-flash
-    name="domain_researcher",
-    description="Researches job market requirements and current trends for a specified domain.",
-    instruction="""
+_INSTRUCTION = """
     You are a job market analyst specializing in technology and professional roles.
     
     Your task is to research the target job domain and identify:
@@ -50,8 +49,28 @@ domain_researcher = Agent(
     - Learning Priority (ranked list)
     
     Store this analysis in the `domain_analysis` state key.
-    """,
-    tools=[agent_tool.AgentTool(agent=search_agent)], 
-    output_key="domain_analysis",
-    after_agent_callback=suppress_output_callback,
-)
\ No newline at end of file
+    """
+
+
+def create_domain_researcher(config: RoadmapConfiguration = config) -> Agent:
+    """Builds the domain researcher for a configuration."""
+    return Agent(
+        model=scheduled_model(config.worker_model, config),  # Now using gemini-2.5-flash
+        name="domain_researcher",
+        description="Researches job market requirements and current trends for a specified domain.",
+        instruction=_INSTRUCTION,
+        tools=[create_search_tool(config)],
+        output_key="domain_analysis",
+        before_agent_callback=[
+            with_config(skip_checkpointed_stage, config),
+            with_config(serve_cached_domain_analysis, config),
+        ],
+        after_agent_callback=[
+            with_config(store_domain_analysis, config),
+            with_config(record_stage_checkpoint, config),
+            suppress_output_callback,
+        ],
+    )
+
+
+__getattr__ = lazy_attributes(globals(), {"domain_researcher": create_domain_researcher})
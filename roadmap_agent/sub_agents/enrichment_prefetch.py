@@ -0,0 +1,54 @@
+"""
+Enrichment Prefetch
+Starts resource curation and practice recommendations for a validated
+roadmap in the background while the user is still reviewing it
+"""
+
+from google.adk.agents.callback_context import CallbackContext
+
+from ..config import RoadmapConfiguration, config
+from ..agent_utils import learner_profile
+from ..roadmap_model import approved_roadmap
+from ..speculation import speculative_tasks
+from ..validation import roadmap_issues
+from .practice_advisor import prefetch_practice_job
+from .resource_curator import ShardedResourceCurator
+
+
+def prefetch_enrichment(
+    callback_context: CallbackContext, config: RoadmapConfiguration = config
+) -> None:
+    """
+    Speculatively enriches the roadmap the user is about to approve.
+
+    Runs after the planner and the editor. When the current roadmap passes
+    validation and the enrichment stage hasn't run yet, every week's
+    resources and the practice recommendations are started in the
+    background. Approving the roadmap unchanged reuses all of them; after
+    an edit, only the weeks whose text changed are curated again.
+
+    Args:
+        callback_context: Context from the agent callback
+        config: Configuration of the agent's graph
+    """
+    if not config.speculative_enrichment:
+        return None
+
+    state = callback_context.state
+    if state.get("learning_resources"):
+        return None
+    roadmap = approved_roadmap(state)
+    if roadmap is None or not roadmap.weeks or roadmap_issues(roadmap, config):
+        return None
+
+    # The stages that will take the results over, from this agent's graph
+    context = callback_context._invocation_context
+    root = context.agent.root_agent
+    advisor = root.find_agent("practice_advisor")
+    curator = root.find_agent("resource_curator")
+    profile = learner_profile(state)
+    jobs = prefetch_practice_job(context, advisor, roadmap, profile) if advisor else {}
+    if isinstance(curator, ShardedResourceCurator):
+        jobs.update(curator.prefetch_jobs(context, roadmap, profile))
+    speculative_tasks.start(context.session.id, jobs)
+    return None
@@ -0,0 +1,50 @@
+"""
+Enrichment Stage
+Runs resource curation and practice recommendations in parallel
+"""
+
+from google.adk.agents import LoopAgent, ParallelAgent
+
+from ..config import RoadmapConfiguration, config
+from ..agent_utils import suppress_output_callback
+from ..lazy import lazy_attributes
+from ..validation_checkers import EnrichmentValidationChecker
+from .resource_curator import create_resource_curator
+from .practice_advisor import create_practice_advisor
+
+
+def create_resource_practice_stage(config: RoadmapConfiguration = config) -> LoopAgent:
+    """
+    Builds the stage that curates resources and practice side by side.
+
+    Both agents only read the approved roadmap and write separate state keys
+    (`learning_resources`, `practice_activities`), so they can run in
+    parallel. Only used when `parallel_enrichment` is on; in sequential mode
+    the orchestrator uses the two agents directly.
+    """
+    parallel_enrichment = ParallelAgent(
+        name="parallel_enrichment",
+        description="Curates learning resources and practice activities concurrently.",
+        sub_agents=[
+            create_resource_curator(config),
+            create_practice_advisor(config),
+        ],
+    )
+
+    return LoopAgent(
+        name="resource_practice_stage",
+        description="Finds learning resources and recommends practice activities for the approved roadmap.",
+        sub_agents=[
+            parallel_enrichment,
+            EnrichmentValidationChecker(name="enrichment_validation_checker"),
+        ],
+        max_iterations=2,
+        after_agent_callback=suppress_output_callback,
+    )
+
+
+def _default_stage():
+    return create_resource_practice_stage() if config.parallel_enrichment else None
+
+
+__getattr__ = lazy_attributes(globals(), {"resource_practice_stage": _default_stage})
@@ -1,22 +1,32 @@
-
-
 """
 Practice Advisor Agent
 Recommends hands-on projects and practice exercises
 """
 
+import json
+from typing import Optional
+
 from google.adk.agents import Agent
-from google.adk.tools import agent_tool
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.genai.types import Content
 
-from ..config import config
-from ..agent_utils import suppress_output_callback
-from ..tool_agents import search_agent  
+from ..config import RoadmapConfiguration, config
+from ..agent_utils import (
+    learner_profile,
+    run_agent_isolated,
+    store_roadmap_structure,
+    suppress_output_callback,
+    with_config,
+)
+from ..checkpoints import record_stage_checkpoint, skip_checkpointed_stage
+from ..lazy import lazy_attributes
+from ..model_scheduler import scheduled_model
+from ..roadmap_model import Roadmap, approved_roadmap, digest
+from ..speculation import speculative_tasks
+from ..tool_agents import create_search_tool
 
-practice_advisor = Agent(
-    model=config.worker_model,  # Using gemini-2.5-flash
-    name="practice_advisor",
-    description="Recommends practical projects and exercises to reinforce learning.",
-    instruction="""
+_INSTRUCTION = """
     You are a hands-on learning specialist and project mentor.
     
     [Your existing instruction...]
@@ -28,8 +38,95 @@ practice_advisor = Agent(
     
     Output detailed practice recommendations in markdown.
     Store in `practice_activities` state key.
-    """,
-    tools=[agent_tool.AgentTool(agent=search_agent)], 
-    output_key="practice_activities",
-    after_agent_callback=suppress_output_callback,
-)
\ No newline at end of file
+    """
+
+
+def practice_key(roadmap: Roadmap, profile: dict) -> str:
+    """Key of a prefetched practice recommendation for a roadmap and profile."""
+    return "practice:" + digest(json.dumps([roadmap.source, profile], sort_keys=True))
+
+
+async def use_prefetched_practice(callback_context: CallbackContext) -> Optional[Content]:
+    """
+    Skips the practice advisor when recommendations for the current roadmap
+    were already prefetched, storing them in `practice_activities` instead.
+
+    Args:
+        callback_context: Context from the agent callback
+
+    Returns:
+        Empty Content to skip the agent, or None to run it
+    """
+    state = callback_context.state
+    roadmap = approved_roadmap(state)
+    if roadmap is None:
+        return None
+    prefetched = await speculative_tasks.take(
+        callback_context._invocation_context.session.id,
+        practice_key(roadmap, learner_profile(state)),
+    )
+    if not prefetched:
+        return None
+    state["practice_activities"] = prefetched
+    store_roadmap_structure(callback_context)
+    return Content()
+
+
+def create_practice_advisor(config: RoadmapConfiguration = config) -> Agent:
+    """Builds the practice advisor for a configuration."""
+    return Agent(
+        model=scheduled_model(config.worker_model, config),  # Using gemini-2.5-flash
+        name="practice_advisor",
+        description="Recommends practical projects and exercises to reinforce learning.",
+        instruction=_INSTRUCTION,
+        tools=[create_search_tool(config)],
+        output_key="practice_activities",
+        before_agent_callback=[with_config(skip_checkpointed_stage, config), use_prefetched_practice],
+        after_agent_callback=[
+            store_roadmap_structure,
+            with_config(record_stage_checkpoint, config),
+            suppress_output_callback,
+        ],
+    )
+
+
+__getattr__ = lazy_attributes(globals(), {"practice_advisor": create_practice_advisor})
+
+
+def prefetch_practice_job(
+    context: InvocationContext, advisor: Agent, roadmap: Roadmap, profile: dict
+) -> dict:
+    """
+    Builds the speculative practice job for a roadmap.
+
+    Args:
+        context: Invocation context of the conversation
+        advisor: The conversation's practice advisor
+        roadmap: Roadmap the user is reviewing
+        profile: Learner profile
+
+    Returns:
+        Maps the practice key to a coroutine function (see `SpeculativeTasks.start`)
+    """
+    profile_lines = "\n".join(
+        f"- {key.replace('_', ' ').title()}: {value}" for key, value in profile.items()
+    )
+    request = (
+        f"Learner profile:\n{profile_lines or '- Not specified'}\n\n"
+        f"Recommend practice activities for this roadmap:\n\n{roadmap.source}"
+    )
+
+    # Parentless copy for speculative runs outside the conversation
+    prefetcher = advisor.clone(update={"before_agent_callback": None, "after_agent_callback": None})
+
+    async def job() -> str:
+        text, _ = await run_agent_isolated(
+            prefetcher,
+            request,
+            state=profile,
+            plugins=context.plugin_manager.plugins,
+            user_id=context.user_id,
+        )
+        return text
+
+    return {practice_key(roadmap, profile): job}
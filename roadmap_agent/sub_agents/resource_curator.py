@@ -1,36 +1,246 @@
-
-
 """
 Resource Curator Agent
 Finds and organizes learning resources
 """
 
-from google.adk.agents import Agent
-from google.adk.tools import agent_tool
+import asyncio
+import functools
+import json
+import weakref
+from typing import AsyncGenerator
+
+from google.adk.agents import Agent, BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.tools import FunctionTool
+from pydantic import PrivateAttr
 
-from ..config import config
-from ..agent_utils import suppress_output_callback
-from ..tool_agents import search_agent  
+from ..config import RoadmapConfiguration, config
+from ..agent_utils import (
+    learner_profile,
+    run_agent_isolated,
+    store_roadmap_structure,
+    suppress_output_callback,
+    with_config,
+)
+from ..checkpoints import record_stage_checkpoint, skip_checkpointed_stage
+from ..lazy import lazy_attributes
+from ..model_scheduler import scheduled_model
+from ..roadmap_model import Roadmap, approved_roadmap, digest
+from ..roadmap_store import store_approved_roadmap
+from ..speculation import speculative_tasks
+from ..tool_agents import create_search_tool
+from ..tools import find_learning_resources
 
-resource_curator = Agent(
-    model=config.worker_model,  # Using gemini-2.5-flash
-    name="resource_curator",
-    description="Finds high-quality learning resources matching user preferences.",
-    instruction="""
+_WEEK_INSTRUCTION = """
     You are a learning resource curator with expertise in educational content.
-    
-    [Your existing instruction...]
-    
-    Use the SearchAgent extensively to find the best current resources.
-    Delegate searches like:
+
+    You will receive one week of a learning roadmap together with the learner's
+    profile. For every day in that week, find 2-3 high-quality, current resources
+    (videos, articles, courses, documentation, interactive exercises) that match
+    the learner's preferred learning style and experience level.
+
+    First call `find_learning_resources` for each day's topic; it answers from
+    the local resource catalog. Use the SearchAgent only for topics where it
+    returns `"source": "search"`. Delegate searches like:
     - "Search for '[topic] tutorial 2025'"
     - "Search for 'best [topic] course for beginners'"
     - "Search for '[topic] practice exercises'"
-    
-    Output in detailed markdown format with clickable links.
-    Store in `learning_resources` state key.
-    """,
-    tools=[agent_tool.AgentTool(agent=search_agent)],  
-    output_key="learning_resources",
-    after_agent_callback=suppress_output_callback,
-)
\ No newline at end of file
+
+    Output only the resources for this week in markdown, grouped by day,
+    with clickable links and the resource type (video, article, course, practice).
+    """
+
+_INSTRUCTION = """
+        You are a learning resource curator with expertise in educational content.
+
+        [Your existing instruction...]
+
+        First call `find_learning_resources` for each topic; it answers from the
+        local resource catalog. Use the SearchAgent only for topics where it
+        returns `"source": "search"`. Delegate searches like:
+        - "Search for '[topic] tutorial 2025'"
+        - "Search for 'best [topic] course for beginners'"
+        - "Search for '[topic] practice exercises'"
+
+        Output in detailed markdown format with clickable links.
+        Store in `learning_resources` state key.
+        """
+
+
+def create_week_resource_curator(config: RoadmapConfiguration = config) -> Agent:
+    """Builds the agent that curates resources for one week (a shard)."""
+    return Agent(
+        model=scheduled_model(config.worker_model, config),  # Using gemini-2.5-flash
+        name="week_resource_curator",
+        description="Finds learning resources for a single week of a roadmap.",
+        instruction=_WEEK_INSTRUCTION,
+        tools=[FunctionTool(with_config(find_learning_resources, config)), create_search_tool(config)],
+    )
+
+
+class ShardedResourceCurator(BaseAgent):
+    """
+    Curates resources week by week, running the weeks concurrently.
+
+    Each week is sent to `shard_agent` in its own throwaway session, at most
+    `max_concurrency` at a time per conversation (prefetched and live shards
+    together), and the results are merged back into `learning_resources` in
+    week order. Weeks prefetched while the user was reviewing the outline
+    (see `prefetch_jobs`) are taken over as long as their text and the
+    learner profile are unchanged.
+    """
+
+    shard_agent: BaseAgent
+    max_concurrency: int = 4
+
+    # Session id -> semaphore held by the session's running shards
+    _semaphores: weakref.WeakValueDictionary = PrivateAttr(default_factory=weakref.WeakValueDictionary)
+
+    def _semaphore(self, session_id: str) -> asyncio.Semaphore:
+        """Concurrency limit shared by a session's prefetched and live shards."""
+        semaphore = self._semaphores.get(session_id)
+        if semaphore is None:
+            semaphore = self._semaphores[session_id] = asyncio.Semaphore(max(1, self.max_concurrency))
+        return semaphore
+
+    @staticmethod
+    def shards(roadmap: Roadmap) -> list:
+        """Splits a roadmap into (week number, week text) shards."""
+        return [
+            (week.number, roadmap.week_text(week).strip()) for week in roadmap.weeks
+        ] or [(1, roadmap.source)]
+
+    @staticmethod
+    def shard_key(week: int, shard: str, profile: dict) -> str:
+        return "resources:" + digest(json.dumps([week, shard, profile], sort_keys=True))
+
+    def prefetch_jobs(self, context: InvocationContext, roadmap: Roadmap, profile: dict) -> dict:
+        """
+        Builds speculative curation jobs for every week of a roadmap.
+
+        Returns:
+            Maps shard keys to coroutine functions (see `SpeculativeTasks.start`)
+        """
+        semaphore = self._semaphore(context.session.id)
+        return {
+            self.shard_key(week, shard, profile): functools.partial(
+                self._curate_shard, context, semaphore, week, shard, profile
+            )
+            for week, shard in self.shards(roadmap)
+        }
+
+    async def _curate_shard(
+        self,
+        context: InvocationContext,
+        semaphore: asyncio.Semaphore,
+        week: int,
+        shard: str,
+        profile: dict,
+    ) -> str:
+        profile_lines = "\n".join(
+            f"- {key.replace('_', ' ').title()}: {value}"
+            for key, value in profile.items()
+        )
+        request = (
+            f"Learner profile:\n{profile_lines or '- Not specified'}\n\n"
+            f"Find learning resources for Week {week} of the roadmap:\n\n{shard}"
+        )
+        async with semaphore:
+            text, _ = await run_agent_isolated(
+                self.shard_agent,
+                request,
+                state=profile,
+                plugins=context.plugin_manager.plugins,
+                user_id=context.user_id,
+            )
+        return text
+
+    async def _resources_for_shard(
+        self,
+        context: InvocationContext,
+        semaphore: asyncio.Semaphore,
+        week: int,
+        shard: str,
+        profile: dict,
+    ) -> str:
+        prefetched = await speculative_tasks.take(
+            context.session.id, self.shard_key(week, shard, profile)
+        )
+        if prefetched:
+            return prefetched
+        return await self._curate_shard(context, semaphore, week, shard, profile)
+
+    async def _run_async_impl(
+        self, context: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = context.session.state
+        roadmap = approved_roadmap(state)
+
+        if roadmap is None:
+            yield Event(author=self.name, invocation_id=context.invocation_id)
+            return
+
+        shards = self.shards(roadmap)
+        profile = learner_profile(state)
+        semaphore = self._semaphore(context.session.id)
+
+        results = await asyncio.gather(*[
+            self._resources_for_shard(context, semaphore, week, shard, profile)
+            for week, shard in shards
+        ])
+
+        if len(shards) == 1:
+            learning_resources = results[0]
+        else:
+            learning_resources = "\n\n".join(
+                f"## Week {week} Resources\n\n{text.strip()}"
+                for (week, _), text in zip(shards, results)
+            )
+
+        yield Event(
+            author=self.name,
+            invocation_id=context.invocation_id,
+            branch=context.branch,
+            actions=EventActions(state_delta={"learning_resources": learning_resources}),
+        )
+
+
+def create_resource_curator(config: RoadmapConfiguration = config) -> BaseAgent:
+    """
+    Builds the resource curator for a configuration: a
+    `ShardedResourceCurator` when `shard_resource_curation` is on, otherwise
+    a single agent that curates the whole roadmap.
+    """
+    callbacks = dict(
+        before_agent_callback=with_config(skip_checkpointed_stage, config),
+        after_agent_callback=[
+            store_roadmap_structure,
+            with_config(store_approved_roadmap, config),
+            with_config(record_stage_checkpoint, config),
+            suppress_output_callback,
+        ],
+    )
+    if config.shard_resource_curation:
+        return ShardedResourceCurator(
+            name="resource_curator",
+            description="Finds high-quality learning resources matching user preferences.",
+            shard_agent=create_week_resource_curator(config),
+            max_concurrency=config.resource_curation_concurrency,
+            **callbacks,
+        )
+    return Agent(
+        model=scheduled_model(config.worker_model, config),  # Using gemini-2.5-flash
+        name="resource_curator",
+        description="Finds high-quality learning resources matching user preferences.",
+        instruction=_INSTRUCTION,
+        tools=[FunctionTool(with_config(find_learning_resources, config)), create_search_tool(config)],
+        output_key="learning_resources",
+        **callbacks,
+    )
+
+
+__getattr__ = lazy_attributes(globals(), {
+    "resource_curator": create_resource_curator,
+    "week_resource_curator": create_week_resource_curator,
+})
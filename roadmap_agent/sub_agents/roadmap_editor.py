@@ -3,16 +3,272 @@ Roadmap Editor Agent
 Refines roadmap based on user feedback
 """
 
-from google.adk.agents import Agent
+import asyncio
+import re
+from typing import AsyncGenerator, Optional
 
-from ..config import config
-from ..agent_utils import suppress_output_callback
+from google.adk.agents import Agent, BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai.types import Content, Part
+from pydantic import Field
 
-roadmap_editor = Agent(
-    model=config.critic_model,
-    name="roadmap_editor",
-    description="Edits and refines the roadmap based on user feedback.",
-    instruction="""
+from ..config import RoadmapConfiguration, config
+from ..agent_utils import (
+    run_agent_isolated,
+    store_roadmap_structure,
+    suppress_output_callback,
+    with_config,
+)
+from ..lazy import lazy_attributes
+from ..model_cascade import (
+    EDITOR,
+    can_escalate,
+    cascade_model_callback,
+    escalated_state,
+    escalation_delta,
+    is_escalated,
+)
+from ..model_scheduler import scheduled_model
+from ..roadmap_model import (
+    Roadmap,
+    approved_roadmap,
+    parse_roadmap,
+    roadmap_from_state,
+    structure_key,
+)
+from ..streaming import stream_weeks_callback
+from ..validation import roadmap_issues
+from .enrichment_prefetch import prefetch_enrichment
+
+_WEEK_REFERENCE = re.compile(
+    r"\bweeks?\s+(\d+(?:\s*(?:,|&|and|-|–|to)\s*\d+)*)", re.IGNORECASE
+)
+_ORDINAL_WEEK = re.compile(
+    r"\b(first|second|third|fourth|fifth|sixth|last|final)\s+week\b", re.IGNORECASE
+)
+_DAY_REFERENCE = re.compile(r"\bday\s+(\d+)\b", re.IGNORECASE)
+_GLOBAL_REFERENCE = re.compile(
+    r"\b(?:all|every|each|entire|whole|overall|throughout)\s+(?:the\s+)?"
+    r"(?:weeks?|days?|roadmap|plan|schedule)\b",
+    re.IGNORECASE,
+)
+_ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6}
+
+
+def affected_weeks(feedback: str, roadmap: Roadmap) -> Optional[list[int]]:
+    """
+    Works out which weeks a piece of feedback is about.
+
+    Args:
+        feedback: User feedback text
+        roadmap: Roadmap being edited
+
+    Returns:
+        Sorted week numbers to regenerate, or None when the feedback is
+        global (pacing, "all weeks") or doesn't point at specific weeks
+    """
+    if _GLOBAL_REFERENCE.search(feedback):
+        return None
+
+    known = {week.number for week in roadmap.weeks}
+    weeks = set()
+
+    for match in _WEEK_REFERENCE.finditer(feedback):
+        for low, high in re.findall(r"(\d+)(?:\s*(?:-|–|to)\s*(\d+))?", match.group(1)):
+            weeks.update(range(int(low), int(high or low) + 1))
+
+    for match in _ORDINAL_WEEK.finditer(feedback):
+        word = match.group(1).lower()
+        weeks.add(max(known) if word in ("last", "final") and known else _ORDINALS.get(word, 0))
+
+    for match in _DAY_REFERENCE.finditer(feedback):
+        day_number = int(match.group(1))
+        owners = {
+            week.number for week in roadmap.weeks
+            for day in week.days if day.number == day_number
+        }
+        # Only usable when day numbers run across weeks (Day 1-28)
+        if len(owners) == 1:
+            weeks.update(owners)
+
+    if not weeks or not weeks <= known:
+        return None
+    return sorted(weeks)
+
+
+def _message_text(content: Optional[Content]) -> str:
+    if not content or not content.parts:
+        return ""
+    return "".join(part.text for part in content.parts if part.text)
+
+
+_SECTION_INSTRUCTION = """
+    You are an experienced career coach and educational consultant.
+    
+    You will receive the outline of a 4-week roadmap, ONE week of it in full,
+    and the user's feedback. Rewrite only that week so it addresses the feedback.
+    
+    **Editing Principles:**
+    - Keep the same week number and the same markdown structure (headings, day
+      sections, objectives, concepts, practice)
+    - Keep logical progression with the surrounding weeks
+    - Ensure each day remains achievable within the user's time commitment
+    
+    **Output Format:**
+    Output ONLY the revised week, starting with its week heading
+    (e.g. "## Week 2: ..."). Do not include other weeks or any commentary.
+    """
+
+
+class IncrementalRoadmapEditor(BaseAgent):
+    """
+    Applies feedback by regenerating only the weeks it refers to.
+
+    Targeted feedback ("more React in week 2") is sent to `section_editor`
+    once per affected week and patched into the stored roadmap, leaving every
+    other section byte-identical. Global feedback, or a section edit that
+    still fails validation, falls back to `full_editor`.
+
+    Under the "cascade" model policy every edit is tried on the worker model
+    first and repeated on the critic model only if its output fails validation.
+    """
+
+    full_editor: BaseAgent
+    section_editor: BaseAgent
+    targeted: bool = True
+    max_weeks: int = 2
+    # Supplies the validation rules and the model policy
+    config: RoadmapConfiguration = Field(default_factory=lambda: config)
+
+    async def _edit_week(
+        self,
+        context: InvocationContext,
+        roadmap: Roadmap,
+        number: int,
+        feedback: str,
+        escalated: bool,
+    ) -> Optional[str]:
+        outline = "\n".join(
+            f"- Week {week.number}: {week.title}" for week in roadmap.weeks
+        )
+        request = (
+            f"Roadmap outline:\n{outline}\n\n"
+            f"User feedback:\n{feedback}\n\n"
+            f"Revise Week {number}:\n\n{roadmap.week_text(roadmap.week(number)).strip()}"
+        )
+        text, _ = await run_agent_isolated(
+            self.section_editor,
+            request,
+            state=escalated_state(EDITOR) if escalated else None,
+            plugins=context.plugin_manager.plugins,
+            user_id=context.user_id,
+        )
+        revised = parse_roadmap(text)
+        week = revised.week(number)
+        if week is None or len(revised.weeks) != 1:
+            return None
+        if any(issue.get("week") == number for issue in roadmap_issues(revised, self.config)):
+            return None
+        return revised.week_text(week)
+
+    async def _edit_weeks(
+        self,
+        context: InvocationContext,
+        roadmap: Roadmap,
+        weeks: list,
+        feedback: str,
+    ) -> AsyncGenerator[Event, None]:
+        state = context.session.state
+        escalated = is_escalated(state, EDITOR, context.invocation_id)
+        revisions = dict(zip(weeks, await asyncio.gather(*[
+            self._edit_week(context, roadmap, number, feedback, escalated)
+            for number in weeks
+        ])))
+
+        failed = [number for number, revision in revisions.items() if revision is None]
+        if failed and not escalated and can_escalate(EDITOR, self.config):
+            yield Event(
+                author=self.name,
+                invocation_id=context.invocation_id,
+                branch=context.branch,
+                actions=EventActions(
+                    state_delta=escalation_delta(state, EDITOR, context.invocation_id)
+                ),
+            )
+            retried = await asyncio.gather(*[
+                self._edit_week(context, roadmap, number, feedback, True)
+                for number in failed
+            ])
+            revisions.update(zip(failed, retried))
+
+        if any(revision is None for revision in revisions.values()):
+            return
+
+        updated = roadmap.with_weeks_replaced(revisions)
+        changed = ", ".join(f"Week {number}" for number in weeks)
+        summary = (
+            f"## Revised Roadmap\n\n**Changes Made:**\n"
+            f"- Revised {changed} based on your feedback; other weeks are unchanged.\n\n"
+        )
+
+        yield Event(
+            author=self.name,
+            invocation_id=context.invocation_id,
+            branch=context.branch,
+            content=Content(role="model", parts=[Part.from_text(text=summary + updated.source)]),
+            actions=EventActions(state_delta={
+                "final_roadmap": updated.source,
+                structure_key("final_roadmap"): updated.to_dict(),
+            }),
+        )
+
+    async def _edit_full(self, context: InvocationContext) -> AsyncGenerator[Event, None]:
+        async for event in self.full_editor.run_async(context):
+            yield event
+
+        state = context.session.state
+        if not can_escalate(EDITOR, self.config) or is_escalated(state, EDITOR, context.invocation_id):
+            return
+
+        revised = roadmap_from_state(state, "final_roadmap")
+        if revised is not None and not roadmap_issues(revised, self.config):
+            return
+
+        yield Event(
+            author=self.name,
+            invocation_id=context.invocation_id,
+            branch=context.branch,
+            actions=EventActions(
+                state_delta=escalation_delta(state, EDITOR, context.invocation_id)
+            ),
+        )
+        async for event in self.full_editor.run_async(context):
+            yield event
+
+    async def _run_async_impl(
+        self, context: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        roadmap = approved_roadmap(context.session.state)
+        feedback = _message_text(context.user_content)
+
+        weeks = None
+        if self.targeted and roadmap is not None and roadmap.weeks and feedback:
+            weeks = affected_weeks(feedback, roadmap)
+
+        if weeks and len(weeks) <= self.max_weeks:
+            patched = False
+            async for event in self._edit_weeks(context, roadmap, weeks, feedback):
+                patched = patched or "final_roadmap" in event.actions.state_delta
+                yield event
+            if patched:
+                return
+
+        async for event in self._edit_full(context):
+            yield event
+
+
+_FULL_INSTRUCTION = """
     You are an experienced career coach and educational consultant.
     
     Your task is to refine the roadmap based on user feedback.
@@ -67,7 +323,41 @@ roadmap_editor = Agent(
     [Full revised roadmap]
     
     Store the updated version in the appropriate state key (`roadmap_outline` or `final_roadmap`).
-    """,
-    output_key="final_roadmap",
-    after_agent_callback=suppress_output_callback,
-)
\ No newline at end of file
+    """
+
+
+def create_roadmap_editor(config: RoadmapConfiguration = config) -> IncrementalRoadmapEditor:
+    """Builds the roadmap editor (full and per-week editors) for a configuration."""
+    section_editor = Agent(
+        model=scheduled_model(config.critic_model, config),
+        name="roadmap_section_editor",
+        description="Rewrites a single week of a roadmap based on user feedback.",
+        instruction=_SECTION_INSTRUCTION,
+        before_model_callback=with_config(cascade_model_callback, config),
+    )
+
+    full_roadmap_editor = Agent(
+        model=scheduled_model(config.critic_model, config),
+        name="full_roadmap_editor",
+        description="Edits and refines the roadmap based on user feedback.",
+        instruction=_FULL_INSTRUCTION,
+        output_key="final_roadmap",
+        before_model_callback=with_config(cascade_model_callback, config),
+        after_model_callback=with_config(stream_weeks_callback, config),
+        after_agent_callback=[store_roadmap_structure, suppress_output_callback],
+    )
+
+    return IncrementalRoadmapEditor(
+        name="roadmap_editor",
+        description="Edits and refines the roadmap based on user feedback.",
+        full_editor=full_roadmap_editor,
+        section_editor=section_editor,
+        targeted=config.incremental_editing,
+        max_weeks=config.incremental_edit_max_weeks,
+        config=config,
+        sub_agents=[full_roadmap_editor],
+        after_agent_callback=[with_config(prefetch_enrichment, config), suppress_output_callback],
+    )
+
+
+__getattr__ = lazy_attributes(globals(), {"roadmap_editor": create_roadmap_editor})
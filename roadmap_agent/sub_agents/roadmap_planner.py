@@ -1,22 +1,55 @@
-
 """
 Roadmap Planner Agent
 Creates structured 4-week learning roadmaps
 """
 
-from google.adk.agents import Agent, LoopAgent
-from google.adk.tools import agent_tool
+import asyncio
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import Agent, BaseAgent, LoopAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from pydantic import Field
 
-from ..config import config
-from ..agent_utils import suppress_output_callback
+from ..config import RoadmapConfiguration, config
+from ..agent_utils import (
+    run_agent_isolated,
+    store_roadmap_structure,
+    suppress_output_callback,
+    with_config,
+)
+from ..checkpoints import record_stage_checkpoint, skip_checkpointed_stage
+from ..lazy import lazy_attributes
+from ..model_cascade import (
+    PLANNER,
+    can_escalate,
+    cascade_model_callback,
+    escalated_state,
+    escalation_delta,
+    is_escalated,
+)
+from ..model_scheduler import scheduled_model
+from ..roadmap_model import (
+    Roadmap,
+    digest,
+    parse_roadmap,
+    roadmap_from_state,
+    structure_key,
+)
+from ..roadmap_store import seed_planner_callback
+from ..streaming import stream_weeks_callback
 from ..validation_checkers import RoadmapValidationChecker
-from ..tool_agents import search_agent  
+from ..tool_agents import create_search_tool
+from .enrichment_prefetch import prefetch_enrichment
 
-roadmap_planner = Agent(
-    model=config.critic_model,  # Using gemini-2.5-pro
-    name="roadmap_planner",
-    description="Creates a detailed 4-week learning roadmap with daily objectives.",
-    instruction="""
+# How often the planner loop regenerated vs. repaired an outline
+repair_stats = {
+    "full_generations": 0,
+    "retries_avoided": 0,
+    "repair_fallbacks": 0,
+}
+
+_PLANNER_INSTRUCTION = """
     You are an expert instructional designer and career coach.
     
     Create a comprehensive 4-week roadmap based on:
@@ -31,19 +64,239 @@ roadmap_planner = Agent(
     
     Output the complete 4-week roadmap in detailed markdown format.
     Store in `roadmap_outline` state key.
-    """,
-    tools=[agent_tool.AgentTool(agent=search_agent)],  
-    output_key="roadmap_outline",
-    after_agent_callback=suppress_output_callback,
-)
+    """
+
+_REPAIRER_INSTRUCTION = """
+    You are an expert instructional designer and career coach.
+    
+    You will receive the outline of a 4-week roadmap, the current text of ONE
+    week (or a note that the week is missing), and the validation problems found
+    in it (for example: too few daily breakdowns, or no practice section).
+    
+    Write the complete, corrected week so that:
+    - It has a daily breakdown ("### Day N: ...") for every study day
+    - Every day lists its Objective, Key Concepts, Learning activities and Practice
+    - It keeps the existing content and progression wherever it was already fine
+    
+    **Output Format:**
+    Output ONLY the corrected week, starting with its week heading
+    (e.g. "## Week 3: ..."). Do not include other weeks or any commentary.
+    """
+
+
+def repair_plan(
+    report: Optional[dict],
+    outline: Optional[str],
+    invocation_id: str,
+    config: RoadmapConfiguration = config,
+) -> Optional[list]:
+    """
+    Decides whether the last validation failure can be fixed by a repair.
+
+    Only failures reported for the current outline in the current invocation
+    are repairable, and only when they are confined to a few weeks.
+
+    Args:
+        report: `roadmap_validation` state value written by the checker
+        outline: Current `roadmap_outline` text
+        invocation_id: Current invocation id
+        config: Configuration with the repair limit
+
+    Returns:
+        Sorted week numbers to repair, or None to regenerate from scratch
+    """
+    if not report or report.get("valid") or not outline:
+        return None
+    if report.get("invocation_id") != invocation_id or report.get("digest") != digest(outline):
+        return None
+
+    weeks = set()
+    for issue in report.get("issues", []):
+        if "week" in issue:
+            weeks.add(issue["week"])
+        elif issue["code"] != "too_short":
+            return None
+
+    if not weeks or len(weeks) > config.max_repair_weeks:
+        return None
+    return sorted(weeks)
+
+
+class RoadmapPlanningStep(BaseAgent):
+    """
+    Planning step of the validation loop.
+
+    On the first pass (or when the failure can't be localized) it runs the
+    full `planner`. When the checker rejected the outline for problems in a
+    few weeks, it asks `repairer` to rewrite only those weeks and patches
+    them into `roadmap_outline`. Under the "cascade" model policy the first
+    attempt runs on the worker model and retries on the critic model.
+    """
+
+    planner: BaseAgent
+    repairer: BaseAgent
+    # Supplies the repair switches and the model policy
+    config: RoadmapConfiguration = Field(default_factory=lambda: config)
+
+    def clone(self, update=None):
+        cloned = super().clone(update)
+        # Run the cloned planner sub-agent, not the original one
+        if not update or "planner" not in update:
+            cloned.planner = next(
+                agent for agent in cloned.sub_agents if agent.name == self.planner.name
+            )
+        return cloned
+
+    async def _repair_week(
+        self,
+        context: InvocationContext,
+        roadmap: Roadmap,
+        number: int,
+        problems: list,
+        escalated: bool,
+    ) -> Optional[str]:
+        outline = "\n".join(
+            f"- Week {week.number}: {week.title}" for week in roadmap.weeks
+        )
+        week = roadmap.week(number)
+        current = roadmap.week_text(week).strip() if week else "(this week is missing)"
+        request = (
+            f"Roadmap outline:\n{outline or '- (no weeks yet)'}\n\n"
+            f"Problems in Week {number}:\n"
+            + "\n".join(f"- {problem}" for problem in problems)
+            + f"\n\nCurrent Week {number}:\n\n{current}"
+        )
+        text, _ = await run_agent_isolated(
+            self.repairer,
+            request,
+            state=escalated_state(PLANNER) if escalated else None,
+            plugins=context.plugin_manager.plugins,
+            user_id=context.user_id,
+        )
+        repaired = parse_roadmap(text)
+        week = repaired.week(number)
+        if week is None or len(repaired.weeks) != 1:
+            return None
+        return repaired.week_text(week)
+
+    async def _run_async_impl(
+        self, context: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = context.session.state
+        report = state.get("roadmap_validation")
+
+        # Under the cascade policy a failed attempt moves the planner to the critic model
+        failed = (
+            bool(report)
+            and not report.get("valid")
+            and report.get("invocation_id") == context.invocation_id
+        )
+        if failed and can_escalate(PLANNER, self.config) and not is_escalated(state, PLANNER, context.invocation_id):
+            yield Event(
+                author=self.name,
+                invocation_id=context.invocation_id,
+                branch=context.branch,
+                actions=EventActions(
+                    state_delta=escalation_delta(state, PLANNER, context.invocation_id)
+                ),
+            )
+        escalated = is_escalated(context.session.state, PLANNER, context.invocation_id)
+
+        weeks = None
+        if self.config.targeted_repair:
+            weeks = repair_plan(
+                report, state.get("roadmap_outline"), context.invocation_id, self.config
+            )
+
+        repairs = None
+        if weeks:
+            roadmap = roadmap_from_state(state, "roadmap_outline")
+            repairs = await asyncio.gather(*[
+                self._repair_week(
+                    context,
+                    roadmap,
+                    number,
+                    [issue["message"] for issue in report["issues"] if issue.get("week") == number],
+                    escalated,
+                )
+                for number in weeks
+            ])
+            if any(repair is None for repair in repairs):
+                repair_stats["repair_fallbacks"] += 1
+                repairs = None
+
+        if not repairs:
+            repair_stats["full_generations"] += 1
+            async for event in self.planner.run_async(context):
+                yield event
+            return
+
+        repair_stats["retries_avoided"] += 1
+        updated = roadmap.with_weeks_replaced(dict(zip(weeks, repairs)))
+        yield Event(
+            author=self.name,
+            invocation_id=context.invocation_id,
+            branch=context.branch,
+            actions=EventActions(state_delta={
+                "roadmap_outline": updated.source,
+                structure_key("roadmap_outline"): updated.to_dict(),
+            }),
+        )
+
+
+def create_robust_roadmap_planner(config: RoadmapConfiguration = config) -> LoopAgent:
+    """
+    Builds the planner stage for a configuration: the planning step
+    (planner and week repairer) followed by the validation checker, in a
+    loop of at most three attempts.
+    """
+    roadmap_planner = Agent(
+        model=scheduled_model(config.critic_model, config),  # Using gemini-2.5-pro
+        name="roadmap_planner",
+        description="Creates a detailed 4-week learning roadmap with daily objectives.",
+        instruction=_PLANNER_INSTRUCTION,
+        tools=[create_search_tool(config)],
+        output_key="roadmap_outline",
+        before_model_callback=[
+            with_config(cascade_model_callback, config),
+            with_config(seed_planner_callback, config),
+        ],
+        after_model_callback=with_config(stream_weeks_callback, config),
+        after_agent_callback=[store_roadmap_structure, suppress_output_callback],
+    )
+
+    week_repairer = Agent(
+        model=scheduled_model(config.critic_model, config),
+        name="roadmap_week_repairer",
+        description="Fixes validation problems in a single week of a roadmap outline.",
+        instruction=_REPAIRER_INSTRUCTION,
+        before_model_callback=with_config(cascade_model_callback, config),
+    )
+
+    planning_step = RoadmapPlanningStep(
+        name="roadmap_planning_step",
+        description="Generates the roadmap outline, or repairs the weeks that failed validation.",
+        planner=roadmap_planner,
+        repairer=week_repairer,
+        config=config,
+        sub_agents=[roadmap_planner],
+    )
+
+    return LoopAgent(
+        name="robust_roadmap_planner",
+        description="Robust roadmap planner with validation and retry logic.",
+        sub_agents=[
+            planning_step,
+            RoadmapValidationChecker(name="roadmap_validation_checker", config=config),
+        ],
+        max_iterations=3,
+        before_agent_callback=with_config(skip_checkpointed_stage, config),
+        after_agent_callback=[
+            with_config(prefetch_enrichment, config),
+            with_config(record_stage_checkpoint, config),
+            suppress_output_callback,
+        ],
+    )
+
 
-robust_roadmap_planner = LoopAgent(
-    name="robust_roadmap_planner",
-    description="Robust roadmap planner with validation and retry logic.",
-    sub_agents=[
-        roadmap_planner,
-        RoadmapValidationChecker(name="roadmap_validation_checker"),
-    ],
-    max_iterations=3,
-    after_agent_callback=suppress_output_callback,
-)
\ No newline at end of file
+__getattr__ = lazy_attributes(globals(), {"robust_roadmap_planner": create_robust_roadmap_planner})
@@ -3,14 +3,24 @@ Specialized tool agents that handle specific capabilities.
 These agents use models that support their respective tools.
 """
 
+import asyncio
+import os
+from typing import Any, Optional
+
 from google.adk.agents import Agent
 from google.adk.tools import google_search
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.tool_context import ToolContext
+
+from .config import RoadmapConfiguration, config
+from .lazy import lazy_attributes
+from .model_scheduler import scheduled_model
+from .search_cache import SearchCache, normalize_query
+from .single_flight import SingleFlight
+
+SEARCH_AGENT_NAME = "SearchAgent"
 
-search_agent = Agent(
-    model='gemini-2.0-flash-exp',
-    name='SearchAgent',
-    description='Specialist in web search and information retrieval',
-    instruction="""
+_SEARCH_INSTRUCTION = """
     You are a specialist in Google Search. When asked to search for information:
     
     1. **Use concise search queries**: Keep searches to 1-6 words for best results
@@ -30,6 +40,101 @@ search_agent = Agent(
     - Search "[topic] practice exercises"
     
     Return comprehensive, well-organized information.
-    """,
-    tools=[google_search]
-)
\ No newline at end of file
+    """
+
+
+def create_search_agent(config: RoadmapConfiguration = config) -> Agent:
+    """Builds the SearchAgent, the only agent that calls `google_search`."""
+    return Agent(
+        model=scheduled_model(config.tool_agent_model, config),
+        name=SEARCH_AGENT_NAME,
+        description="Specialist in web search and information retrieval",
+        instruction=_SEARCH_INSTRUCTION,
+        tools=[google_search],
+    )
+
+
+class CachedAgentTool(AgentTool):
+    """
+    AgentTool that serves repeated requests from a SearchCache.
+
+    Only successful text results are cached; the wrapped agent runs as usual
+    on a miss or while the tool's `config.enable_search_cache` is off.
+    Identical requests made concurrently (by any session) share one agent
+    run when its `config.coalesce_requests` is on.
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        cache: Optional[SearchCache] = None,
+        flight: Optional[SingleFlight] = None,
+        config: RoadmapConfiguration = config,
+    ):
+        super().__init__(agent=agent)
+        self.cache = cache
+        self.flight = flight
+        self.config = config
+
+    async def _run_and_cache(
+        self, args: dict[str, Any], tool_context: ToolContext, cache: Optional[SearchCache]
+    ) -> Any:
+        result = await super().run_async(args=args, tool_context=tool_context)
+
+        request = args.get("request", "")
+        if cache is not None and request and isinstance(result, str):
+            await asyncio.to_thread(cache.put, request, result)
+        return result
+
+    async def run_async(
+        self, *, args: dict[str, Any], tool_context: ToolContext
+    ) -> Any:
+        request = args.get("request", "")
+        cache = self.cache if self.config.enable_search_cache else None
+        if cache is not None and request:
+            cached = await asyncio.to_thread(cache.get, request)
+            if cached is not None:
+                return cached
+
+        if self.flight is None or not self.config.coalesce_requests or not request:
+            return await self._run_and_cache(args, tool_context, cache)
+        return await self.flight.do(
+            normalize_query(request),
+            lambda: self._run_and_cache(args, tool_context, cache),
+        )
+
+
+search_cache = (
+    SearchCache(
+        path=os.path.join(config.cache_dir, "search_cache.sqlite3"),
+        ttl_seconds=config.search_cache_ttl_seconds,
+        max_entries=config.search_cache_max_entries,
+    )
+    if config.enable_search_cache
+    else None
+)
+
+# In-flight SearchAgent runs, shared by every session in the process
+search_flight = SingleFlight("search")
+
+
+def create_search_tool(config: RoadmapConfiguration = config) -> CachedAgentTool:
+    """
+    Builds the tool through which agents delegate to the SearchAgent.
+
+    Every search tool shares the process-wide `search_cache` and
+    `search_flight`, whichever agent graph it belongs to.
+    """
+    return CachedAgentTool(
+        agent=create_search_agent(config),
+        cache=search_cache,
+        flight=search_flight,
+        config=config,
+    )
+
+
+# `search_agent` and `search_tool` are built on first use
+__getattr__ = lazy_attributes(globals(), {
+    "search_agent": create_search_agent,
+    "search_tool": create_search_tool,
+})
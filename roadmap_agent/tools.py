@@ -2,9 +2,47 @@
 Custom Tools for Roadmap Agent
 """
 
-import json
-import os
-from datetime import datetime
+import asyncio
+
+from google.adk.tools.tool_context import ToolContext
+
+from .config import RoadmapConfiguration, config
+from .export import export_roadmap_async
+from .resource_index import resource_index
+from .validation import validate_roadmap_text
+
+
+def record_user_profile(
+    target_domain: str,
+    experience_level: str,
+    learning_style: str,
+    time_commitment: str,
+    tool_context: ToolContext,
+) -> dict:
+    """
+    Records the user's profile in session state for the sub-agents.
+    
+    Args:
+        target_domain: Target job domain/role (e.g., "Frontend Developer")
+        experience_level: Current experience level (e.g., "complete beginner")
+        learning_style: Preferred learning style ("video", "reading", "hands-on", "mixed")
+        time_commitment: Daily time commitment (e.g., "3 hours per day")
+    
+    Returns:
+        Dictionary with the recorded profile
+    """
+    profile = {
+        "target_domain": target_domain,
+        "experience_level": experience_level,
+        "learning_style": learning_style,
+        "time_commitment": time_commitment,
+    }
+    tool_context.state.update(profile)
+    
+    return {
+        "status": "success",
+        "profile": profile,
+    }
 
 
 def analyze_job_market(domain: str, location: str = "global") -> dict:
@@ -32,22 +70,64 @@ def analyze_job_market(domain: str, location: str = "global") -> dict:
     }
 
 
-def find_learning_resources(
+async def find_learning_resources(
     topic: str, 
     resource_type: str = "mixed", 
-    difficulty: str = "beginner"
+    difficulty: str = "beginner",
+    config: RoadmapConfiguration = config,
 ) -> dict:
     """
     Finds learning resources for a specific topic.
     
+    Looks the topic up in the local resource index first. Confident matches
+    are returned as ranked concrete resources; otherwise the result carries
+    search suggestions for the SearchAgent (plus any weak local matches).
+    
     Args:
         topic: Learning topic (e.g., "Python basics", "SQL queries")
         resource_type: Type of resource ("video", "article", "interactive", "mixed")
         difficulty: Difficulty level ("beginner", "intermediate", "advanced")
+        config: Index settings (bound by the agent factories, hidden from the model)
     
     Returns:
-        Dictionary with resource finding status and search suggestions
+        Dictionary with ranked `resources` and, on a low-confidence match,
+        search suggestions
     """
+    resources, confidence = [], 0.0
+    if config.enable_resource_index:
+        # The first search may build the TF-IDF index, so it runs off the loop
+        matches, confidence = await asyncio.to_thread(
+            resource_index.search,
+            topic,
+            resource_type=resource_type,
+            difficulty=difficulty,
+            limit=config.resource_index_max_results,
+            min_score=config.resource_index_min_score,
+        )
+        resources = [
+            {
+                "title": resource.title,
+                "url": resource.url,
+                "type": resource.resource_type,
+                "difficulty": resource.difficulty,
+                "topic": resource.topic,
+                "quality": round(resource.quality, 2),
+                "score": round(score, 3),
+            }
+            for resource, score in matches
+        ]
+
+    if resources and confidence >= config.resource_index_min_score:
+        return {
+            "topic": topic,
+            "resource_type": resource_type,
+            "difficulty": difficulty,
+            "status": "success",
+            "source": "local_index",
+            "confidence": round(confidence, 3),
+            "message": "Resources found in the local catalog; no search needed",
+            "resources": resources,
+        }
     
     search_queries = []
     
@@ -68,8 +148,11 @@ def find_learning_resources(
         "resource_type": resource_type,
         "difficulty": difficulty,
         "status": "success",
-        "message": "Use Google Search with these queries to find current resources",
+        "source": "search",
+        "confidence": round(confidence, 3),
+        "message": "No confident match in the local catalog; use the SearchAgent with these queries",
         "suggested_searches": search_queries,
+        "resources": resources,
         "platforms": {
             "video": ["YouTube", "Udemy", "Coursera", "freeCodeCamp"],
             "article": ["Medium", "Dev.to", "Official documentation"],
@@ -78,7 +161,7 @@ def find_learning_resources(
     }
 
 
-def save_roadmap_to_file(
+async def save_roadmap_to_file(
     roadmap_content: str, 
     filename: str,
     format_type: str = "markdown"
@@ -86,6 +169,10 @@ def save_roadmap_to_file(
     """
     Saves the roadmap to a file.
     
+    The file is written atomically in a worker thread. JSON exports hold the
+    roadmap as structured weeks, days and resources (see
+    `export.ROADMAP_JSON_SCHEMA`) along with the markdown.
+    
     Args:
         roadmap_content: The complete roadmap text
         filename: Desired filename (e.g., "my_roadmap.md")
@@ -94,92 +181,24 @@ def save_roadmap_to_file(
     Returns:
         Dictionary with save status
     """
-    try:
-        # Ensure proper file extension
-        if format_type == "markdown" and not filename.endswith(".md"):
-            filename += ".md"
-        elif format_type == "json" and not filename.endswith(".json"):
-            filename += ".json"
-        
-        # Add metadata header
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        if format_type == "markdown":
-            full_content = f"""---
-Generated: {timestamp}
-Type: Career Preparation Roadmap
----
-
-{roadmap_content}
-
----
-**Note:** This roadmap was generated by an AI assistant. Adjust based on your learning pace and circumstances.
-Remember to track your progress and don't hesitate to modify the plan as needed.
-"""
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(full_content)
-        
-        elif format_type == "json":
-            # Structure the roadmap as JSON
-            roadmap_data = {
-                "metadata": {
-                    "generated": timestamp,
-                    "type": "career_preparation_roadmap",
-                },
-                "content": roadmap_content,
-            }
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(roadmap_data, f, indent=2, ensure_ascii=False)
-        
-        return {
-            "status": "success",
-            "filename": filename,
-            "path": os.path.abspath(filename),
-            "message": f"Roadmap saved successfully to {filename}",
-        }
-    
-    except Exception as e:
-        return {
-            "status": "error",
-            "message": f"Failed to save roadmap: {str(e)}",
-        }
+    return await export_roadmap_async(roadmap_content, filename, format_type)
 
 
-def validate_roadmap_structure(roadmap_content: str) -> dict:
+def validate_roadmap_structure(roadmap_content: str, config: RoadmapConfiguration = config) -> dict:
     """
     Validates that a roadmap has proper structure.
     
+    Uses the same rules as the roadmap validation checker.
+    
     Args:
         roadmap_content: Roadmap text to validate
+        config: Configuration with the week and day rules
     
     Returns:
-        Dictionary with validation results
+        Dictionary with validation results: `valid`, `issues` (messages),
+        `week_count`, `day_count`, `link_count`, `missing_sections` and a
+        per-week breakdown
     """
-    issues = []
-    
-    # Check for week headers
-    week_count = roadmap_content.lower().count("week ")
-    if week_count < 4:
-        issues.append(f"Expected 4 weeks, found {week_count}")
-    
-    # Check for daily breakdowns
-    day_count = roadmap_content.lower().count("day ")
-    if day_count < 20:  # At least 5 days per week * 4 weeks
-        issues.append(f"Insufficient daily breakdowns (found {day_count})")
-    
-    # Check for key sections
-    required_sections = ["objective", "concepts", "practice"]
-    missing_sections = [
-        section for section in required_sections 
-        if section not in roadmap_content.lower()
-    ]
-    
-    if missing_sections:
-        issues.append(f"Missing sections: {', '.join(missing_sections)}")
-    
-    return {
-        "valid": len(issues) == 0,
-        "issues": issues,
-        "week_count": week_count,
-        "day_count": day_count,
-    }
\ No newline at end of file
+    report = validate_roadmap_text(roadmap_content, config)
+    report["issues"] = [issue["message"] for issue in report["issues"]]
+    return report
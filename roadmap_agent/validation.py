@@ -0,0 +1,281 @@
+"""
+Validation Engine
+Single-pass rules shared by `validate_roadmap_structure` and the checker agents
+"""
+
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .config import RoadmapConfiguration, config
+from .roadmap_model import Roadmap, parse_roadmap
+
+# Terms a roadmap must mention (in every week with strict_week_validation)
+REQUIRED_TERMS = ["objective", "learning", "practice"]
+
+# Sections a domain analysis must cover
+DOMAIN_SECTIONS = ["skills", "concepts", "interview", "requirements"]
+
+# Resource kinds that count towards variety
+RESOURCE_TYPES = ["video", "article", "course"]
+
+MIN_ROADMAP_LENGTH = 500
+# Daily breakdowns a whole roadmap needs unless weeks are checked one by one
+MIN_ROADMAP_DAYS = 15
+MIN_RESOURCES_LENGTH = 300
+MIN_PRACTICE_LENGTH = 300
+MIN_ANALYSIS_LENGTH = 400
+
+_KEYWORDS = sorted(
+    set(REQUIRED_TERMS + DOMAIN_SECTIONS + RESOURCE_TYPES), key=len, reverse=True
+)
+
+# Every keyword and link is found by one case-insensitive scan, so no rule
+# lowercases or re-counts the text on its own.
+_SCAN = re.compile(
+    r"(?P<link>https?://)|(?P<term>" + "|".join(map(re.escape, _KEYWORDS)) + ")",
+    re.IGNORECASE,
+)
+
+
+@dataclass(slots=True)
+class TextScan:
+    """Offsets of every keyword and link in a text."""
+
+    length: int
+    terms: dict = field(default_factory=dict)
+    links: list = field(default_factory=list)
+
+    def has(self, term: str, start: int = 0, end: Optional[int] = None) -> bool:
+        """Whether `term` occurs in `[start, end)`."""
+        positions = self.terms.get(term)
+        if not positions:
+            return False
+        index = bisect_left(positions, start)
+        return index < len(positions) and positions[index] < (self.length if end is None else end)
+
+    def link_count(self, start: int = 0, end: Optional[int] = None) -> int:
+        end = self.length if end is None else end
+        return bisect_left(self.links, end) - bisect_left(self.links, start)
+
+    def missing(self, terms: list, start: int = 0, end: Optional[int] = None) -> list:
+        return [term for term in terms if not self.has(term, start, end)]
+
+
+def scan_text(text: str) -> TextScan:
+    """
+    Finds every validation keyword and link in one pass over the text.
+
+    Args:
+        text: Text to scan
+
+    Returns:
+        TextScan with sorted offsets per keyword
+    """
+    scan = TextScan(length=len(text))
+    for match in _SCAN.finditer(text):
+        if match.lastgroup == "link":
+            scan.links.append(match.start())
+        else:
+            scan.terms.setdefault(match.group().lower(), []).append(match.start())
+    return scan
+
+
+def _issue(code: str, message: str, **details) -> dict:
+    return {"code": code, "message": message, **details}
+
+
+def validate_roadmap(
+    roadmap: Roadmap,
+    scan: Optional[TextScan] = None,
+    config: RoadmapConfiguration = config,
+) -> dict:
+    """
+    Validates a roadmap outline against the configured structure rules.
+
+    Each issue has a `code` ("too_short", "missing_week", "missing_days",
+    "missing_terms"), a human-readable `message` and, when the problem is
+    confined to one week, the `week` number. Days and terms are counted
+    over the whole roadmap, or per week with `config.strict_week_validation`.
+
+    Args:
+        roadmap: Parsed roadmap
+        scan: Scan of `roadmap.source`, if already available
+        config: Configuration with the week and day rules
+
+    Returns:
+        Report with `valid`, `issues`, totals, `missing_sections` and a
+        per-week / per-day breakdown
+    """
+    scan = scan or scan_text(roadmap.source)
+    issues = []
+
+    # Check length (should be substantial)
+    if len(roadmap.source) < MIN_ROADMAP_LENGTH:
+        issues.append(_issue("too_short", "Roadmap too short"))
+
+    # Check for week structure
+    present = {week.number for week in roadmap.weeks}
+    for number in range(1, config.default_weeks + 1):
+        if number not in present:
+            issues.append(_issue("missing_week", f"Week {number} is missing", week=number))
+
+    # Check for daily breakdown and key components across the roadmap
+    strict = config.strict_week_validation
+    if not strict and roadmap.day_count < MIN_ROADMAP_DAYS:
+        issues.append(_issue(
+            "missing_days",
+            f"Insufficient daily breakdown (found {roadmap.day_count}, expected {MIN_ROADMAP_DAYS})",
+            found=roadmap.day_count,
+            expected=MIN_ROADMAP_DAYS,
+        ))
+    missing_sections = scan.missing(REQUIRED_TERMS)
+    if not strict and missing_sections:
+        issues.append(_issue(
+            "missing_terms",
+            f"Missing key terms: {', '.join(missing_sections)}",
+            terms=missing_sections,
+        ))
+
+    weeks = []
+    for week in roadmap.weeks:
+        # Check for daily breakdown
+        if strict and len(week.days) < config.min_days_per_week:
+            issues.append(_issue(
+                "missing_days",
+                (
+                    f"Week {week.number} has {len(week.days)} daily breakdowns, "
+                    f"expected at least {config.min_days_per_week}"
+                ),
+                week=week.number,
+                found=len(week.days),
+                expected=config.min_days_per_week,
+            ))
+
+        # Check for key components
+        missing_terms = scan.missing(REQUIRED_TERMS, week.start, week.end)
+        if strict and missing_terms:
+            issues.append(_issue(
+                "missing_terms",
+                f"Week {week.number} is missing: {', '.join(missing_terms)}",
+                week=week.number,
+                terms=missing_terms,
+            ))
+
+        weeks.append({
+            "number": week.number,
+            "title": week.title,
+            "day_count": len(week.days),
+            "link_count": scan.link_count(week.start, week.end),
+            "missing_terms": missing_terms,
+            "days": [
+                {
+                    "label": day.label,
+                    "objectives": len(day.objectives),
+                    "concepts": len(day.concepts),
+                    "practice": len(day.practice),
+                    "resources": len(day.resources),
+                }
+                for day in week.days
+            ],
+        })
+
+    return {
+        "valid": not issues,
+        "issues": issues,
+        "week_count": len(roadmap.weeks),
+        "day_count": roadmap.day_count,
+        "link_count": scan.link_count(),
+        "missing_sections": missing_sections,
+        "weeks": weeks,
+    }
+
+
+def validate_roadmap_text(text: str, config: RoadmapConfiguration = config) -> dict:
+    """Parses and validates roadmap markdown."""
+    return validate_roadmap(parse_roadmap(text), config=config)
+
+
+def roadmap_issues(roadmap: Roadmap, config: RoadmapConfiguration = config) -> list:
+    """Returns only the issues of `validate_roadmap`."""
+    return validate_roadmap(roadmap, config=config)["issues"]
+
+
+def validate_resources(resources: str) -> dict:
+    """
+    Validates a curated resource list.
+
+    Args:
+        resources: Resource markdown
+
+    Returns:
+        Report with `valid`, `issues`, `link_count` and `resource_types`
+    """
+    scan = scan_text(resources)
+    issues = []
+
+    # Check for substantial content
+    if len(resources) < MIN_RESOURCES_LENGTH:
+        issues.append(_issue("too_short", "Resources too brief"))
+
+    # Check for links (should contain URLs)
+    if not scan.links:
+        issues.append(_issue("no_links", "No resource links found"))
+
+    # Check for resource types
+    resource_types = [kind for kind in RESOURCE_TYPES if scan.has(kind)]
+    if not resource_types:
+        issues.append(_issue("no_variety", "Insufficient resource variety"))
+
+    return {
+        "valid": not issues,
+        "issues": issues,
+        "link_count": len(scan.links),
+        "resource_types": resource_types,
+    }
+
+
+def validate_practice(practice: str) -> dict:
+    """Validates the practice activities produced by the practice advisor."""
+    issues = []
+    if len(practice) < MIN_PRACTICE_LENGTH:
+        issues.append(_issue("too_short", "Practice activities too brief"))
+    return {"valid": not issues, "issues": issues}
+
+
+def validate_domain_analysis(analysis: str) -> dict:
+    """
+    Validates a domain analysis.
+
+    Args:
+        analysis: Domain researcher output
+
+    Returns:
+        Report with `valid`, `issues` and `missing_sections`
+    """
+    missing_sections = scan_text(analysis).missing(DOMAIN_SECTIONS)
+    issues = []
+
+    # Check for key sections
+    if missing_sections:
+        issues.append(_issue(
+            "missing_sections",
+            f"Missing sections: {', '.join(missing_sections)}",
+            sections=missing_sections,
+        ))
+
+    # Check for substantial content
+    if len(analysis) < MIN_ANALYSIS_LENGTH:
+        issues.append(_issue("too_short", "Analysis too brief"))
+
+    return {
+        "valid": not issues,
+        "issues": issues,
+        "missing_sections": missing_sections,
+    }
+
+
+def issue_messages(issues: list) -> str:
+    """Joins the messages of a list of issues for logging."""
+    return ", ".join(issue["message"] for issue in issues)
@@ -8,58 +8,58 @@ from typing import AsyncGenerator
 from google.adk.agents import BaseAgent
 from google.adk.agents.invocation_context import InvocationContext
 from google.adk.events import Event, EventActions
+from pydantic import Field
+
+from .config import RoadmapConfiguration, config
+from .roadmap_model import digest, roadmap_from_state
+from .validation import (
+    issue_messages,
+    validate_domain_analysis,
+    validate_practice,
+    validate_resources,
+    validate_roadmap,
+)
 
 
 class RoadmapValidationChecker(BaseAgent):
     """Validates that a roadmap outline meets quality standards."""
     
+    # Supplies the week and day rules
+    config: RoadmapConfiguration = Field(default_factory=lambda: config)
+    
     async def _run_async_impl(
         self, context: InvocationContext
     ) -> AsyncGenerator[Event, None]:
-        roadmap = context.session.state.get("roadmap_outline")
+        text = context.session.state.get("roadmap_outline")
         
-        if not roadmap:
+        if not text:
             yield Event(author=self.name)
             return
         
-        # Validation checks
-        is_valid = True
-        issues = []
-        
-        # Check length (should be substantial)
-        if len(roadmap) < 500:
-            is_valid = False
-            issues.append("Roadmap too short")
-        
-        # Check for week structure
-        week_count = roadmap.lower().count("week")
-        if week_count < 4:
-            is_valid = False
-            issues.append(f"Expected 4 weeks, found {week_count}")
-        
-        # Check for daily breakdown
-        day_mentions = roadmap.lower().count("day")
-        if day_mentions < 15:  # At least 4-5 days per week
-            is_valid = False
-            issues.append("Insufficient daily breakdown")
-        
-        # Check for key components
-        required_terms = ["objective", "learning", "practice"]
-        missing_terms = [term for term in required_terms if term not in roadmap.lower()]
-        if missing_terms:
-            is_valid = False
-            issues.append(f"Missing key terms: {', '.join(missing_terms)}")
+        # Machine-readable report so the planner can repair instead of regenerate
+        report = validate_roadmap(
+            roadmap_from_state(context.session.state, "roadmap_outline"), config=self.config
+        )
+        report["digest"] = digest(text)
+        report["invocation_id"] = context.invocation_id
+        is_valid = report["valid"]
         
         if is_valid:
             # Roadmap is valid, escalate to continue workflow
             yield Event(
                 author=self.name,
-                actions=EventActions(escalate=True),
+                actions=EventActions(
+                    escalate=True,
+                    state_delta={"roadmap_validation": report},
+                ),
             )
         else:
             # Roadmap is invalid, don't escalate (will trigger retry)
-            print(f"Roadmap validation failed: {', '.join(issues)}")
-            yield Event(author=self.name)
+            print(f"Roadmap validation failed: {issue_messages(report['issues'])}")
+            yield Event(
+                author=self.name,
+                actions=EventActions(state_delta={"roadmap_validation": report}),
+            )
 
 
 class ResourceValidationChecker(BaseAgent):
@@ -74,37 +74,15 @@ class ResourceValidationChecker(BaseAgent):
             yield Event(author=self.name)
             return
         
-        # Basic validation
-        is_valid = True
-        issues = []
-        
-        # Check for substantial content
-        if len(resources) < 300:
-            is_valid = False
-            issues.append("Resources too brief")
+        report = validate_resources(resources)
         
-        # Check for links (should contain URLs)
-        if "http" not in resources:
-            is_valid = False
-            issues.append("No resource links found")
-        
-        # Check for resource types
-        has_variety = (
-            "video" in resources.lower() or 
-            "article" in resources.lower() or 
-            "course" in resources.lower()
-        )
-        if not has_variety:
-            is_valid = False
-            issues.append("Insufficient resource variety")
-        
-        if is_valid:
+        if report["valid"]:
             yield Event(
                 author=self.name,
                 actions=EventActions(escalate=True),
             )
         else:
-            print(f"Resource validation failed: {', '.join(issues)}")
+            print(f"Resource validation failed: {issue_messages(report['issues'])}")
             yield Event(author=self.name)
 
 
@@ -120,36 +98,44 @@ class DomainAnalysisChecker(BaseAgent):
             yield Event(author=self.name)
             return
         
-        is_valid = True
-        issues = []
+        report = validate_domain_analysis(analysis)
         
-        # Check for key sections
-        required_sections = [
-            "skills",
-            "concepts", 
-            "interview",
-            "requirements"
-        ]
+        if report["valid"]:
+            yield Event(
+                author=self.name,
+                actions=EventActions(escalate=True),
+            )
+        else:
+            print(f"Domain analysis validation failed: {issue_messages(report['issues'])}")
+            yield Event(author=self.name)
+
+
+class EnrichmentValidationChecker(BaseAgent):
+    """Validates the output of the parallel resource and practice stage."""
+    
+    async def _run_async_impl(
+        self, context: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        resources = context.session.state.get("learning_resources")
+        practice = context.session.state.get("practice_activities")
         
-        missing_sections = [
-            section for section in required_sections 
-            if section not in analysis.lower()
-        ]
+        issues = []
         
-        if missing_sections:
-            is_valid = False
-            issues.append(f"Missing sections: {', '.join(missing_sections)}")
+        if resources:
+            issues.extend(validate_resources(resources)["issues"])
+        else:
+            issues.append({"code": "no_resources", "message": "No learning resources"})
         
-        # Check for substantial content
-        if len(analysis) < 400:
-            is_valid = False
-            issues.append("Analysis too brief")
+        if practice:
+            issues.extend(validate_practice(practice)["issues"])
+        else:
+            issues.append({"code": "no_practice", "message": "No practice activities"})
         
-        if is_valid:
+        if not issues:
             yield Event(
                 author=self.name,
                 actions=EventActions(escalate=True),
             )
         else:
-            print(f"Domain analysis validation failed: {', '.join(issues)}")
-            yield Event(author=self.name)
\ No newline at end of file
+            print(f"Enrichment validation failed: {issue_messages(issues)}")
+            yield Event(author=self.name)
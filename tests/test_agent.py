@@ -4,17 +4,81 @@ Tests the complete workflow from domain selection to roadmap export
 """
 
 import asyncio
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from roadmap_agent.agent import root_agent
+from roadmap_agent.agent import plugins, root_agent
 from google.genai import types as genai_types
 
+from roadmap_agent import roadmap_store as roadmap_store_module
+from roadmap_agent.cassette import Cassette
+from roadmap_agent.config import config
+from roadmap_agent.instrumentation import instrumentation_plugin
+from roadmap_agent.session_store import create_session_service
 
-async def main():
-    """Runs the roadmap agent with a sample conversation flow."""
+# Recorded responses for the conversation in main(), used by --replay
+DEFAULT_CASSETTE = os.path.join(os.path.dirname(__file__), "cassettes", "roadmap_conversation.json")
+
+# Simulated conversation used by main() and the benchmarks
+QUERIES = [
+    # Initial request
+    "I want to prepare for a Frontend Developer job",
+    
+    # Respond to information gathering
+    "I'm a complete beginner with programming. I prefer a mixed learning approach with videos and hands-on practice. I can dedicate 3 hours per day.",
+    
+    # Approve initial roadmap
+    "This looks great! Please proceed with finding resources.",
+    
+    # Review resources
+    "The resources look good. Can you add more hands-on projects?",
+    
+    # Final approval
+    "Perfect! I'm ready to save this roadmap.",
+    
+    # Provide filename
+    "frontend_developer_roadmap.md",
+]
+
+
+@contextmanager
+def scratch_roadmap_store():
+    """
+    Points the approved-roadmap store at a temporary directory, so roadmaps
+    approved by earlier runs don't seed the planner of a recorded run.
+    """
+    previous = roadmap_store_module.roadmap_store
+    with tempfile.TemporaryDirectory() as directory:
+        store = roadmap_store_module.RoadmapStore(os.path.join(directory, "roadmaps.sqlite3"))
+        roadmap_store_module.roadmap_store = store
+        try:
+            yield store
+        finally:
+            roadmap_store_module.roadmap_store = previous
+            store.close()
+
+
+async def main(delay: float = 1.0, stream: bool = False):
+    """
+    Runs the roadmap agent with a sample conversation flow.
+    
+    Args:
+        delay: Pause between queries in seconds (0 when replaying a cassette)
+        stream: Use SSE streaming and print partial (week by week) output
+    """
+    started = time.perf_counter()
     
     # Initialize session
-    session_service = InMemorySessionService()
+    session_service = create_session_service()
+    # A persistent backend still holds the previous run's session
+    await session_service.delete_session(
+        app_name="roadmap_app",
+        user_id="test_user",
+        session_id="test_session"
+    )
     await session_service.create_session(
         app_name="roadmap_app",
         user_id="test_user",
@@ -25,36 +89,17 @@ async def main():
     runner = Runner(
         agent=root_agent,
         app_name="roadmap_app",
-        session_service=session_service
+        session_service=session_service,
+        plugins=plugins,
     )
     
-    # Simulate a complete conversation
-    queries = [
-        # Initial request
-        "I want to prepare for a Frontend Developer job",
-        
-        # Respond to information gathering
-        "I'm a complete beginner with programming. I prefer a mixed learning approach with videos and hands-on practice. I can dedicate 3 hours per day.",
-        
-        # Approve initial roadmap
-        "This looks great! Please proceed with finding resources.",
-        
-        # Review resources
-        "The resources look good. Can you add more hands-on projects?",
-        
-        # Final approval
-        "Perfect! I'm ready to save this roadmap.",
-        
-        # Provide filename
-        "frontend_developer_roadmap.md",
-    ]
     
     print("=" * 80)
     print("ROADMAP AGENT INTEGRATION TEST")
     print("=" * 80)
     print()
     
-    for i, query in enumerate(queries, 1):
+    for i, query in enumerate(QUERIES, 1):
         print(f"\n{'─' * 80}")
         print(f"Query {i}: {query}")
         print(f"{'─' * 80}\n")
@@ -66,23 +111,37 @@ async def main():
                 role="user",
                 parts=[genai_types.Part.from_text(text=query)]
             ),
+            run_config=RunConfig(
+                streaming_mode=StreamingMode.SSE if stream else StreamingMode.NONE
+            ),
         ):
-            if event.is_final_response() and event.content and event.content.parts:
+            if event.partial and event.content and event.content.parts:
+                print(f"[{event.author}, streaming]\n{event.content.parts[0].text}")
+            elif event.is_final_response() and event.content and event.content.parts:
                 response = event.content.parts[0].text
                 print(f"Agent Response:\n{response}\n")
         
         # Small delay between queries
-        await asyncio.sleep(1)
+        if delay:
+            await asyncio.sleep(delay)
     
     print("\n" + "=" * 80)
-    print("TEST COMPLETED")
+    print(f"TEST COMPLETED in {time.perf_counter() - started:.2f}s")
     print("=" * 80)
+    summary = instrumentation_plugin.session_summary("test_session")
+    if summary:
+        print(f"Metrics: {summary}")
 
 
 async def test_single_query():
     """Quick test with a single query."""
     
-    session_service = InMemorySessionService()
+    session_service = create_session_service()
+    await session_service.delete_session(
+        app_name="roadmap_app",
+        user_id="quick_test",
+        session_id="quick_session"
+    )
     await session_service.create_session(
         app_name="roadmap_app",
         user_id="quick_test",
@@ -92,7 +151,8 @@ async def test_single_query():
     runner = Runner(
         agent=root_agent,
         app_name="roadmap_app",
-        session_service=session_service
+        session_service=session_service,
+        plugins=plugins,
     )
     
     query = "I want to become a Data Analyst. Can you help me create a study plan?"
@@ -112,11 +172,35 @@ async def test_single_query():
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quick", action="store_true", help="Run a single query")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream partial responses (SSE) as they are generated")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", nargs="?", const=DEFAULT_CASSETTE, metavar="CASSETTE",
+                      help="Run against live models and record their responses")
+    mode.add_argument("--replay", nargs="?", const=DEFAULT_CASSETTE, metavar="CASSETTE",
+                      help="Run offline from recorded responses")
+    args = parser.parse_args()
+    
+    if args.record or args.replay:
+        # A cassette must see every model call, so skip the persistent caches
+        config.enable_search_cache = False
+        config.enable_domain_cache = False
     
-    if len(sys.argv) > 1 and sys.argv[1] == "--quick":
+    if args.quick:
         # Quick single-query test
         asyncio.run(test_single_query())
+    elif args.record:
+        with scratch_roadmap_store(), Cassette(args.record, mode="record") as cassette:
+            asyncio.run(main(stream=args.stream))
+        print(f"Recorded {len(cassette.interactions)} model calls to {args.record}")
+    elif args.replay:
+        with scratch_roadmap_store(), Cassette(args.replay, mode="replay") as cassette:
+            asyncio.run(main(delay=0, stream=args.stream))
+        print(f"Replay: {cassette.stats()}")
     else:
         # Full integration test
-        asyncio.run(main())
\ No newline at end of file
+        asyncio.run(main(stream=args.stream))
@@ -0,0 +1,170 @@
+"""
+Tests for batch roadmap generation
+"""
+
+import asyncio
+import json
+
+from benchmarks.stub_model import StubModel
+from roadmap_agent.batch import APP_NAME, BatchRun, load_progress, read_profiles, run_batch
+from roadmap_agent.config import config
+from tests.test_agent import DEFAULT_CASSETTE
+
+
+def write_profiles(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return str(path)
+
+
+def test_read_profiles_accepts_short_field_names(tmp_path):
+    path = write_profiles(tmp_path / "cohort.jsonl", [
+        {"id": "ana", "domain": "Data Analyst", "level": "beginner", "style": "video", "hours": 2},
+        {"target_domain": "Cloud Engineer", "time_commitment": "4 hours"},
+    ])
+
+    (first_id, first), (second_id, second) = read_profiles(path)
+
+    assert first_id == "ana"
+    assert first == {
+        "target_domain": "Data Analyst",
+        "experience_level": "beginner",
+        "learning_style": "video",
+        "time_commitment": "2 hours per day",
+    }
+    assert second_id.startswith("cloud-engineer-")
+    assert second == {"target_domain": "Cloud Engineer", "time_commitment": "4 hours"}
+
+
+def test_profile_ids_cannot_leave_the_output_directory(tmp_path):
+    path = write_profiles(tmp_path / "cohort.jsonl", [
+        {"id": "../../etc/x", "domain": "Data Analyst"},
+        {"id": "/tmp/Report.md", "domain": "Data Analyst"},
+        {"id": "..", "domain": "Cloud Engineer"},
+    ])
+
+    ids = [profile_id for profile_id, _ in read_profiles(path)]
+
+    assert ids[:2] == ["etc-x", "tmp-report-md"]
+    assert ids[2].startswith("cloud-engineer-")
+
+    # Ids passed to `run_batch` directly are rejected, not written
+    output_dir = tmp_path / "out"
+    summary = asyncio.run(run_batch([("../escape", {"target_domain": "Data Analyst"})], str(output_dir)))
+    assert summary["failed"] == 1
+    assert "ValueError" in load_progress(str(output_dir))["../escape"]["error"]
+    assert not (tmp_path / "escape.md").exists()
+
+
+def test_batch_runs_every_stage_and_exports(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "enable_search_cache", False)
+    monkeypatch.setattr(config, "enable_domain_cache", False)
+    monkeypatch.setattr(config, "enable_roadmap_seeding", False)
+    profiles = [("fe-1", {
+        "target_domain": "Frontend Developer",
+        "experience_level": "complete beginner",
+        "learning_style": "mixed",
+        "time_commitment": "3 hours per day",
+    })]
+
+    with StubModel(DEFAULT_CASSETTE):
+        summary = asyncio.run(run_batch(profiles, str(tmp_path / "out"), workers=2))
+
+    assert (summary["done"], summary["failed"]) == (1, 0)
+    exported = (tmp_path / "out" / "fe-1.md").read_text()
+    assert "## Week 4" in exported
+    assert "# Learning Resources" in exported and "# Practice Activities" in exported
+    assert load_progress(str(tmp_path / "out"))["fe-1"]["issues"] == 0
+
+
+def test_shared_research_reaches_the_session_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "enable_search_cache", False)
+    monkeypatch.setattr(config, "enable_roadmap_seeding", False)
+
+    async def fake_research(self, domain, level, profile):
+        return f"analysis of {domain}"
+
+    monkeypatch.setattr(BatchRun, "_run_research", fake_research)
+    profile = {"target_domain": "Frontend Developer", "experience_level": "complete beginner"}
+
+    async def scenario():
+        batch = BatchRun(str(tmp_path / "out"))
+        service = batch.runner.session_service
+        delete_session = service.delete_session
+        states = []
+
+        async def record_and_delete(**kwargs):
+            states.append((await service.get_session(**kwargs)).state)
+            await delete_session(**kwargs)
+
+        service.delete_session = record_and_delete
+        await batch.generate("fe-1", profile)
+        sessions = await service.list_sessions(app_name=APP_NAME, user_id=APP_NAME)
+        return states, sessions.sessions
+
+    with StubModel(DEFAULT_CASSETTE):
+        (state,), remaining = asyncio.run(scenario())
+    # The planner instruction and the stage checkpoints read it from state
+    assert state["domain_analysis"] == "analysis of Frontend Developer"
+    # The session is dropped once the roadmap is exported
+    assert remaining == []
+
+
+def test_failed_profiles_release_their_session(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    async def fake_research(self, domain, level, profile):
+        return ""
+
+    async def failing_run(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+        yield
+
+    monkeypatch.setattr(BatchRun, "_run_research", fake_research)
+
+    async def scenario():
+        batch = BatchRun(str(tmp_path / "out"))
+        monkeypatch.setattr(batch.runner, "run_async", failing_run)
+        try:
+            await batch.generate("fe-1", {"target_domain": "Frontend Developer"})
+        except RuntimeError:
+            pass
+        sessions = await batch.runner.session_service.list_sessions(app_name=APP_NAME, user_id=APP_NAME)
+        return sessions.sessions
+
+    assert asyncio.run(scenario()) == []
+
+
+def test_resume_skips_done_profiles_and_shares_research(tmp_path, monkeypatch):
+    researched = []
+    crash = {"cloud"}
+
+    async def fake_research(self, domain, level, profile):
+        researched.append(domain)
+        await asyncio.sleep(0.01)
+        return f"analysis of {domain}"
+
+    async def fake_generate(self, profile_id, profile):
+        analysis = await self.research(profile)
+        if profile_id in crash:
+            raise RuntimeError("model unavailable")
+        return {"id": profile_id, "status": "done", "analysis": analysis}
+
+    monkeypatch.setattr(BatchRun, "_run_research", fake_research)
+    monkeypatch.setattr(BatchRun, "generate", fake_generate)
+    profiles = [
+        ("ana-1", {"target_domain": "Data Analyst", "experience_level": "beginner"}),
+        ("ana-2", {"target_domain": "data analyst", "experience_level": "beginner"}),
+        ("cloud", {"target_domain": "Cloud Engineer"}),
+    ]
+    output_dir = str(tmp_path / "out")
+
+    first = asyncio.run(run_batch(profiles, output_dir, workers=3))
+    assert (first["done"], first["failed"]) == (2, 1)
+    assert sorted(researched) == ["Cloud Engineer", "Data Analyst"]
+
+    crash.clear()
+    second = asyncio.run(run_batch(profiles, output_dir, workers=3))
+    assert (second["skipped"], second["done"], second["failed"]) == (2, 1, 0)
+    assert {entry["status"] for entry in load_progress(output_dir).values()} == {"done"}
@@ -0,0 +1,73 @@
+"""
+Smoke tests for the benchmarks on the stub model
+"""
+
+from benchmarks.e2e import compare, run_benchmark
+from benchmarks.import_time import run_import_time
+from benchmarks.load import percentile, run_load, saturation_point
+from benchmarks.roadmap_index import run_roadmap_index
+from benchmarks.sessions import run_sessions
+
+
+def test_benchmark_reports_stages_turns_and_model_usage():
+    result = run_benchmark(repeat=1, latency=0.001, trace_memory=False)
+
+    assert len(result["turns"]) == 6
+    assert result["model"]["unused"] == 0
+    assert result["model"]["model_calls"] == sum(result["model_calls"].values())
+    assert {"roadmap_planner", "resource_curator", "week_resource_curator"} <= set(result["agents"])
+    assert result["turns"][-1]["state_bytes"] > result["turns"][0]["state_bytes"]
+
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {"wall_s": 0.1, "agents": {"roadmap_planner": {"total_s": 0.05}}, "tools": {}}
+    result = {"wall_s": 0.102, "agents": {"roadmap_planner": {"total_s": 0.09}}, "tools": {}}
+
+    assert compare(result, baseline, tolerance=0.25) == [("agents.roadmap_planner", 0.05, 0.09)]
+
+
+def test_concurrent_sessions_each_replay_the_full_conversation():
+    result = run_load([3], sessions=4)
+
+    (level,) = result["levels"]
+    assert level["errors"] == 0
+    assert level["turns"] == 4 * 6
+    assert level["latency_s"]["p50"] <= level["latency_s"]["p99"]
+
+
+def test_percentiles_and_saturation():
+    assert percentile(list(range(1, 101)), 0.95) == 95
+    assert percentile([], 0.5) == 0.0
+
+    levels = [
+        {"concurrency": 1, "turns_per_s": 10},
+        {"concurrency": 5, "turns_per_s": 40},
+        {"concurrency": 10, "turns_per_s": 42},
+    ]
+    assert saturation_point(levels) == 10
+
+
+def test_roadmap_index_benchmark_reports_lookup_latency():
+    result = run_roadmap_index(roadmaps=300, queries=20)
+
+    assert result["settings"]["roadmaps"] == 300
+    assert 0 < result["lookup_s"]["p50"] <= result["lookup_s"]["p99"]
+    assert result["match_rate"] > 0.5
+
+
+def test_sessions_benchmark_runs_both_services():
+    result = run_sessions([1, 2])
+
+    assert set(result["conversation"]) == {"sqlite", "memory"}
+    for service in result["services"].values():
+        assert [level["sessions"] for level in service["levels"]] == [1, 2]
+        assert service["read_s"]["p50"] > 0
+    assert result["services"]["sqlite"]["db_bytes"] > 0
+
+
+def test_import_benchmark_shows_the_package_import_stays_light():
+    result = run_import_time(repeat=1, scenarios=["package", "helpers"])
+
+    for scenario in result["scenarios"].values():
+        assert scenario["median_s"] > 0
+        assert not any(scenario["loaded"].values())
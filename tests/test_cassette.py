@@ -0,0 +1,78 @@
+"""
+Offline replay of the integration conversation from a recorded cassette
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from google.adk.models import BaseLlm, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from roadmap_agent.cassette import Cassette, CassetteMiss
+from roadmap_agent.config import config
+from roadmap_agent.tool_agents import search_agent
+from tests.test_agent import DEFAULT_CASSETTE, main, scratch_roadmap_store
+
+
+class EchoLlm(BaseLlm):
+    """Backend that answers with the last user message."""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        text = llm_request.contents[-1].parts[0].text
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part.from_text(text=f"echo: {text}")]))
+
+
+def run_search_agent(message):
+    async def run():
+        runner = InMemoryRunner(agent=search_agent.clone())
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id="u")
+        texts = []
+        async for event in runner.run_async(
+            user_id="u",
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part.from_text(text=message)]),
+        ):
+            if event.content and event.content.parts and event.content.parts[0].text:
+                texts.append(event.content.parts[0].text)
+        return texts
+
+    return asyncio.run(run())
+
+
+def test_recorded_calls_replay_without_the_backend(tmp_path):
+    path = str(tmp_path / "echo.json")
+    with Cassette(path, mode="record", backend=EchoLlm):
+        assert run_search_agent("react hooks") == ["echo: react hooks"]
+
+    with Cassette(path) as cassette:
+        assert run_search_agent("react hooks") == ["echo: react hooks"]
+    assert cassette.stats()["exact_hits"] == 1
+
+
+def test_conversation_replays_offline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "enable_search_cache", False)
+    monkeypatch.setattr(config, "enable_domain_cache", False)
+
+    started = time.perf_counter()
+    # Every request must match its recording, so prompt changes fail here
+    with scratch_roadmap_store(), Cassette(DEFAULT_CASSETTE, match="strict") as cassette:
+        asyncio.run(main(delay=0))
+
+    assert time.perf_counter() - started < 5
+    assert cassette.stats()["exact_hits"] == cassette.stats()["interactions"]
+    assert cassette.stats()["unused"] == 0
+    assert (tmp_path / "frontend_developer_roadmap.md").exists()
+
+
+def test_strict_replay_rejects_changed_requests(tmp_path):
+    path = str(tmp_path / "echo.json")
+    with Cassette(path, mode="record", backend=EchoLlm):
+        run_search_agent("react hooks")
+
+    with Cassette(path, match="strict"):
+        with pytest.raises(CassetteMiss):
+            run_search_agent("vue composables")
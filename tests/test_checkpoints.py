@@ -0,0 +1,135 @@
+"""
+Tests for stage checkpoints and resuming a failed turn
+"""
+
+import asyncio
+from typing import AsyncGenerator
+
+import pytest
+from google.adk.agents import BaseAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from roadmap_agent.checkpoints import (
+    CHECKPOINTS_KEY,
+    record_stage_checkpoint,
+    skip_checkpointed_stage,
+    stage_fingerprint,
+)
+
+ROADMAP = "## Week 1: Basics\n### Day 1: Setup\n\n## Week 2: More\n### Day 1: Practice"
+PROFILE = {
+    "target_domain": "Data Analyst",
+    "experience_level": "beginner",
+    "learning_style": "mixed",
+    "time_commitment": "2 hours",
+    "roadmap_outline": ROADMAP,
+}
+
+
+class FakeStage(BaseAgent):
+    """Writes its output key; fails while `failures` is above zero."""
+
+    output_key: str
+    runs: int = 0
+    failures: int = 0
+
+    async def _run_async_impl(self, context: InvocationContext) -> AsyncGenerator[Event, None]:
+        self.runs += 1
+        if self.failures:
+            self.failures -= 1
+            raise TimeoutError(f"{self.name} timed out")
+        yield Event(
+            author=self.name,
+            invocation_id=context.invocation_id,
+            actions=EventActions(state_delta={self.output_key: f"{self.name} output {self.runs}"}),
+        )
+
+
+class Router(BaseAgent):
+    """Stands in for the orchestrator: transfers to the enrichment stage."""
+
+    async def _run_async_impl(self, context: InvocationContext) -> AsyncGenerator[Event, None]:
+        yield Event(
+            author=self.name,
+            invocation_id=context.invocation_id,
+            actions=EventActions(transfer_to_agent="resource_practice_stage"),
+        )
+        async for event in self.sub_agents[0].run_async(context):
+            yield event
+
+
+def _stage(name: str, output_key: str, failures: int = 0) -> FakeStage:
+    return FakeStage(
+        name=name,
+        output_key=output_key,
+        failures=failures,
+        before_agent_callback=skip_checkpointed_stage,
+        after_agent_callback=record_stage_checkpoint,
+    )
+
+
+def test_retried_turn_restarts_at_the_failed_stage():
+    practice = _stage("practice_advisor", "practice_activities")
+    curator = _stage("resource_curator", "learning_resources", failures=1)
+    router = Router(
+        name="router",
+        sub_agents=[SequentialAgent(name="resource_practice_stage", sub_agents=[practice, curator])],
+    )
+
+    async def scenario():
+        service = InMemorySessionService()
+        runner = Runner(agent=router, app_name="checkpoints", session_service=service)
+        session = await service.create_session(app_name="checkpoints", user_id="u", state=PROFILE)
+        message = types.Content(role="user", parts=[types.Part.from_text(text="Looks great, continue")])
+
+        with pytest.raises(TimeoutError):
+            async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+                pass
+        async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+            pass
+        return await service.get_session(app_name="checkpoints", user_id="u", session_id=session.id)
+
+    session = asyncio.run(scenario())
+
+    # The practice stage finished before the failure and was not repeated
+    assert practice.runs == 1
+    assert curator.runs == 2
+    assert session.state["practice_activities"] == "practice_advisor output 1"
+    assert session.state["learning_resources"] == "resource_curator output 2"
+    assert set(session.state[CHECKPOINTS_KEY]) == {"practice_advisor", "resource_curator"}
+
+
+def test_new_feedback_or_changed_inputs_rerun_the_stage():
+    practice = _stage("practice_advisor", "practice_activities")
+    router = Router(
+        name="router", sub_agents=[SequentialAgent(name="resource_practice_stage", sub_agents=[practice])]
+    )
+
+    async def scenario():
+        service = InMemorySessionService()
+        runner = Runner(agent=router, app_name="checkpoints", session_service=service)
+        session = await service.create_session(app_name="checkpoints", user_id="u", state=PROFILE)
+        for text in ["Continue", "Continue", "Add more projects please"]:
+            message = types.Content(role="user", parts=[types.Part.from_text(text=text)])
+            async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+                pass
+
+    asyncio.run(scenario())
+
+    # The repeated message was skipped; new feedback ran the stage again
+    assert practice.runs == 2
+
+
+def test_fingerprint_covers_the_roadmap_profile_and_message():
+    base = stage_fingerprint("resource_curator", PROFILE, "continue")
+
+    assert stage_fingerprint("resource_curator", dict(PROFILE), "continue") == base
+    assert stage_fingerprint("resource_curator", {**PROFILE, "learning_style": "video"}, "continue") != base
+    assert stage_fingerprint(
+        "resource_curator", {**PROFILE, "roadmap_outline": ROADMAP + "\n\n## Week 3: New"}, "continue"
+    ) != base
+    assert stage_fingerprint("resource_curator", PROFILE, "try again") != base
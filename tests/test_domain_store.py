@@ -0,0 +1,93 @@
+"""
+Unit tests for the cross-session domain analysis store
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from roadmap_agent import domain_store as domain_store_module
+from roadmap_agent.checkpoints import CHECKPOINTS_KEY
+from roadmap_agent.domain_store import (
+    DomainAnalysisStore,
+    normalize_domain,
+    normalize_level,
+)
+
+ANALYSIS = (
+    "## Core Technical Skills\nHTML, CSS, JavaScript.\n"
+    "## Essential Concepts\nThe DOM, accessibility, HTTP.\n"
+    "## Entry-Level Requirements\nA portfolio of projects.\n"
+    "## Interview Focus Areas\nJavaScript fundamentals. "
+) * 3
+
+
+def researcher_context(**state):
+    return SimpleNamespace(
+        state=state, agent_name="domain_researcher", invocation_id="inv", user_content=None
+    )
+
+
+def test_domain_and_level_normalization():
+    assert normalize_domain("Front-end Developer role") == "frontend developer"
+    assert normalize_domain("  DATA analyst ") == "data analyst"
+    assert normalize_level("I'm a complete beginner") == "beginner"
+    assert normalize_level("Some basics in Python") == "basics"
+    assert normalize_level(None) == "any"
+
+
+def test_store_serves_variants_of_the_same_profile(tmp_path):
+    store = DomainAnalysisStore(str(tmp_path / "domains.sqlite3"), max_age_seconds=60)
+    store.put("Frontend Developer", "complete beginner", "analysis")
+
+    analysis, age = store.get("front-end developer", "beginner")
+    assert analysis == "analysis"
+    assert age >= 0
+    assert store.get("frontend developer", "intermediate") is None
+
+
+def test_expired_entries_are_misses(tmp_path):
+    store = DomainAnalysisStore(str(tmp_path / "domains.sqlite3"), max_age_seconds=-1)
+    store.put("Cloud Engineer", "beginner", "analysis")
+
+    assert store.get("Cloud Engineer", "beginner") is None
+    assert store.stats()["misses"] == 1
+
+
+def test_hot_entries_are_listed_for_refresh(tmp_path):
+    store = DomainAnalysisStore(str(tmp_path / "domains.sqlite3"), max_age_seconds=60)
+    store.put("Data Analyst", "beginner", "analysis")
+    store.put("DevOps Engineer", "beginner", "analysis")
+    for _ in range(3):
+        store.get("Data Analyst", "beginner")
+
+    assert store.hot_entries(min_hits=3, older_than_seconds=0) == [
+        ("data analyst", "beginner")
+    ]
+
+
+def test_cached_analysis_is_served_once_per_session(tmp_path, monkeypatch):
+    monkeypatch.setattr(domain_store_module, "domain_store", DomainAnalysisStore(str(tmp_path / "d.db"), 3600))
+    domain_store_module.domain_store.put("Frontend Developer", "beginner", ANALYSIS)
+    context = researcher_context(target_domain="frontend developer", experience_level="beginner")
+
+    served = asyncio.run(domain_store_module.serve_cached_domain_analysis(context))
+    assert served.parts[0].text == ANALYSIS
+    # The researcher's after callbacks don't run, so the serve path checkpoints it
+    assert context.state[CHECKPOINTS_KEY]["domain_researcher"]["invocation_id"] == "inv"
+
+    # A follow-up turn routed to the researcher must reach the model
+    assert asyncio.run(domain_store_module.serve_cached_domain_analysis(context)) is None
+
+
+def test_invalid_analyses_are_neither_stored_nor_served(tmp_path, monkeypatch):
+    store = DomainAnalysisStore(str(tmp_path / "d.db"), 3600)
+    monkeypatch.setattr(domain_store_module, "domain_store", store)
+
+    context = researcher_context(target_domain="Data Analyst", domain_analysis="I could not find anything.")
+    asyncio.run(domain_store_module.store_domain_analysis(context))
+    assert store.get("Data Analyst", None) is None
+
+    store.put("Cloud Engineer", "beginner", "Too short")
+    context = researcher_context(target_domain="Cloud Engineer", experience_level="beginner")
+    assert asyncio.run(domain_store_module.serve_cached_domain_analysis(context)) is None
+    assert "domain_analysis" not in context.state
@@ -0,0 +1,113 @@
+"""
+Tests for atomic, async and structured roadmap export
+"""
+
+import asyncio
+import json
+import stat
+import threading
+
+import pytest
+
+from roadmap_agent import export as export_module
+from roadmap_agent.export import ROADMAP_JSON_SCHEMA, export_roadmaps, roadmap_document
+from roadmap_agent.tools import save_roadmap_to_file
+
+ROADMAP = """# Data Analyst Roadmap
+
+## Week 1: SQL
+
+### Day 1: SELECT
+- Objective: Query a table
+- Practice: 10 SELECT exercises
+
+### Day 2: Joins
+- Objective: Combine tables
+
+## Week 2: Python
+
+### Day 1: Pandas
+- Objective: Load a CSV
+
+# Learning Resources
+
+## Week 1 Resources
+
+### Day 1: SELECT
+- [SQL tutorial](https://example.com/sql)
+"""
+
+
+def test_json_document_has_weeks_days_and_resources():
+    document = roadmap_document(ROADMAP, timestamp="2025-01-01 00:00:00")
+
+    assert [week["number"] for week in document["weeks"]] == [1, 2]
+    week = document["weeks"][0]
+    assert week["title"] == "SQL"
+    # The resources section for week 1 is merged into week 1
+    assert [day["label"] for day in week["days"]] == ["Day 1", "Day 2", "Day 1"]
+    assert week["days"][0]["objectives"] == ["Query a table"]
+    assert week["days"][0]["practice"] == ["10 SELECT exercises"]
+    assert week["days"][2]["resources"] == ["https://example.com/sql"]
+    assert document["preamble"] == "# Data Analyst Roadmap"
+    assert document["content"] == ROADMAP
+
+    jsonschema = pytest.importorskip("jsonschema")
+    jsonschema.validate(document, ROADMAP_JSON_SCHEMA)
+
+
+def test_save_writes_off_the_event_loop(tmp_path, monkeypatch):
+    threads = []
+    atomic_write = export_module.atomic_write
+
+    def recording_write(path, text):
+        threads.append(threading.current_thread())
+        atomic_write(path, text)
+
+    monkeypatch.setattr(export_module, "atomic_write", recording_write)
+
+    saved = asyncio.run(save_roadmap_to_file(ROADMAP, str(tmp_path / "plan"), "json"))
+
+    assert saved["status"] == "success"
+    assert saved["filename"].endswith("plan.json")
+    assert json.loads((tmp_path / "plan.json").read_text())["metadata"]["schema_version"] == 2
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_failed_write_keeps_the_previous_file(tmp_path, monkeypatch):
+    path = tmp_path / "plan.md"
+    path.write_text("previous roadmap")
+
+    def broken_fsync(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(export_module.os, "fsync", broken_fsync)
+    saved = export_module.export_roadmap(ROADMAP, str(path))
+
+    assert saved["status"] == "error"
+    assert path.read_text() == "previous roadmap"
+    assert [entry.name for entry in tmp_path.iterdir()] == ["plan.md"]
+
+
+def test_batch_export_writes_every_roadmap(tmp_path):
+    results = asyncio.run(export_roadmaps([
+        {"roadmap_content": ROADMAP, "filename": str(tmp_path / f"cohort_{number}")}
+        for number in range(3)
+    ] + [{"roadmap_content": ROADMAP, "filename": str(tmp_path / "one"), "format_type": "json"}]))
+
+    assert [result["status"] for result in results] == ["success"] * 4
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == [
+        "cohort_0.md", "cohort_1.md", "cohort_2.md", "one.json"
+    ]
+
+
+def test_exported_files_are_not_private_to_the_owner(tmp_path):
+    export_module.export_roadmap(ROADMAP, str(tmp_path / "new"))
+    existing = tmp_path / "shared.md"
+    existing.write_text("previous roadmap")
+    existing.chmod(0o664)
+    export_module.export_roadmap(ROADMAP, str(existing))
+
+    # New files get 0666 minus the umask; replaced files keep their mode
+    assert stat.S_IMODE((tmp_path / "new.md").stat().st_mode) == 0o666 & ~export_module._UMASK
+    assert stat.S_IMODE(existing.stat().st_mode) == 0o664
@@ -0,0 +1,98 @@
+"""
+Unit tests for prompt history compaction
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from roadmap_agent.history_compaction import (
+    HistoryCompactionPlugin,
+    compact_contents,
+    content_tokens,
+)
+
+
+def _roadmap(version: int) -> str:
+    return "\n".join(
+        f"## Week {week}: Topic {week} v{version}\n" + "Practice every day. " * 60
+        for week in range(1, 5)
+    )
+
+
+def _user(text: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def _model(text: str) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def _refine_loop(rounds: int) -> list:
+    contents = [_user("I want to become a Data Analyst")]
+    for version in range(1, rounds + 1):
+        contents += [
+            types.Content(role="user", parts=[
+                types.Part(text="For context:"),
+                types.Part(text=f"[roadmap_editor] said: {_roadmap(version)}"),
+                types.Part(text="[roadmap_editor] called tool `google_search` with parameters: " + "x" * 2000),
+            ]),
+            _model(f"Here is the updated roadmap:\n\n{_roadmap(version)}"),
+            _user(f"Feedback round {version}: more SQL please"),
+        ]
+    return contents
+
+
+def test_superseded_versions_become_stubs_and_the_latest_is_kept():
+    contents = _refine_loop(3)
+
+    compacted = compact_contents(contents, budget=10**6, chatter_max_chars=100)
+
+    texts = [part.text for content in compacted for part in content.parts]
+    full_versions = [text for text in texts if "Practice every day." in text]
+    assert full_versions == [f"Here is the updated roadmap:\n\n{_roadmap(3)}"]
+    assert "[roadmap_editor] said: [Superseded roadmap version: Week 1: Topic 1 v1; " in texts[2]
+    assert all(len(text) < 200 for text in texts if "called tool" in text)
+    assert content_tokens(compacted) < content_tokens(contents) / 4
+    # The request's own contents are left alone
+    assert "Practice every day." in contents[1].parts[1].text
+
+
+def test_current_turn_is_never_compacted():
+    contents = _refine_loop(1) + [_model(f"Draft:\n{_roadmap(2)}")]
+
+    compacted = compact_contents(contents, budget=10**6)
+
+    # Version 1 precedes the current turn, version 2 is part of it
+    assert compacted[-1] is contents[-1]
+    assert compacted[-2] is contents[-2]
+    assert "Superseded" in compacted[1].parts[1].text
+
+
+def test_oldest_turns_are_summarized_above_the_budget():
+    contents = _refine_loop(4)
+
+    compacted = compact_contents(contents, budget=600, chatter_max_chars=100)
+
+    summary = compacted[0].parts[0].text
+    assert summary.startswith("Summary of the earlier conversation:")
+    assert "- User: I want to become a Data Analyst" in summary
+    assert "Latest roadmap version:" in summary and "Topic 1 v4" in summary
+    assert compacted[-1] is contents[-1]
+    assert content_tokens(compacted) < content_tokens(contents)
+
+
+def test_plugin_rewrites_requests_and_counts_tokens_per_turn():
+    plugin = HistoryCompactionPlugin()
+    request = LlmRequest(contents=_refine_loop(3))
+    context = SimpleNamespace(agent_name="interactive_roadmap_agent", invocation_id="turn-4")
+
+    asyncio.run(plugin.before_model_callback(callback_context=context, llm_request=request))
+    asyncio.run(plugin.after_run_callback(invocation_context=SimpleNamespace(invocation_id="turn-4")))
+
+    stats = plugin.stats()
+    assert stats["compacted"] == 1
+    assert stats["tokens_saved"] > 0
+    assert stats["tokens_after"] == content_tokens(request.contents)
@@ -0,0 +1,109 @@
+"""
+Tests for the metrics registry and the instrumentation plugin
+"""
+
+import asyncio
+import json
+import logging
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from benchmarks.stub_model import StubModel
+from roadmap_agent.agent import root_agent
+from roadmap_agent.config import config
+from roadmap_agent.instrumentation import InstrumentationPlugin, search_calls
+from roadmap_agent.metrics import MetricsRegistry
+from tests.test_agent import DEFAULT_CASSETTE, QUERIES
+
+
+def test_render_uses_prometheus_text_format():
+    registry = MetricsRegistry(prefix="test")
+    registry.counter("calls_total", "Calls").inc(agent="planner")
+    registry.counter("calls_total").inc(2, agent="planner")
+    registry.histogram("duration_seconds", "Latency", buckets=(0.1, 1.0)).observe(0.5, tool="search")
+    registry.register_collector("cache", lambda: {"hits": 3, "by_group": {"planner": 1.5}}, "Cache")
+
+    text = registry.render()
+
+    assert "# TYPE test_calls_total counter" in text
+    assert 'test_calls_total{agent="planner"} 3' in text
+    assert 'test_duration_seconds_bucket{tool="search",le="0.1"} 0' in text
+    assert 'test_duration_seconds_bucket{tool="search",le="1"} 1' in text
+    assert 'test_duration_seconds_bucket{tool="search",le="+Inf"} 1' in text
+    assert 'test_duration_seconds_count{tool="search"} 1' in text
+    assert "test_cache_hits 3" in text
+    assert 'test_cache_by_group{group="planner"} 1.5' in text
+
+
+def test_reset_zeroes_metrics_that_stay_registered():
+    registry = MetricsRegistry(prefix="test")
+    calls = registry.counter("calls_total", "Calls")
+    latency = registry.histogram("duration_seconds", buckets=(1.0,))
+    calls.inc(agent="planner")
+    latency.observe(0.5)
+
+    registry.reset()
+    assert calls.get(agent="planner") == 0
+    assert latency.count() == 0
+
+    # Module-level references still report after the reset
+    calls.inc(agent="editor")
+    assert 'test_calls_total{agent="editor"} 1' in registry.render()
+    assert registry.counter("calls_total") is calls
+
+
+def test_broken_collector_does_not_break_the_dump():
+    registry = MetricsRegistry(prefix="test")
+    registry.counter("calls_total").inc()
+    registry.register_collector("broken", lambda: 1 / 0)
+
+    text = registry.render()
+
+    assert "test_calls_total 1" in text
+    assert "collector test_broken failed: ZeroDivisionError" in text
+
+
+def test_plugin_records_a_session(tmp_path, monkeypatch, caplog):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "enable_search_cache", False)
+    monkeypatch.setattr(config, "enable_domain_cache", False)
+    plugin = InstrumentationPlugin(max_sessions=1)
+    searches_before = search_calls.get(agent="domain_researcher")
+
+    async def converse():
+        runner = Runner(
+            agent=root_agent,
+            app_name="metrics_test",
+            session_service=InMemorySessionService(),
+            plugins=[plugin],
+        )
+        session = await runner.session_service.create_session(app_name="metrics_test", user_id="u")
+        for query in QUERIES:
+            async for _ in runner.run_async(
+                user_id="u",
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part.from_text(text=query)]),
+            ):
+                pass
+        return session.id
+
+    with caplog.at_level(logging.INFO, logger="roadmap_agent.metrics"):
+        with StubModel(DEFAULT_CASSETTE) as model:
+            session_id = asyncio.run(converse())
+
+    # Isolated runs (shards, SearchAgent) are attributed to the user's session
+    assert list(plugin.sessions) == [session_id]
+    summary = plugin.session_summary(session_id)
+    stats = model.stats()
+    assert summary["model_calls"] == stats["model_calls"]
+    assert summary["input_tokens"] == stats["input_tokens"]
+    assert summary["output_tokens"] == stats["output_tokens"]
+    assert summary["search_calls"] == 1
+    assert summary["agents"]["week_resource_curator"]["runs"] == 4
+    assert search_calls.get(agent="domain_researcher") == searches_before + 1
+
+    records = [json.loads(record.getMessage()) for record in caplog.records]
+    assert {record["kind"] for record in records} == {"agent", "model", "tool"}
+    assert all(record["session"] == session_id for record in records)
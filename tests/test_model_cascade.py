@@ -0,0 +1,35 @@
+"""
+Unit tests for the worker-first model cascade
+"""
+
+from roadmap_agent.config import config
+from roadmap_agent.model_cascade import (
+    EDITOR,
+    PLANNER,
+    escalated_state,
+    escalation_delta,
+    is_escalated,
+    model_for,
+)
+
+
+def test_cascade_uses_worker_until_escalated():
+    assert model_for(PLANNER) == config.worker_model
+    assert model_for(PLANNER, escalated=True) == config.critic_model
+
+
+def test_pinned_policies_ignore_escalation(monkeypatch):
+    monkeypatch.setitem(config.model_policies, EDITOR, "critic")
+    assert model_for(EDITOR) == config.critic_model
+
+    monkeypatch.setitem(config.model_policies, EDITOR, "worker")
+    assert model_for(EDITOR, escalated=True) == config.worker_model
+
+
+def test_escalation_is_scoped_to_its_invocation():
+    state = escalation_delta({}, PLANNER, "inv-1")
+
+    assert is_escalated(state, PLANNER, "inv-1")
+    assert not is_escalated(state, PLANNER, "inv-2")
+    assert not is_escalated(state, EDITOR, "inv-1")
+    assert is_escalated(escalated_state(EDITOR), EDITOR, None)
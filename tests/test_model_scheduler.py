@@ -0,0 +1,148 @@
+"""
+Tests for per-model rate limits, priorities and 429 backoff
+"""
+
+import asyncio
+import time
+
+import pytest
+from google.adk.models import LlmResponse
+from google.genai import errors
+
+from roadmap_agent.cassette import Cassette, CassetteLlm
+from roadmap_agent.model_scheduler import (
+    ModelScheduler,
+    ScheduledLlm,
+    TokenBucket,
+    call_priority,
+    retry_delay,
+)
+
+
+def _quota_error(delay: str = "0.01s") -> errors.ClientError:
+    return errors.ClientError(429, {"error": {
+        "code": 429,
+        "status": "RESOURCE_EXHAUSTED",
+        "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": delay}],
+    }})
+
+
+def test_token_bucket_refills_at_the_configured_rate():
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, burst=2, clock=lambda: now[0])
+
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.take() == pytest.approx(0.5)
+
+    now[0] = 0.5
+    assert bucket.take() == 0
+    # Paused buckets don't accumulate tokens while paused
+    bucket.drain(until=10.0)
+    now[0] = 10.25
+    assert bucket.take() == pytest.approx(0.25)
+
+
+def test_waiting_calls_are_admitted_by_priority():
+    scheduler = ModelScheduler(limits={"m": {"requests_per_minute": 600, "burst": 1}})
+    admitted = []
+
+    async def caller(name: str, priority: str):
+        with call_priority(priority):
+            await scheduler.acquire("m")
+        admitted.append(name)
+
+    async def scenario():
+        await scheduler.acquire("m")  # uses the only token
+        await asyncio.gather(
+            caller("background", "background"),
+            caller("batch", "batch"),
+            caller("interactive 1", "interactive"),
+            caller("interactive 2", "interactive"),
+        )
+
+    asyncio.run(scenario())
+
+    assert admitted == ["interactive 1", "interactive 2", "batch", "background"]
+    assert scheduler.stats()["max_queue_depth"] == {"m": 4}
+
+
+def test_unlimited_models_pass_through():
+    scheduler = ModelScheduler(limits={})
+
+    async def scenario():
+        for _ in range(100):
+            await scheduler.acquire("m")
+
+    asyncio.run(scenario())
+    assert scheduler.stats() == {}
+
+
+def test_quota_errors_back_off_and_retry_the_call():
+    scheduler = ModelScheduler(limits={"m": {"requests_per_minute": 6000, "burst": 5}}, max_retries=2)
+    attempts = []
+
+    async def generate():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _quota_error()
+        yield LlmResponse()
+
+    async def scenario():
+        return [response async for response in scheduler.call("m", generate)]
+
+    assert len(asyncio.run(scenario())) == 1
+    stats = scheduler.stats()
+    assert len(attempts) == 3
+    assert stats["rate_limited"] == {"m": 2}
+    assert stats["retries"] == {"m": 2}
+    # Halved twice, then partly recovered by the success
+    assert 6000 / 4 <= stats["requests_per_minute"]["m"] < 6000 / 2
+
+
+def test_retries_stop_after_the_limit():
+    scheduler = ModelScheduler(limits={"m": {"requests_per_minute": 6000, "burst": 5}}, max_retries=1)
+
+    async def generate():
+        raise _quota_error()
+        yield
+
+    async def scenario():
+        async for _ in scheduler.call("m", generate):
+            pass
+
+    with pytest.raises(errors.ClientError):
+        asyncio.run(scenario())
+    assert scheduler.stats()["rate_limited"] == {"m": 2}
+
+
+def test_unlimited_models_still_wait_before_retrying():
+    scheduler = ModelScheduler(limits={}, max_retries=1)
+    attempts = []
+
+    async def generate():
+        attempts.append(time.perf_counter())
+        if len(attempts) == 1:
+            raise _quota_error("0.05s")
+        yield LlmResponse()
+
+    async def scenario():
+        return [response async for response in scheduler.call("m", generate)]
+
+    assert len(asyncio.run(scenario())) == 1
+    assert attempts[1] - attempts[0] >= 0.05
+
+
+def test_backends_are_reused_until_a_cassette_changes_them(tmp_path):
+    model = ScheduledLlm(model="gemini-2.5-flash")
+    backend = model._backend("gemini-2.5-flash")
+    assert model._backend("gemini-2.5-flash") is backend
+
+    with Cassette(str(tmp_path / "c.json"), mode="record"):
+        assert isinstance(model._backend("gemini-2.5-flash"), CassetteLlm)
+    assert type(model._backend("gemini-2.5-flash")) is type(backend)
+
+
+def test_retry_delay_is_read_from_the_error():
+    assert retry_delay(_quota_error("13s")) == 13.0
+    assert retry_delay(errors.ClientError(429, {"error": {"code": 429}})) is None
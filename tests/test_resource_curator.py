@@ -0,0 +1,151 @@
+"""
+Unit tests for per-week resource curation sharding
+"""
+
+import asyncio
+import re
+from types import SimpleNamespace
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from roadmap_agent.roadmap_model import parse_roadmap
+from roadmap_agent.speculation import speculative_tasks
+from roadmap_agent.sub_agents.resource_curator import ShardedResourceCurator, approved_roadmap
+
+ROADMAP = """# Frontend Developer Roadmap
+
+## Week 1: HTML & CSS
+### Day 1
+- Objective: semantics
+
+## Week 2: JavaScript
+### Day 1
+- Objective: variables
+"""
+
+
+def test_approved_roadmap_ignores_orchestrator_chatter():
+    state = {"final_roadmap": "Great, let's continue!", "roadmap_outline": ROADMAP}
+    roadmap = approved_roadmap(state)
+
+    assert roadmap.source == ROADMAP
+    assert [week.number for week in roadmap.weeks] == [1, 2]
+
+
+def test_approved_roadmap_prefers_edited_version():
+    state = {
+        "final_roadmap": ROADMAP.replace("JavaScript", "TypeScript"),
+        "roadmap_outline": ROADMAP,
+    }
+
+    assert approved_roadmap(state).weeks[1].title == "TypeScript"
+
+
+def test_approved_roadmap_missing():
+    assert approved_roadmap({}) is None
+
+
+FOUR_WEEKS = "\n\n".join(
+    f"## Week {number}: Topic {number}\n### Day 1\n- Objective: topic {number}"
+    for number in range(1, 5)
+)
+
+
+class StubShardAgent(BaseAgent):
+    """Answers with its week after a delay that makes later weeks finish first."""
+
+    active: int = 0
+    max_active: int = 0
+    runs: int = 0
+
+    async def _run_async_impl(self, context: InvocationContext) -> AsyncGenerator[Event, None]:
+        request = context.user_content.parts[0].text
+        match = re.search(r"Week (\d+) of the roadmap", request)
+        week = int(match.group(1)) if match else 0
+        self.runs += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01 * (5 - week))
+        finally:
+            self.active -= 1
+        yield Event(
+            author=self.name,
+            invocation_id=context.invocation_id,
+            content=types.Content(role="model", parts=[types.Part(text=f"resources for week {week}")]),
+        )
+
+
+def _curator(max_concurrency: int = 4) -> ShardedResourceCurator:
+    return ShardedResourceCurator(
+        name="resource_curator",
+        shard_agent=StubShardAgent(name="week_resource_curator"),
+        max_concurrency=max_concurrency,
+    )
+
+
+async def _curate(curator: ShardedResourceCurator, roadmap: str, before=None) -> str:
+    runner = Runner(app_name="curator_test", agent=curator, session_service=InMemorySessionService())
+    session = await runner.session_service.create_session(
+        app_name="curator_test",
+        user_id="user",
+        session_id="session-1",
+        state={"roadmap_outline": roadmap, "target_domain": "Frontend Developer"},
+    )
+    if before is not None:
+        before(session)
+    async for _ in runner.run_async(
+        user_id="user",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text="curate")]),
+    ):
+        pass
+    session = await runner.session_service.get_session(
+        app_name="curator_test", user_id="user", session_id=session.id
+    )
+    return session.state["learning_resources"]
+
+
+def test_sharded_curator_merges_weeks_in_order():
+    curator = _curator()
+
+    resources = asyncio.run(_curate(curator, FOUR_WEEKS))
+
+    assert resources == "\n\n".join(
+        f"## Week {number} Resources\n\nresources for week {number}" for number in range(1, 5)
+    )
+    assert curator.shard_agent.max_active == 4
+
+
+def test_sharded_curator_caps_prefetched_and_live_shards_together():
+    curator = _curator(max_concurrency=2)
+
+    def prefetch_for_another_profile(session):
+        # Still running (and keyed to another profile) when the live run starts
+        context = SimpleNamespace(
+            session=SimpleNamespace(id=session.id),
+            plugin_manager=SimpleNamespace(plugins=[]),
+            user_id="user",
+        )
+        jobs = curator.prefetch_jobs(context, parse_roadmap(FOUR_WEEKS), {"target_domain": "Data Analyst"})
+        speculative_tasks.start(session.id, jobs)
+
+    asyncio.run(_curate(curator, FOUR_WEEKS, before=prefetch_for_another_profile))
+    speculative_tasks.discard("session-1")
+
+    assert curator.shard_agent.max_active == 2
+
+
+def test_roadmap_without_weeks_is_one_shard():
+    curator = _curator()
+
+    resources = asyncio.run(_curate(curator, "A short plan without week headings."))
+
+    assert resources == "resources for week 1"
+    assert curator.shard_agent.runs == 1
@@ -0,0 +1,107 @@
+"""
+Tests for the local learning-resource index
+"""
+
+import asyncio
+import json
+
+from roadmap_agent import tools as tools_module
+from roadmap_agent.config import config
+from roadmap_agent.resource_index import (
+    Resource,
+    ResourceIndex,
+    extract_resources,
+    main,
+)
+
+CURATED = """# Data Analyst Roadmap
+
+## Week 1: SQL Fundamentals
+
+### Day 1: SELECT queries and filtering
+- [SQL Tutorial for Beginners](https://www.youtube.com/watch?v=sql101) (video)
+- https://mode.com/sql-tutorial/introduction-to-sql - SQL basics guide
+
+### Day 2: SQL joins
+- [SQL joins practice](https://www.hackerrank.com/domains/sql)
+
+## Week 2: Python for Data Analysis
+
+### Day 1: Pandas DataFrames
+- [Pandas course](https://www.coursera.org/learn/pandas)
+"""
+
+
+def test_extract_resources_uses_week_and_day_as_topic():
+    resources = {resource.url: resource for resource in extract_resources(CURATED, "complete beginner")}
+
+    video = resources["https://www.youtube.com/watch?v=sql101"]
+    assert video.title == "SQL Tutorial for Beginners"
+    assert video.topic == "SQL Fundamentals - SELECT queries and filtering"
+    assert (video.resource_type, video.difficulty) == ("video", "beginner")
+    assert resources["https://mode.com/sql-tutorial/introduction-to-sql"].title == "SQL basics guide"
+    assert resources["https://www.hackerrank.com/domains/sql"].resource_type == "interactive"
+    assert resources["https://www.coursera.org/learn/pandas"].resource_type == "course"
+
+
+def test_search_ranks_matching_resources_and_reports_confidence(tmp_path):
+    index = ResourceIndex(str(tmp_path / "index.sqlite3"))
+    assert index.add(extract_resources(CURATED, "beginner")) == 4
+
+    matches, confidence = index.search("SQL joins", difficulty="beginner")
+    assert matches[0][0].url == "https://www.hackerrank.com/domains/sql"
+    assert confidence >= config.resource_index_min_score
+
+    videos, _ = index.search("SQL tutorial", resource_type="video")
+    assert [resource.resource_type for resource, _ in videos] == ["video"]
+
+    assert index.search("kubernetes networking") == ([], 0.0)
+    assert index.stats() == {"lookups": 3, "confident": 2, "fallbacks": 1, "size": 4}
+
+
+def test_seeing_a_url_again_raises_its_quality(tmp_path):
+    index = ResourceIndex(str(tmp_path / "index.sqlite3"))
+    resource = Resource(url="https://example.com/sql", title="SQL", topic="SQL basics")
+
+    assert index.add([resource]) == 1
+    assert index.add([resource]) == 0
+
+    (match, _), = index.search("SQL basics")[0]
+    assert (match.seen_count, match.quality) == (2, 0.75)
+
+
+def test_find_learning_resources_falls_back_to_search_on_weak_matches(tmp_path, monkeypatch):
+    index = ResourceIndex(str(tmp_path / "index.sqlite3"))
+    index.add(extract_resources(CURATED, "beginner"))
+    monkeypatch.setattr(tools_module, "resource_index", index)
+
+    local = asyncio.run(tools_module.find_learning_resources("Pandas DataFrames"))
+    assert local["source"] == "local_index"
+    assert local["resources"][0]["url"] == "https://www.coursera.org/learn/pandas"
+    assert "suggested_searches" not in local
+
+    fallback = asyncio.run(tools_module.find_learning_resources("Docker containers"))
+    assert fallback["source"] == "search"
+    assert fallback["suggested_searches"]
+
+
+def test_ingest_command_reads_roadmaps_and_catalog_records(tmp_path, capsys):
+    roadmap = tmp_path / "roadmap.json"
+    roadmap.write_text(json.dumps({"metadata": {}, "content": CURATED}))
+    records = tmp_path / "catalog.jsonl"
+    records.write_text(json.dumps({
+        "url": "https://docs.python.org/3/tutorial/",
+        "title": "The Python Tutorial",
+        "topic": "Python basics",
+        "type": "documentation",
+        "difficulty": "beginner",
+        "quality": 0.9,
+    }) + "\n")
+    path = str(tmp_path / "index.sqlite3")
+
+    assert main(["--index", path, "ingest", str(roadmap), str(records)]) == 0
+
+    matches, _ = ResourceIndex(path).search("python tutorial")
+    assert matches[0][0].resource_type == "article"
+    assert matches[0][0].quality == 0.9
+    assert '"size": 5' in capsys.readouterr().out
@@ -0,0 +1,29 @@
+"""
+Unit tests for incremental roadmap editing
+"""
+
+from roadmap_agent.roadmap_model import parse_roadmap
+from roadmap_agent.sub_agents.roadmap_editor import affected_weeks
+
+ROADMAP = parse_roadmap("\n".join(
+    f"## Week {week}: Theme {week}\n"
+    + "\n".join(f"### Day {(week - 1) * 5 + day}\n- Objective: topic" for day in range(1, 6))
+    for week in range(1, 5)
+))
+
+
+def test_explicit_week_references():
+    assert affected_weeks("More React in week 2 please", ROADMAP) == [2]
+    assert affected_weeks("Weeks 2 and 3 feel rushed", ROADMAP) == [2, 3]
+    assert affected_weeks("Rework week 1-2", ROADMAP) == [1, 2]
+
+
+def test_ordinal_and_day_references():
+    assert affected_weeks("The last week needs a capstone project", ROADMAP) == [4]
+    assert affected_weeks("Day 12 is too much", ROADMAP) == [3]
+
+
+def test_global_or_untargeted_feedback_needs_full_edit():
+    assert affected_weeks("This is too fast", ROADMAP) is None
+    assert affected_weeks("Add more SQL to every week", ROADMAP) is None
+    assert affected_weeks("Change week 7", ROADMAP) is None
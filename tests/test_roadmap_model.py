@@ -0,0 +1,108 @@
+"""
+Unit tests for the structured roadmap model
+"""
+
+from roadmap_agent.roadmap_model import (
+    Roadmap,
+    parse_roadmap,
+    render_roadmap,
+    roadmap_from_state,
+    structure_key,
+)
+
+ROADMAP = """# Frontend Developer Roadmap
+
+A four-week plan. Week 1 starts gently.
+
+## Week 1: HTML & CSS Foundations
+
+**Objective:** Build static pages
+
+### Day 1: Semantic HTML
+- **Objective:** Understand document structure
+- **Key Concepts:** tags, attributes
+- **Practice:** Build a profile page
+- Resources: [MDN](https://developer.mozilla.org/en-US/docs/Web/HTML)
+
+### Day 2-3: CSS Layout
+**Concepts:**
+- Flexbox
+- Grid
+**Practice:** Recreate a landing page
+
+**Weekend:** Portfolio project
+
+## Week 2: JavaScript Basics
+
+### Day 1: Variables
+- Objective: let vs const
+- Video: https://www.youtube.com/watch?v=abc
+"""
+
+
+def test_parse_weeks_days_and_sections():
+    roadmap = parse_roadmap(ROADMAP)
+
+    assert [week.number for week in roadmap.weeks] == [1, 2]
+    week1 = roadmap.weeks[0]
+    assert week1.title == "HTML & CSS Foundations"
+    assert week1.objectives == ["Build static pages"]
+    assert [day.label for day in week1.days] == ["Day 1", "Day 2", "Weekend"]
+
+    day1 = week1.days[0]
+    assert day1.title == "Semantic HTML"
+    assert day1.objectives == ["Understand document structure"]
+    assert day1.concepts == ["tags, attributes"]
+    assert day1.practice == ["Build a profile page"]
+    assert day1.resources == ["https://developer.mozilla.org/en-US/docs/Web/HTML"]
+
+    assert week1.days[1].concepts == ["Flexbox", "Grid"]
+    assert roadmap.weeks[1].days[0].resources == ["https://www.youtube.com/watch?v=abc"]
+    assert roadmap.day_count == 4
+
+
+def test_spans_cover_the_source_exactly():
+    roadmap = parse_roadmap(ROADMAP)
+
+    assert roadmap.preamble.startswith("# Frontend Developer Roadmap")
+    assert roadmap.week_text(roadmap.weeks[0]).startswith("## Week 1")
+    assert roadmap.day_text(roadmap.weeks[1].days[0]).startswith("### Day 1: Variables")
+    assert render_roadmap(roadmap) == ROADMAP
+
+
+def test_replacing_a_week_keeps_other_sections_byte_identical():
+    roadmap = parse_roadmap(ROADMAP)
+    updated = roadmap.with_weeks_replaced(
+        {2: "## Week 2: TypeScript\n\n### Day 1: Types\n- Objective: interfaces"}
+    )
+
+    assert updated.week_text(updated.weeks[0]) == roadmap.week_text(roadmap.weeks[0])
+    assert updated.preamble == roadmap.preamble
+    assert updated.weeks[1].title == "TypeScript"
+
+
+def test_replacing_adds_missing_weeks_in_order():
+    roadmap = parse_roadmap(ROADMAP)
+    updated = roadmap.with_weeks_replaced({3: "## Week 3: React\n### Day 1: JSX"})
+
+    assert [week.number for week in updated.weeks] == [1, 2, 3]
+    assert updated.source.startswith(ROADMAP)
+
+
+def test_structure_round_trips_through_state():
+    roadmap = parse_roadmap(ROADMAP)
+    state = {"roadmap_outline": ROADMAP, structure_key("roadmap_outline"): roadmap.to_dict()}
+
+    restored = roadmap_from_state(state, "roadmap_outline")
+    assert restored == roadmap
+    assert roadmap_from_state({}, "roadmap_outline") is None
+
+
+def test_render_from_fields():
+    roadmap = parse_roadmap(ROADMAP)
+    rebuilt = Roadmap.from_dict(roadmap.to_dict(), source="")
+
+    text = render_roadmap(rebuilt)
+    assert text.startswith("## Week 1: HTML & CSS Foundations")
+    assert "- Build a profile page" in text
+    assert [week.number for week in parse_roadmap(text).weeks] == [1, 2]
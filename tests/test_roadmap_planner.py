@@ -0,0 +1,75 @@
+"""
+Unit tests for validation reports and targeted outline repair
+"""
+
+import pytest
+
+from roadmap_agent.config import config
+from roadmap_agent.roadmap_model import digest, parse_roadmap
+from roadmap_agent.sub_agents.roadmap_planner import repair_plan
+from roadmap_agent.validation import roadmap_issues
+
+
+def make_outline(days_per_week=(5, 5, 5, 5), practice=True):
+    weeks = []
+    for week, days in enumerate(days_per_week, 1):
+        body = "\n".join(
+            f"### Day {day}: Topic\n- Objective: goal\n- Learning: video"
+            + ("\n- Practice: exercise" if practice else "")
+            for day in range(1, days + 1)
+        )
+        weeks.append(f"## Week {week}: Theme\n{body}\n")
+    return "\n".join(weeks)
+
+
+@pytest.fixture
+def strict_weeks(monkeypatch):
+    # Per-week issues, which targeted repair works from
+    monkeypatch.setattr(config, "strict_week_validation", True)
+
+
+def test_valid_outline_has_no_issues():
+    assert roadmap_issues(parse_roadmap(make_outline())) == []
+
+
+def test_issues_are_tagged_with_their_week(strict_weeks):
+    issues = roadmap_issues(parse_roadmap(make_outline(days_per_week=(5, 5, 2))))
+
+    assert {(issue["code"], issue.get("week")) for issue in issues} == {
+        ("missing_days", 3),
+        ("missing_week", 4),
+    }
+
+
+def test_missing_terms_are_reported_per_week(strict_weeks):
+    issues = roadmap_issues(parse_roadmap(make_outline(practice=False)))
+
+    assert [issue["week"] for issue in issues] == [1, 2, 3, 4]
+    assert all(issue["terms"] == ["practice"] for issue in issues)
+
+
+def report_for(outline, invocation_id="inv"):
+    issues = roadmap_issues(parse_roadmap(outline))
+    return {
+        "valid": not issues,
+        "digest": digest(outline),
+        "invocation_id": invocation_id,
+        "issues": issues,
+    }
+
+
+def test_localized_failures_are_repaired(strict_weeks):
+    outline = make_outline(days_per_week=(5, 5, 2))
+
+    assert repair_plan(report_for(outline), outline, "inv") == [3, 4]
+
+
+def test_stale_or_widespread_failures_are_regenerated(strict_weeks):
+    outline = make_outline(days_per_week=(5, 5, 2))
+
+    assert repair_plan(None, outline, "inv") is None
+    assert repair_plan(report_for(outline, "old"), outline, "inv") is None
+    assert repair_plan(report_for(outline), outline + "\nedited", "inv") is None
+
+    broken = make_outline(practice=False)
+    assert repair_plan(report_for(broken), broken, "inv") is None
@@ -0,0 +1,85 @@
+"""
+Tests for the approved-roadmap store and planner seeding
+"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+from google.adk.models import LlmRequest
+
+from roadmap_agent import roadmap_store as roadmap_store_module
+from roadmap_agent.config import config
+from roadmap_agent.roadmap_store import RoadmapStore, seed_planner_callback, store_approved_roadmap
+from tests.test_validation import make_outline
+
+
+def profile(domain, level="complete beginner", style="video tutorials", hours="2 hours"):
+    return {
+        "target_domain": domain,
+        "experience_level": level,
+        "learning_style": style,
+        "time_commitment": hours,
+    }
+
+
+def test_nearest_prefers_the_same_domain_then_matching_attributes(tmp_path):
+    store = RoadmapStore(str(tmp_path / "roadmaps.sqlite3"))
+    store.add_many([
+        (profile("Data Analyst", level="intermediate"), "analyst, intermediate"),
+        (profile("Data Analyst"), "analyst, beginner"),
+        (profile("Cloud Engineer"), "cloud, beginner"),
+    ])
+
+    roadmap, score, stored = store.nearest(profile("data analyst role", level="beginner"))
+    assert (roadmap, score) == ("analyst, beginner", 1.0)
+    assert stored["target_domain"] == "Data Analyst"
+
+    roadmap, score, _ = store.nearest(profile("Data Analyst", level="advanced"))
+    assert roadmap == "analyst, beginner"
+    assert score < 1.0
+
+    # Matching level, style and hours never make up for another domain
+    assert store.nearest(profile("Nurse")) is None
+    assert store.nearest(profile("Data Analyst"), min_score=1.01) is None
+    assert not store.add(profile("Data Analyst"), "analyst, beginner")
+
+
+def test_rebuilt_index_is_reloaded_and_extended(tmp_path):
+    path = str(tmp_path / "roadmaps.sqlite3")
+    store = RoadmapStore(path)
+    store.add(profile("Frontend Developer"), "frontend v1")
+    assert store.rebuild() == 1
+    store.close()
+    assert os.path.exists(store.index_path)
+
+    reopened = RoadmapStore(path)
+    reopened.add(profile("Frontend Developer"), "frontend v2")
+    reopened.add(profile("Backend Developer"), "backend")
+
+    # Added after the rebuild: appended with the saved vocabulary, latest wins ties
+    assert reopened.nearest(profile("Frontend Developer"))[0] == "frontend v2"
+    assert reopened.nearest(profile("Backend Developer"))[0] == "backend"
+    assert reopened.stats() == {"lookups": 2, "matches": 2, "size": 3}
+
+
+def test_approved_roadmaps_seed_the_next_planner_request(tmp_path, monkeypatch):
+    store = RoadmapStore(str(tmp_path / "roadmaps.sqlite3"))
+    monkeypatch.setattr(roadmap_store_module, "roadmap_store", store)
+    monkeypatch.setattr(config, "enable_roadmap_seeding", True)
+
+    outline = make_outline()
+    approved = SimpleNamespace(state={**profile("Data Analyst"), "roadmap_outline": outline})
+    asyncio.run(store_approved_roadmap(approved))
+    invalid = SimpleNamespace(state={**profile("Cloud Engineer"), "roadmap_outline": "## Week 1\n"})
+    asyncio.run(store_approved_roadmap(invalid))
+    assert store.stats()["size"] == 1
+
+    request = LlmRequest()
+    asyncio.run(seed_planner_callback(SimpleNamespace(state=profile("Data Analyst", hours="3 hours")), request))
+    assert "<template>" in request.config.system_instruction
+    assert outline in request.config.system_instruction
+
+    unrelated = LlmRequest()
+    asyncio.run(seed_planner_callback(SimpleNamespace(state=profile("Cloud Engineer")), unrelated))
+    assert not unrelated.config.system_instruction
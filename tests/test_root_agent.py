@@ -0,0 +1,118 @@
+"""
+Tests that agent graphs follow the configuration they were built with
+"""
+
+import asyncio
+import inspect
+from types import SimpleNamespace
+
+from google.adk.models import LlmRequest
+from google.adk.tools import FunctionTool
+
+from roadmap_agent.agent import create_plugins, create_root_agent
+from roadmap_agent.agent_utils import with_config
+from roadmap_agent.checkpoints import CHECKPOINTS_KEY
+from roadmap_agent.config import RoadmapConfiguration
+from roadmap_agent.history_compaction import HistoryCompactionPlugin
+from roadmap_agent.tools import find_learning_resources
+from roadmap_agent.validation_checkers import RoadmapValidationChecker
+
+ROADMAP = "\n\n".join(
+    f"## Week {number}: Topic {number}\n### Day 1: Start\nObjective, learning and practice."
+    for number in range(1, 5)
+)
+
+DEFAULT = RoadmapConfiguration()
+CUSTOM = RoadmapConfiguration(
+    model_policies={"roadmap_planner": "critic"},
+    enable_stage_checkpoints=False,
+    default_weeks=5,
+    enable_search_cache=False,
+    history_token_budget=500,
+)
+
+
+def _context(agent_name: str, state: dict) -> SimpleNamespace:
+    return SimpleNamespace(
+        agent_name=agent_name,
+        state=state,
+        invocation_id="inv-1",
+        user_content=None,
+    )
+
+
+def _callback(agent, kind: str, name: str):
+    callbacks = getattr(agent, kind)
+    if not isinstance(callbacks, list):
+        callbacks = [callbacks]
+    return next(callback for callback in callbacks if callback.__name__ == name)
+
+
+async def _call(callback, **kwargs):
+    result = callback(**kwargs)
+    return await result if inspect.isawaitable(result) else result
+
+
+def _planner_model(root) -> str:
+    request = LlmRequest(model="unset")
+    callback = _callback(root.find_agent("roadmap_planner"), "before_model_callback", "cascade_model_callback")
+    asyncio.run(_call(callback, callback_context=_context("roadmap_planner", {}), llm_request=request))
+    return request.model
+
+
+def _checkpoints(root) -> dict:
+    state = {"target_domain": "Data Analyst", "domain_analysis": "analysis"}
+    callback = _callback(root.find_agent("domain_researcher"), "after_agent_callback", "record_stage_checkpoint")
+    asyncio.run(_call(callback, callback_context=_context("domain_researcher", state)))
+    return state.get(CHECKPOINTS_KEY, {})
+
+
+def _missing_weeks(root) -> set:
+    checker = root.find_agent("roadmap_validation_checker")
+    assert isinstance(checker, RoadmapValidationChecker)
+    context = SimpleNamespace(session=SimpleNamespace(state={"roadmap_outline": ROADMAP}), invocation_id="inv-1")
+
+    async def run():
+        return [event async for event in checker._run_async_impl(context)]
+
+    report = asyncio.run(run())[0].actions.state_delta["roadmap_validation"]
+    return {issue["week"] for issue in report["issues"] if issue["code"] == "missing_week"}
+
+
+def test_graphs_read_runtime_settings_from_their_own_configuration():
+    default_root = create_root_agent(DEFAULT)
+    custom_root = create_root_agent(CUSTOM)
+
+    # Cascade policy: the default planner starts on the worker model
+    assert _planner_model(default_root) == DEFAULT.worker_model
+    assert _planner_model(custom_root) == CUSTOM.critic_model
+
+    # Stage checkpoints
+    assert "domain_researcher" in _checkpoints(default_root)
+    assert _checkpoints(custom_root) == {}
+
+    # Validation rules: a four-week roadmap lacks a week only for the custom graph
+    assert _missing_weeks(default_root) == set()
+    assert _missing_weeks(custom_root) == {5}
+
+    # Rate limits and the scheduler switch
+    assert custom_root.model.config is CUSTOM
+
+    # Search cache switch
+    search_tools = [tool for tool in custom_root.tools if getattr(tool, "name", None) == "SearchAgent"]
+    assert search_tools and all(not tool.config.enable_search_cache for tool in search_tools)
+
+
+def test_plugins_use_the_configured_history_budget():
+    (compaction,) = [plugin for plugin in create_plugins(CUSTOM) if isinstance(plugin, HistoryCompactionPlugin)]
+    assert compaction.config.history_token_budget == 500
+
+
+def test_bound_tools_hide_the_configuration_from_the_model():
+    tool = FunctionTool(with_config(find_learning_resources, CUSTOM))
+    declaration = tool._get_declaration()
+
+    assert declaration.name == "find_learning_resources"
+    assert "config" not in declaration.parameters.properties
+    assert set(declaration.parameters.properties) == {"topic", "resource_type", "difficulty"}
+    assert inspect.iscoroutinefunction(tool.func)
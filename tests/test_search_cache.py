@@ -0,0 +1,59 @@
+"""
+Unit tests for the SearchAgent result cache
+"""
+
+import time
+
+from roadmap_agent.search_cache import SearchCache, normalize_query
+
+
+def test_normalize_query_collapses_case_and_punctuation():
+    assert normalize_query("  Frontend Developer job requirements 2025! ") == (
+        "frontend developer job requirements 2025"
+    )
+    assert normalize_query("C++ tutorial") == "c++ tutorial"
+
+
+def test_hit_and_miss_counters(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache.sqlite3"))
+
+    assert cache.get("react hooks tutorial") is None
+    cache.put("react hooks tutorial", "results")
+    assert cache.get("React Hooks   tutorial?") == "results"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0)
+    cache.put("sql joins", "results")
+    time.sleep(0.01)
+
+    assert cache.get("sql joins") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.put("first", "1")
+    time.sleep(0.01)
+    cache.put("second", "2")
+    time.sleep(0.01)
+    cache.get("first")
+    time.sleep(0.01)
+    cache.put("third", "3")
+
+    assert cache.get("second") is None
+    assert cache.get("first") == "1"
+    assert cache.get("third") == "3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SearchCache(path).put("docker basics", "results")
+
+    assert SearchCache(path).get("docker basics") == "results"
@@ -0,0 +1,125 @@
+"""
+Unit tests for the SQLite session service
+"""
+
+import asyncio
+import json
+
+import pytest
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event, EventActions
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+from roadmap_agent.session_store import LazyState, SqliteSessionService
+
+
+def _event(state_delta=None) -> Event:
+    return Event(
+        author="roadmap_planner",
+        invocation_id="invocation",
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+def test_sessions_round_trip_state_scopes_and_events(tmp_path):
+    async def scenario():
+        service = SqliteSessionService(str(tmp_path / "sessions.sqlite3"))
+        session = await service.create_session(
+            app_name="app", user_id="ada", session_id="s1",
+            state={"target_domain": "Data Analyst", "app:version": 2, "temp:scratch": 1},
+        )
+        await service.append_event(session, _event({"roadmap_outline": "# Plan", "user:level": "beginner"}))
+        await service.append_event(session, _event({"temp:ignored": True}))
+
+        # A new service on the same file sees everything written so far
+        await service.flush()
+        reopened = SqliteSessionService(str(tmp_path / "sessions.sqlite3"))
+        loaded = await reopened.get_session(app_name="app", user_id="ada", session_id="s1")
+        other = await reopened.create_session(app_name="app", user_id="ada")
+        return loaded, other
+
+    loaded, other = asyncio.run(scenario())
+
+    assert dict(loaded.state) == {
+        "target_domain": "Data Analyst",
+        "roadmap_outline": "# Plan",
+        "app:version": 2,
+        "user:level": "beginner",
+    }
+    assert [event.author for event in loaded.events] == ["roadmap_planner"] * 2
+    assert other.state == {"app:version": 2, "user:level": "beginner"}
+
+
+def test_buffered_events_are_flushed_before_reads_and_in_batches(tmp_path):
+    async def scenario():
+        service = SqliteSessionService(
+            str(tmp_path / "sessions.sqlite3"), flush_max_events=3, flush_interval_seconds=60
+        )
+        session = await service.create_session(app_name="app", user_id="u", session_id="s")
+        for _ in range(4):
+            await service.append_event(session, _event())
+        buffered = service.stats()["buffered_events"]
+        loaded = await service.get_session(
+            app_name="app", user_id="u", session_id="s", config=GetSessionConfig(num_recent_events=2)
+        )
+        return buffered, loaded, service.stats()
+
+    buffered, loaded, stats = asyncio.run(scenario())
+
+    assert buffered == 1
+    assert len(loaded.events) == 2
+    assert stats["events"] == 4 and stats["flushes"] == 2
+
+
+def test_large_state_values_load_on_access(tmp_path):
+    async def scenario():
+        service = SqliteSessionService(str(tmp_path / "sessions.sqlite3"), lazy_state_bytes=100)
+        await service.create_session(
+            app_name="app", user_id="u", session_id="s",
+            state={"learning_resources": "x" * 500, "experience_level": "beginner"},
+        )
+        return service, await service.get_session(app_name="app", user_id="u", session_id="s")
+
+    service, session = asyncio.run(scenario())
+    state = session.state
+
+    assert isinstance(state, LazyState)
+    assert "learning_resources" in state and len(state) == 2
+    assert service.stats()["lazy_loads"] == 0
+    assert state["learning_resources"] == "x" * 500
+    assert service.stats()["lazy_loads"] == 1
+    assert json.loads(json.dumps(state)) == {
+        "learning_resources": "x" * 500, "experience_level": "beginner"
+    }
+
+
+def test_unloaded_values_can_be_overwritten_and_copied():
+    state = LazyState({"a": 1}, ["big"], lambda keys: {key: "loaded" for key in keys})
+
+    state.update({"big": "new"})
+    assert state["big"] == "new"
+    assert dict(LazyState({}, ["big"], lambda keys: {"big": "loaded"})) == {"big": "loaded"}
+
+
+def test_duplicate_ids_list_and_delete(tmp_path):
+    async def scenario():
+        service = SqliteSessionService(str(tmp_path / "sessions.sqlite3"))
+        session = await service.create_session(app_name="app", user_id="u", session_id="s")
+        with pytest.raises(AlreadyExistsError):
+            await service.create_session(app_name="app", user_id="u", session_id="s")
+        await service.create_session(app_name="app", user_id="v", session_id="t")
+        await service.append_event(session, _event())
+
+        listed = await service.list_sessions(app_name="app", user_id="u")
+        everyone = await service.list_sessions(app_name="app")
+        await service.delete_session(app_name="app", user_id="u", session_id="s")
+        deleted = await service.get_session(app_name="app", user_id="u", session_id="s")
+        service.close()
+        return listed, everyone, deleted
+
+    listed, everyone, deleted = asyncio.run(scenario())
+
+    assert [session.id for session in listed.sessions] == ["s"]
+    assert listed.sessions[0].events == []
+    assert {session.id for session in everyone.sessions} == {"s", "t"}
+    assert deleted is None
@@ -0,0 +1,146 @@
+"""
+Tests for single-flight coalescing of research and search calls
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from roadmap_agent import domain_store as domain_store_module
+from roadmap_agent.config import config
+from roadmap_agent.single_flight import SingleFlight
+from tests.test_domain_store import ANALYSIS
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight("test")
+    executions = []
+
+    async def call(value):
+        executions.append(value)
+        await asyncio.sleep(0.01)
+        return value.upper()
+
+    async def scenario():
+        together = await asyncio.gather(*[
+            flight.do("data analyst", lambda: call("data analyst")) for _ in range(5)
+        ])
+        other = await flight.do("cloud engineer", lambda: call("cloud engineer"))
+        # Completed calls are not cached
+        again = await flight.do("data analyst", lambda: call("data analyst"))
+        return together, other, again
+
+    together, other, again = asyncio.run(scenario())
+
+    assert together == ["DATA ANALYST"] * 5
+    assert (other, again) == ("CLOUD ENGINEER", "DATA ANALYST")
+    assert executions == ["data analyst", "cloud engineer", "data analyst"]
+    assert flight.stats() == {
+        "calls": 7, "executed": 3, "coalesced": 4, "dedup_ratio": 4 / 7, "in_flight": 0
+    }
+
+
+def test_errors_reach_every_waiter_and_cancelled_waiters_do_not_cancel_the_call():
+    flight = SingleFlight("test")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("search failed")
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        results = await asyncio.gather(
+            flight.do("q", failing), flight.do("q", failing), return_exceptions=True
+        )
+        impatient = asyncio.ensure_future(flight.do("slow", slow))
+        await asyncio.sleep(0)
+        patient = asyncio.ensure_future(flight.do("slow", slow))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        return results, await patient
+
+    results, patient = asyncio.run(scenario())
+
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert patient == "done"
+
+
+def _research_context(domain):
+    return SimpleNamespace(
+        state={"target_domain": domain, "experience_level": "beginner"},
+        agent_name="domain_researcher",
+        invocation_id=f"inv-{domain}",
+        user_content=None,
+    )
+
+
+async def _research_in_session(ctx, runs, fail=False):
+    """Stands in for the researcher agent with its before and after callbacks."""
+    served = await domain_store_module.serve_cached_domain_analysis(ctx)
+    if served is not None:
+        return served.parts[0].text
+    runs.append(ctx.state["target_domain"])
+    await asyncio.sleep(0.01)
+    if fail:
+        raise TimeoutError("model timed out")
+    ctx.state["domain_analysis"] = f"analysis of {ctx.state['target_domain']}\n{ANALYSIS}"
+    await domain_store_module.store_domain_analysis(ctx)
+    return ctx.state["domain_analysis"]
+
+
+def test_sessions_researching_the_same_domain_share_one_run(monkeypatch):
+    monkeypatch.setattr(config, "enable_domain_cache", False)
+    monkeypatch.setattr(config, "coalesce_requests", True)
+    monkeypatch.setattr(domain_store_module, "research_flight", SingleFlight("domain_research"))
+    runs = []
+    contexts = [
+        _research_context("Data Analyst"),
+        _research_context("data analyst"),
+        _research_context("Cloud Engineer"),
+    ]
+
+    async def scenario():
+        return await asyncio.gather(*[_research_in_session(ctx, runs) for ctx in contexts])
+
+    analyses = asyncio.run(scenario())
+
+    assert [analysis.splitlines()[0] for analysis in analyses] == [
+        "analysis of Data Analyst", "analysis of Data Analyst", "analysis of Cloud Engineer"
+    ]
+    # The first session of each domain researched in its own session
+    assert runs == ["Data Analyst", "Cloud Engineer"]
+    assert contexts[1].state["domain_analysis"].startswith("analysis of Data Analyst\n")
+    assert domain_store_module.research_flight.stats()["coalesced"] == 1
+
+
+def test_waiting_sessions_research_themselves_when_the_leader_fails(monkeypatch):
+    monkeypatch.setattr(config, "enable_domain_cache", False)
+    monkeypatch.setattr(config, "coalesce_requests", True)
+    monkeypatch.setattr(domain_store_module, "research_flight", SingleFlight("domain_research"))
+    runs = []
+    leader, follower = _research_context("Data Analyst"), _research_context("Data Analyst")
+    follower.invocation_id = "inv-follower"
+
+    async def scenario():
+        return await asyncio.gather(
+            _research_in_session(leader, runs, fail=True),
+            _research_in_session(follower, runs),
+            return_exceptions=True,
+        )
+
+    failed, analysis = asyncio.run(scenario())
+
+    assert isinstance(failed, TimeoutError)
+    assert analysis.startswith("analysis of Data Analyst\n")
+    assert runs == ["Data Analyst", "Data Analyst"]
+    assert domain_store_module._led_research == {}
+
+
+def test_research_runs_in_session_when_coalescing_is_off(monkeypatch):
+    monkeypatch.setattr(config, "enable_domain_cache", False)
+    monkeypatch.setattr(config, "coalesce_requests", False)
+    ctx = SimpleNamespace(state={"target_domain": "Data Analyst"})
+
+    assert asyncio.run(domain_store_module.serve_cached_domain_analysis(ctx)) is None
@@ -0,0 +1,95 @@
+"""
+Tests for speculative enrichment while the user reviews the outline
+"""
+
+import asyncio
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from benchmarks.stub_model import StubModel
+from roadmap_agent.agent import root_agent
+from roadmap_agent.config import config
+from roadmap_agent.speculation import SpeculativeTasks, speculative_tasks
+from tests.test_agent import DEFAULT_CASSETTE, QUERIES
+
+
+def test_changed_inputs_cancel_only_stale_tasks():
+    tasks = SpeculativeTasks()
+    runs = []
+
+    def job(name):
+        async def run():
+            runs.append(name)
+            await asyncio.sleep(0.01)
+            return f"result {name}"
+        return run
+
+    async def scenario():
+        tasks.start("s", {"week1": job("week1"), "week2": job("week2")})
+        await asyncio.sleep(0)
+        # An edit changed week 2: week 1 keeps running, week 2 is replaced
+        tasks.start("s", {"week1": job("week1 again"), "week2-edited": job("week2-edited")})
+        return (
+            await tasks.take("s", "week1"),
+            await tasks.take("s", "week2"),
+            await tasks.take("s", "week2-edited"),
+            await tasks.take("s", "week1"),
+        )
+
+    assert asyncio.run(scenario()) == ("result week1", None, "result week2-edited", None)
+    assert runs == ["week1", "week2", "week2-edited"]
+    assert tasks.stats() == {"started": 3, "reused": 2, "discarded": 1, "failed": 0, "pending": 0}
+
+
+def test_failed_task_falls_back_to_the_real_stage():
+    tasks = SpeculativeTasks()
+
+    async def broken():
+        raise RuntimeError("model unavailable")
+
+    async def scenario():
+        tasks.start("s", {"key": broken})
+        return await tasks.take("s", "key")
+
+    assert asyncio.run(scenario()) is None
+    assert tasks.stats()["failed"] == 1
+
+
+def test_enrichment_reuses_prefetched_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "enable_search_cache", False)
+    monkeypatch.setattr(config, "enable_domain_cache", False)
+    reused_before = speculative_tasks.reused
+
+    async def converse(model):
+        session_service = InMemorySessionService()
+        runner = Runner(agent=root_agent, app_name="speculation_test", session_service=session_service)
+        session = await session_service.create_session(app_name="speculation_test", user_id="u")
+        calls_per_turn = []
+        for query in QUERIES[:4]:
+            calls_before = model.calls
+            async for _ in runner.run_async(
+                user_id="u",
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part.from_text(text=query)]),
+            ):
+                pass
+            # Give the background work time to finish, as a reading user would
+            await asyncio.sleep(0.05)
+            calls_per_turn.append(model.calls - calls_before)
+        session = await session_service.get_session(
+            app_name="speculation_test", user_id="u", session_id=session.id
+        )
+        return calls_per_turn, session.state
+
+    with StubModel(DEFAULT_CASSETTE) as model:
+        calls_per_turn, state = asyncio.run(converse(model))
+
+    # Four resource weeks and the practice advisor came from the prefetch
+    assert speculative_tasks.reused - reused_before == 5
+    # The turn that runs the enrichment stage only called the orchestrator
+    assert calls_per_turn[3] == 1
+    assert "## Week 4 Resources" in state["learning_resources"]
+    assert state["practice_activities"]
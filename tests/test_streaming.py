@@ -0,0 +1,76 @@
+"""
+Tests for week-by-week streaming of planner output
+"""
+
+import asyncio
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from roadmap_agent.agent import root_agent
+from roadmap_agent.cassette import Cassette
+from roadmap_agent.config import config
+from roadmap_agent.streaming import STREAM_KEY, WeekStreamer
+from tests.test_agent import DEFAULT_CASSETTE, QUERIES
+
+
+def test_sections_are_released_when_the_next_week_starts():
+    streamer = WeekStreamer()
+    key = ("invocation", "roadmap_planner")
+    chunks = [
+        "# Roadmap\nIntro\n## We",
+        "ek 1: HTML\n### Day 1\n",
+        "- Objective: tags\n## Week 2: CSS\n### Da",
+        "y 1\n",
+    ]
+
+    sections = [section for chunk in chunks for section in streamer.feed(key, chunk)]
+
+    assert sections == [
+        (None, "# Roadmap\nIntro\n"),
+        (1, "## Week 1: HTML\n### Day 1\n- Objective: tags\n"),
+    ]
+    assert streamer.finish(key) == 2
+    assert streamer.finish(key) == 0
+
+
+def test_planner_output_streams_week_by_week(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "enable_search_cache", False)
+    monkeypatch.setattr(config, "enable_domain_cache", False)
+
+    async def converse():
+        session_service = InMemorySessionService()
+        runner = Runner(agent=root_agent, app_name="stream_test", session_service=session_service)
+        session = await session_service.create_session(app_name="stream_test", user_id="u")
+        planner_events = []
+        for query in QUERIES[:3]:
+            async for event in runner.run_async(
+                user_id="u",
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part.from_text(text=query)]),
+                run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+            ):
+                if event.author == "roadmap_planner" and event.content and event.content.parts:
+                    planner_events.append(event)
+        session = await session_service.get_session(
+            app_name="stream_test", user_id="u", session_id=session.id
+        )
+        return planner_events, session.state
+
+    with Cassette(DEFAULT_CASSETTE):
+        events, state = asyncio.run(converse())
+
+    partial = [event for event in events if event.partial]
+    final = [event for event in events if not event.partial]
+    assert [event.custom_metadata[STREAM_KEY]["weeks"] for event in partial] == [[], [1], [2], [3]]
+    assert final[-1].custom_metadata[STREAM_KEY] == {
+        "agent": "roadmap_planner", "final": True, "sections": 4
+    }
+    # Streamed sections plus the last week add up to the stored outline
+    streamed = "".join(event.content.parts[0].text for event in partial)
+    assert state["roadmap_outline"] == final[-1].content.parts[0].text
+    assert state["roadmap_outline"].startswith(streamed)
+    assert "## Week 4" in state["roadmap_outline"][len(streamed):]
@@ -0,0 +1,83 @@
+"""
+Unit tests for the shared validation engine
+"""
+
+from roadmap_agent.config import config
+from roadmap_agent.tools import validate_roadmap_structure
+from roadmap_agent.validation import (
+    scan_text,
+    validate_domain_analysis,
+    validate_resources,
+    validate_roadmap_text,
+)
+
+
+def make_outline(weeks=4, days=5):
+    return "\n".join(
+        f"## Week {week}: Theme\n" + "\n".join(
+            f"### Day {day}: Topic\n- Objective: goal\n- Learning: https://example.com/{week}/{day}\n"
+            "- Practice: exercise"
+            for day in range(1, days + 1)
+        )
+        for week in range(1, weeks + 1)
+    )
+
+
+def test_scan_finds_terms_and_links_case_insensitively():
+    scan = scan_text("Watch the VIDEO at https://a.io and http://b.io. Practice!")
+
+    assert scan.has("video") and scan.has("practice")
+    assert not scan.has("article")
+    assert scan.link_count() == 2
+    assert scan.link_count(0, 15) == 0
+
+
+def test_roadmap_report_breaks_down_weeks_and_days():
+    report = validate_roadmap_text(make_outline())
+
+    assert report["valid"]
+    assert (report["week_count"], report["day_count"], report["link_count"]) == (4, 20, 20)
+    assert report["weeks"][1]["link_count"] == 5
+    day = report["weeks"][0]["days"][0]
+    assert (day["label"], day["practice"], day["resources"], day["concepts"]) == ("Day 1", 1, 1, 0)
+
+
+def test_tool_and_checker_share_rules():
+    result = validate_roadmap_structure(make_outline(weeks=3))
+
+    assert not result["valid"]
+    assert result["issues"] == ["Week 4 is missing"]
+    assert result["week_count"] == 3
+
+
+def test_days_and_terms_count_over_the_whole_roadmap_by_default():
+    # Four days in each week and "practice" only in the last week passed
+    # the original checker, and still pass
+    outline = make_outline(days=4).replace("Practice", "Exercise", 12)
+    assert validate_roadmap_text(outline)["valid"]
+
+    report = validate_roadmap_text(make_outline(days=3).replace("Practice", "Exercise"))
+    assert [(issue["code"], issue.get("week")) for issue in report["issues"]] == [
+        ("missing_days", None),
+        ("missing_terms", None),
+    ]
+
+
+def test_strict_week_validation_checks_every_week(monkeypatch):
+    monkeypatch.setattr(config, "strict_week_validation", True)
+    monkeypatch.setattr(config, "min_days_per_week", 5)
+    outline = make_outline(days=4).replace("Practice", "Exercise", 12)
+
+    report = validate_roadmap_text(outline)
+    assert {(issue["code"], issue["week"]) for issue in report["issues"]} == {
+        ("missing_days", 1), ("missing_days", 2), ("missing_days", 3), ("missing_days", 4),
+        ("missing_terms", 1), ("missing_terms", 2), ("missing_terms", 3),
+    }
+
+
+def test_resource_and_domain_reports():
+    resources = validate_resources("Read the docs")
+    assert {issue["code"] for issue in resources["issues"]} == {"too_short", "no_links", "no_variety"}
+
+    analysis = validate_domain_analysis("Key Skills and Concepts. " * 20)
+    assert analysis["missing_sections"] == ["interview", "requirements"]